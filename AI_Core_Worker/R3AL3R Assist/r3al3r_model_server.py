@@ -49,7 +49,7 @@ def search_db(query):
         cur = conn.cursor()
         cur.execute("""
             SELECT topic, content FROM crypto_unit.knowledge 
-            WHERE to_tsvector('english', topic || ' ' || content) @@ plainto_tsquery(%s)
+            WHERE search_vector @@ plainto_tsquery('english', %s)
             LIMIT 3
         """, [query])
         results = cur.fetchall()
@@ -8,6 +8,7 @@ import psycopg2
 from psycopg2.extras import Json
 from datetime import datetime
 import logging
+import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 class ActivityTracker:
     """Track user activities for AI learning"""
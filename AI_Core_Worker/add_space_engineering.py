@@ -150,7 +150,7 @@ SPACE_ENGINEERING_KB = {{
 
 # Usage example:
 # from space_engineering_kb_import import SPACE_ENGINEERING_KB
-# R3AELERPrompts.KNOWLEDGE_BASE.update(SPACE_ENGINEERING_KB)
+# R3AELERPrompts.update_knowledge(SPACE_ENGINEERING_KB)
 '''
     
     with open(output_file, 'w', encoding='utf-8') as f:
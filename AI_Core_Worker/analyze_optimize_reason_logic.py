@@ -28,37 +28,35 @@ class ReasonLogicAnalyzer:
 
     def analyze_unit_content(self, unit: str) -> Dict[str, Any]:
         """Analyze content patterns in a unit"""
-        conn = self.storage.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        schema = f"{unit}_unit"
-
-        # Get all entries
-        cursor.execute(f"SELECT * FROM {schema}.knowledge ORDER BY created_at DESC")
-        entries = cursor.fetchall()
-
-        # Analyze categories and subcategories
-        cursor.execute(f"""
-            SELECT category, subcategory, COUNT(*) as count,
-                   array_agg(DISTINCT topic) as topics,
-                   array_agg(DISTINCT source) as sources
-            FROM {schema}.knowledge
-            GROUP BY category, subcategory
-            ORDER BY count DESC
-        """)
-        category_analysis = cursor.fetchall()
-
-        # Analyze content themes
-        cursor.execute(f"""
-            SELECT topic, content, category, subcategory
-            FROM {schema}.knowledge
-            WHERE content IS NOT NULL AND length(content) > 100
-            LIMIT 20
-        """)
-        content_samples = cursor.fetchall()
-
-        cursor.close()
-        conn.close()
+        with self.storage.pooled_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            schema = f"{unit}_unit"
+
+            # Get all entries
+            cursor.execute(f"SELECT * FROM {schema}.knowledge ORDER BY created_at DESC")
+            entries = cursor.fetchall()
+
+            # Analyze categories and subcategories
+            cursor.execute(f"""
+                SELECT category, subcategory, COUNT(*) as count,
+                       array_agg(DISTINCT topic) as topics,
+                       array_agg(DISTINCT source) as sources
+                FROM {schema}.knowledge
+                GROUP BY category, subcategory
+                ORDER BY count DESC
+            """)
+            category_analysis = cursor.fetchall()
+
+            # Analyze content themes
+            cursor.execute(f"""
+                SELECT topic, content, category, subcategory
+                FROM {schema}.knowledge
+                WHERE content IS NOT NULL AND length(content) > 100
+                LIMIT 20
+            """)
+            content_samples = cursor.fetchall()
+            cursor.close()
 
         return {
             'unit': unit,
@@ -0,0 +1,469 @@
+"""
+R3AL3R Async Storage Facility
+asyncio serving mode for the storage facility. Serves the same routes with
+the same response shapes as self_hosted_storage_facility.py, but searches
+await an asyncpg pool instead of holding a worker thread while Postgres
+runs, so one process can keep thousands of searches in flight.
+
+Unit configuration, schema setup, the result cache and the write path are
+shared with the Flask facility; writes run on a small thread pool.
+
+    pip install aiohttp asyncpg
+    python async_storage_facility.py --port 3003
+    python run_storage.py --async
+"""
+
+import os
+import re
+import sys
+import json
+import heapq
+import asyncio
+import argparse
+import logging
+from functools import partial
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import asyncpg
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from self_hosted_storage_facility import facility as sync_facility
+from facility_stats import UNIT_STATS_SQL
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ASYNC_POOL_MIN_SIZE = int(os.getenv('R3ALER_ASYNC_DB_POOL_MIN', '5'))
+ASYNC_POOL_MAX_SIZE = int(os.getenv('R3ALER_ASYNC_DB_POOL_MAX', '40'))
+WRITE_WORKERS = int(os.getenv('R3ALER_ASYNC_WRITE_WORKERS', '4'))
+NDJSON_BATCH_SIZE = 5000
+
+_PLACEHOLDER = re.compile(r'%s')
+
+json_dumps = partial(json.dumps, default=str)
+
+
+def to_asyncpg(sql: str) -> str:
+    """Rewrite psycopg2 %s placeholders as asyncpg $1, $2, ..."""
+    counter = iter(range(1, sql.count('%s') + 1))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+
+
+class AsyncStorageFacility:
+    """Async read path over the shared StorageFacility configuration"""
+
+    def __init__(self, facility, pool_min_size: int = ASYNC_POOL_MIN_SIZE,
+                 pool_max_size: int = ASYNC_POOL_MAX_SIZE):
+        self.facility = facility
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool: Optional[asyncpg.Pool] = None
+        self.write_executor = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix='unit-store')
+
+    async def start(self):
+        cfg = self.facility.db_config
+        self.pool = await asyncpg.create_pool(
+            host=cfg['host'], port=cfg['port'], database=cfg['database'],
+            user=cfg['user'], password=cfg['password'],
+            min_size=self.pool_min_size, max_size=self.pool_max_size
+        )
+        logger.info(f"Async pool ready ({self.pool_min_size}-{self.pool_max_size} connections)")
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+        self.write_executor.shutdown(wait=False)
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.write_executor, func, *args)
+
+    async def discover_units(self) -> Dict[str, str]:
+        """Cached unit discovery; a refresh (rare, sync) runs off the event loop"""
+        if self.facility.units_fresh():
+            return self.facility.discover_units()
+        return await self.run_blocking(self.facility.discover_units)
+
+    async def resolve_schema(self, unit_id: str) -> Optional[str]:
+        if unit_id in self.facility.units:
+            return self.facility.units[unit_id]['schema']
+        schema = (await self.discover_units()).get(unit_id)
+        if schema is None:
+            schema = await self.run_blocking(self.facility._resolve_schema, unit_id)
+        return schema
+
+    async def _fetch(self, sql: str, *args, timeout: Optional[float] = None) -> List[Dict]:
+        async with self.pool.acquire() as conn:
+            if timeout is None:
+                rows = await conn.fetch(sql, *args)
+            else:
+                async with conn.transaction():
+                    # Let Postgres cancel the query once the caller has stopped waiting
+                    await conn.execute(f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}")
+                    rows = await conn.fetch(sql, *args)
+        return [dict(row) for row in rows]
+
+    async def search_unit(self, unit_id: str, query: str, limit: int = 10,
+                          raise_errors: bool = False) -> List[Dict]:
+        """Search within a specific storage unit (see StorageFacility.search_unit)"""
+        schema = await self.resolve_schema(unit_id)
+        if schema is None:
+            return []
+        try:
+            return await self._fetch(to_asyncpg(self.facility._unit_search_sql(schema)), query, limit)
+        except Exception as e:
+            print(f"Search error: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    async def _search_unit_tagged(self, unit_id: str, query: str, limit: int,
+                                  timeout: Optional[float] = None) -> List[Dict]:
+        schema = self.facility.units[unit_id]['schema']
+        results = await self._fetch(to_asyncpg(self.facility._unit_search_sql(schema)),
+                                    query, limit, timeout=timeout)
+        for result in results:
+            result['source_unit'] = unit_id
+            result['unit_name'] = self.facility.units[unit_id]['name']
+        return results
+
+    async def fan_out_search(self, query: str, limit_per_unit: int = 3,
+                             max_results: Optional[int] = None,
+                             unit_timeout: Optional[float] = None) -> Dict:
+        """Same contract as StorageFacility.fan_out_search, with one task per unit"""
+        timeout = unit_timeout if unit_timeout is not None else self.facility.unit_search_timeout
+        tasks = {
+            asyncio.ensure_future(self._search_unit_tagged(unit_id, query, limit_per_unit, timeout)): unit_id
+            for unit_id in self.facility.units
+        }
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+        streams = []
+        failed_units = []
+        for task in done:
+            try:
+                streams.append(task.result())
+            except Exception as e:
+                failed_units.append(tasks[task])
+                print(f"Search error in unit {tasks[task]}: {e}")
+
+        timed_out_units = sorted(tasks[task] for task in pending)
+        for task in pending:
+            task.cancel()
+
+        merged = heapq.merge(*streams, key=lambda x: x.get('relevance', 0), reverse=True)
+        if max_results is not None:
+            merged = islice(merged, max_results)
+
+        return {
+            'results': list(merged),
+            'timed_out_units': timed_out_units,
+            'failed_units': sorted(failed_units),
+            'partial': bool(timed_out_units or failed_units)
+        }
+
+    async def union_search(self, query: str, limit_per_unit: Optional[int] = 3,
+                           limit: Optional[int] = None) -> Dict:
+        units = await self.discover_units()
+        if not units:
+            return self.facility._union_search_response([])
+        sql, params = self.facility._union_search_sql(units, query, limit_per_unit, limit)
+        try:
+            rows = await self._fetch(to_asyncpg(sql), *params)
+        except Exception as e:
+            print(f"Search error: {e}")
+            return self.facility._union_search_failed(units)
+        return self.facility._union_search_response(rows)
+
+    async def sequential_search(self, query: str, limit_per_unit: int = 3) -> Dict:
+        """Same contract as StorageFacility.sequential_search"""
+        all_results = []
+        failed_units = []
+        for unit_id in self.facility.units:
+            try:
+                all_results.extend(await self._search_unit_tagged(unit_id, query, limit_per_unit))
+            except Exception as e:
+                failed_units.append(unit_id)
+                print(f"Search error: {e}")
+        all_results.sort(key=lambda x: x.get('relevance', 0), reverse=True)
+        return {'results': all_results, 'failed_units': failed_units, 'partial': bool(failed_units)}
+
+    async def search_all_units_sequential(self, query: str, limit_per_unit: int = 3) -> List[Dict]:
+        return (await self.sequential_search(query, limit_per_unit))['results']
+
+    async def get_facility_status(self) -> Dict:
+        """One read of the materialised unit stats; missing rows are seeded by the sync path"""
+        unit_ids = list(self.facility.units)
+        try:
+            rows = {row['unit_id']: row for row in await self._fetch(to_asyncpg(UNIT_STATS_SQL), unit_ids)}
+        except Exception as e:
+            print(f"Stats error: {e}")
+            rows = {}
+        if len(rows) < len(unit_ids):
+            return await self.run_blocking(self.facility.get_facility_status)
+        return self.facility._facility_status_response({
+            unit_id: self.facility._format_unit_stats(unit_id, rows[unit_id]) for unit_id in unit_ids
+        })
+
+
+def json_response(data, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status, dumps=json_dumps)
+
+
+async def read_json(request: web.Request) -> Dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text=json_dumps({'error': 'Invalid JSON body'}),
+                                 content_type='application/json')
+    return data if isinstance(data, dict) else {}
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/health')
+async def health_check(request):
+    """Health check endpoint"""
+    return json_response({'status': 'healthy', 'facility': 'R3AL3R Storage Facility'})
+
+
+@routes.get('/api/facility/status')
+async def facility_status(request):
+    """Get facility status"""
+    return json_response(await request.app['facility'].get_facility_status())
+
+
+@routes.post('/api/unit/{unit_id}/search')
+async def search_unit(request):
+    """Search a specific unit"""
+    store = request.app['facility']
+    unit_id = request.match_info['unit_id']
+    data = await read_json(request)
+    query = data.get('query', '')
+    limit = data.get('limit', 10)
+
+    cache = store.facility.result_cache
+    use_cache = data.get('cache', True)
+    key = cache.make_key(query, [unit_id], 'unit', limit)
+    results = cache.get(key) if use_cache else None
+    if results is None:
+        versions = cache.versions([unit_id])
+        try:
+            results = await store.search_unit(unit_id, query, limit, raise_errors=True)
+        except Exception:
+            # Not cached: the next request retries the database
+            return json_response({'unit': unit_id, 'query': query, 'results': [], 'error': 'Search failed'})
+        if use_cache:
+            cache.put(key, results, versions)
+    return json_response({
+        'unit': unit_id,
+        'query': query,
+        'results': results
+    })
+
+
+@routes.post('/api/facility/search')
+async def search_facility(request):
+    """Search all units (responses are served from the result cache when fresh)"""
+    store = request.app['facility']
+    data = await read_json(request)
+    query = data.get('query', '')
+    limit_per_unit = data.get('limit_per_unit', 3)
+    max_results = data.get('max_results', 10)
+    mode = data.get('mode', store.facility.search_mode)
+
+    units = await store.discover_units() if mode == 'union' else store.facility.units
+    cache = store.facility.result_cache
+    use_cache = data.get('cache', True)
+    key = cache.make_key(query, units, mode, limit_per_unit, max_results)
+    response = cache.get(key) if use_cache else None
+    if response is not None:
+        return json_response({**response, 'query': query, 'cached': True})
+
+    versions = cache.versions(units)
+    response = await run_facility_search(store, data, query, limit_per_unit, max_results, mode)
+    if use_cache and not response.get('partial'):
+        # Only cache when every unit answered (no timeouts, no failed queries)
+        cache.put(key, response, versions)
+    return json_response({**response, 'cached': False})
+
+
+async def run_facility_search(store, data, query, limit_per_unit, max_results, mode) -> Dict:
+    if mode == 'union':
+        search = await store.union_search(query, limit_per_unit, limit=max_results)
+        return {
+            'query': query,
+            'total_results': search['total_results'],
+            'results': search['results'],
+            'partial': search['partial'],
+            'failed_units': search['failed_units']
+        }
+
+    if mode != 'parallel':
+        search = await store.sequential_search(query, limit_per_unit)
+        results = search['results']
+        return {
+            'query': query,
+            'total_results': len(results),
+            'results': results[:max_results],
+            'partial': search['partial'],
+            'failed_units': search['failed_units']
+        }
+
+    search = await store.fan_out_search(query, limit_per_unit, unit_timeout=data.get('unit_timeout'))
+    results = search['results']
+    return {
+        'query': query,
+        'total_results': len(results),
+        'results': results[:max_results],
+        'partial': search['partial'],
+        'timed_out_units': search['timed_out_units'],
+        'failed_units': search['failed_units']
+    }
+
+
+async def store_ndjson(store, unit_id: str, stream, batch_size: int) -> Dict:
+    """Parse the NDJSON body incrementally and hand batches to the bulk COPY path"""
+    totals = {'stored': 0, 'updated': 0, 'duplicates': 0, 'errors': 0, 'total': 0, 'batches': 0}
+    batch = []
+
+    async def flush():
+        if not batch:
+            return None
+        result = await store.run_blocking(store.facility.bulk_store_knowledge, unit_id, list(batch), batch_size)
+        batch.clear()
+        if 'error' in result:
+            return result
+        for key in totals:
+            totals[key] += result.get(key, 0)
+        return None
+
+    async for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            batch.append(json.loads(line))
+        except ValueError:
+            batch.append(None)  # counted as an error by bulk_store_knowledge
+        if len(batch) >= batch_size:
+            error = await flush()
+            if error:
+                return error
+    error = await flush()
+    return error or {'unit': unit_id, 'mode': 'bulk', **totals}
+
+
+@routes.post('/api/unit/{unit_id}/store')
+async def store_knowledge(request):
+    """Store knowledge in a unit (JSON entries, or NDJSON for bulk ingestion)"""
+    store = request.app['facility']
+    unit_id = request.match_info['unit_id']
+    if request.content_type in ('application/x-ndjson', 'application/jsonl'):
+        batch_size = int(request.query.get('batch_size', NDJSON_BATCH_SIZE))
+        return json_response(await store_ndjson(store, unit_id, request.content, batch_size))
+
+    data = await read_json(request)
+    entries = data.get('entries', [])
+    if data.get('mode') == 'bulk':
+        result = await store.run_blocking(store.facility.bulk_store_knowledge, unit_id, entries)
+    else:
+        result = await store.run_blocking(store.facility.store_knowledge, unit_id, entries)
+    return json_response(result)
+
+
+@routes.get('/api/facility/cache')
+async def search_cache(request):
+    """Search result cache statistics"""
+    return json_response(request.app['facility'].facility.result_cache.get_stats())
+
+
+@routes.delete('/api/facility/cache')
+async def clear_search_cache(request):
+    """Clear the search result cache"""
+    cache = request.app['facility'].facility.result_cache
+    cache.clear()
+    return json_response(cache.get_stats())
+
+
+@web.middleware
+async def cors_middleware(request, handler):
+    """Permissive CORS, matching CORS(app) on the Flask facility"""
+    if request.method == 'OPTIONS':
+        response = web.Response()
+    else:
+        response = await handler(request)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, X-API-Key, X-Session-Token'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, DELETE, OPTIONS'
+    return response
+
+
+@web.middleware
+async def auth_middleware(request, handler):
+    """Same header check as require_auth in self_hosted_storage_facility_secured.py"""
+    if request.method == 'POST' and request.path.startswith('/api/unit/'):
+        if not request.headers.get('X-API-Key') and not request.headers.get('X-Session-Token'):
+            logger.warning(f"Unauthorized access attempt from {request.remote}")
+            return json_response({'error': 'Authentication required', 'code': 'NO_AUTH'}, status=401)
+    return await handler(request)
+
+
+def create_app(facility=None, require_auth: bool = False, pool_min_size: int = ASYNC_POOL_MIN_SIZE,
+               pool_max_size: int = ASYNC_POOL_MAX_SIZE) -> web.Application:
+    middlewares = [cors_middleware] + ([auth_middleware] if require_auth else [])
+    app = web.Application(middlewares=middlewares, client_max_size=64 * 1024 * 1024)
+    app['facility'] = AsyncStorageFacility(facility or sync_facility, pool_min_size, pool_max_size)
+
+    async def on_startup(app):
+        await app['facility'].start()
+
+    async def on_cleanup(app):
+        await app['facility'].close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.add_routes(routes)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='R3AL3R Storage Facility (asyncio server)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3003)
+    parser.add_argument('--pool-min', type=int, default=ASYNC_POOL_MIN_SIZE)
+    parser.add_argument('--pool-max', type=int, default=ASYNC_POOL_MAX_SIZE)
+    parser.add_argument('--require-auth', action='store_true',
+                        help='Require X-API-Key / X-Session-Token on unit search and store')
+    args = parser.parse_args(argv)
+
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
+
+    print("=" * 70)
+    print("R3AL3R AI Storage Facility - ASYNC SERVER (aiohttp + asyncpg)")
+    print("=" * 70)
+    print(f"Starting on: http://{args.host}:{args.port}")
+    print(f"DB pool: {args.pool_min}-{args.pool_max} connections"
+          f"{' (uvloop)' if UVLOOP_AVAILABLE else ''}")
+    print("Press Ctrl+C to stop")
+    print("=" * 70)
+
+    web.run_app(
+        create_app(require_auth=args.require_auth, pool_min_size=args.pool_min, pool_max_size=args.pool_max),
+        host=args.host, port=args.port, print=None
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Content fingerprints for ingestion-time deduplication
+Every knowledge row carries a normalised SHA-256 of its topic + content
+(content_hash) and, optionally, a 64-bit SimHash (simhash) so near-duplicate
+clusters can be found without comparing texts pairwise.
+
+Adding the columns leaves existing (legacy) rows with a NULL content_hash,
+and ingestion only matches new entries against stored hashes, so content
+already in a unit is NOT deduplicated against until `backfill` has run for
+that unit. Dynamic units without the columns are skipped by unit discovery
+until then; the schema change is never made on the request path.
+
+Usage:
+    python content_dedup.py backfill                   # hash rows in every *_unit schema
+    python content_dedup.py backfill physics_unit --simhash
+    python content_dedup.py report [schemas] [--near]  # duplicate clusters per unit
+"""
+
+import re
+import sys
+import json
+import hashlib
+import logging
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from migrate_search_vector import DB_CONFIG, SCHEMA_PATTERN, find_unit_schemas
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3  # words per SimHash feature
+NEAR_DUPLICATE_DISTANCE = 3  # max differing SimHash bits for a near duplicate
+BACKFILL_BATCH_SIZE = 2000
+
+_WHITESPACE = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+_MASK64 = (1 << SIMHASH_BITS) - 1
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Unicode-normalised, case-folded text with whitespace collapsed"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', str(text)).casefold()
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def content_fingerprint(topic: Optional[str], content: Optional[str]) -> str:
+    """SHA-256 over normalised topic and content (identical for cosmetic variants)"""
+    normalized = f"{normalize_text(topic)}\n{normalize_text(content)}"
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def simhash(text: Optional[str]) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles, returned as a signed BIGINT value.
+
+    Texts that differ in a few words land a few bits apart; None for empty text.
+    """
+    words = _WORD.findall(normalize_text(text))
+    if not words:
+        return None
+    if len(words) < SHINGLE_SIZE:
+        features = [' '.join(words)]
+    else:
+        features = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for feature in features
+    ]
+    half = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        mask = 1 << bit
+        if sum(1 for h in hashes if h & mask) > half:
+            fingerprint |= mask
+
+    # Postgres BIGINT is signed
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= (1 << (SIMHASH_BITS - 1)) else fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK64).count('1')
+
+
+def near_duplicate_clusters(signatures: Iterable[Tuple[str, int]],
+                            max_distance: int = NEAR_DUPLICATE_DISTANCE) -> List[List[str]]:
+    """
+    Group (entry_id, simhash) pairs whose signatures are within max_distance bits.
+
+    Signatures are split into max_distance + 1 bands: two signatures that
+    close must agree on at least one whole band, so only entries sharing a
+    band bucket are compared.
+    """
+    items = [(entry_id, sig & _MASK64) for entry_id, sig in signatures if sig is not None]
+    bands = max_distance + 1
+    width = SIMHASH_BITS // bands
+
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        shift = band * width
+        band_mask = ((1 << width) - 1) if band < bands - 1 else (_MASK64 >> shift)
+        buckets = defaultdict(list)
+        for index, (_, sig) in enumerate(items):
+            buckets[(sig >> shift) & band_mask].append(index)
+        for members in buckets.values():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if find(a) != find(b) and hamming_distance(items[a][1], items[b][1]) <= max_distance:
+                        parent[find(a)] = find(b)
+
+    clusters = defaultdict(list)
+    for index, (entry_id, _) in enumerate(items):
+        clusters[find(index)].append(entry_id)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=len, reverse=True)
+
+
+def has_content_hash(cursor, schema: str) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = 'knowledge' AND column_name = 'content_hash'
+    """, (schema,))
+    return cursor.fetchone() is not None
+
+
+def ensure_content_hash(cursor, schema: str) -> bool:
+    """
+    Add the content_hash / simhash columns and the content_hash index to
+    schema.knowledge. Existing rows stay NULL until backfilled.
+
+    Returns True when the columns had to be added. Safe to run repeatedly.
+    """
+    if not SCHEMA_PATTERN.match(schema):
+        raise ValueError(f"Refusing to migrate unexpected schema name: {schema}")
+
+    added = not has_content_hash(cursor, schema)
+    if added:
+        cursor.execute(f"""
+            ALTER TABLE {schema}.knowledge
+            ADD COLUMN IF NOT EXISTS content_hash CHAR(64),
+            ADD COLUMN IF NOT EXISTS simhash BIGINT
+        """)
+
+    # Not UNIQUE: units may already hold duplicates (see the report)
+    cursor.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{schema}_content_hash
+        ON {schema}.knowledge(content_hash)
+    """)
+    return added
+
+
+def find_existing_hashes(cursor, schema: str, hashes: Iterable[str]) -> Dict[str, str]:
+    """content_hash -> entry_id for hashes already stored in the unit (one query)"""
+    hashes = list(set(hashes))
+    if not hashes:
+        return {}
+    cursor.execute(f"""
+        SELECT DISTINCT ON (content_hash) content_hash, entry_id
+        FROM {schema}.knowledge
+        WHERE content_hash = ANY(%s)
+        ORDER BY content_hash, id
+    """, (hashes,))
+    return dict(cursor.fetchall())
+
+
+def backfill_schema(conn, schema: str, with_simhash: bool = False,
+                    batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Fill content_hash (and simhash) for rows that predate the columns"""
+    cursor = conn.cursor()
+    ensure_content_hash(cursor, schema)
+    conn.commit()
+
+    missing = "content_hash IS NULL OR simhash IS NULL" if with_simhash else "content_hash IS NULL"
+    updated = 0
+    last_id = 0
+    while True:
+        cursor.execute(f"""
+            SELECT id, topic, content FROM {schema}.knowledge
+            WHERE id > %s AND ({missing})
+            ORDER BY id
+            LIMIT %s
+        """, (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        values = [
+            (row_id, content_fingerprint(topic, content),
+             simhash(f"{topic or ''} {content or ''}") if with_simhash else None)
+            for row_id, topic, content in rows
+        ]
+        execute_values(cursor, f"""
+            UPDATE {schema}.knowledge AS k
+            SET content_hash = v.content_hash,
+                simhash = COALESCE(v.simhash, k.simhash)
+            FROM (VALUES %s) AS v(id, content_hash, simhash)
+            WHERE k.id = v.id
+        """, values, template="(%s, %s, %s::bigint)")
+        conn.commit()
+
+        updated += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"{schema}: {updated:,} rows fingerprinted")
+
+    cursor.close()
+    return updated
+
+
+def duplicate_report(cursor, schema: str, near: bool = False, limit: int = 50,
+                     max_distance: int = NEAR_DUPLICATE_DISTANCE) -> Dict:
+    """Exact (and optionally near) duplicate clusters already stored in one unit"""
+    cursor.execute(f"""
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE content_hash IS NULL),
+            COUNT(*) FILTER (WHERE content_hash IS NOT NULL)
+                - COUNT(DISTINCT content_hash)
+        FROM {schema}.knowledge
+    """)
+    total, unhashed, duplicate_rows = cursor.fetchone()
+
+    cursor.execute(f"""
+        SELECT content_hash, COUNT(*) AS copies, (array_agg(entry_id ORDER BY id))[1:10]
+        FROM {schema}.knowledge
+        WHERE content_hash IS NOT NULL
+        GROUP BY content_hash
+        HAVING COUNT(*) > 1
+        ORDER BY copies DESC
+        LIMIT %s
+    """, (limit,))
+    exact = [
+        {'content_hash': content_hash, 'copies': copies, 'entry_ids': entry_ids}
+        for content_hash, copies, entry_ids in cursor.fetchall()
+    ]
+
+    report = {
+        'schema': schema,
+        'total_entries': total,
+        'unhashed_entries': unhashed,
+        'duplicate_entries': duplicate_rows,
+        'exact_clusters': exact
+    }
+
+    if near:
+        cursor.execute(f"""
+            SELECT entry_id, simhash FROM {schema}.knowledge
+            WHERE simhash IS NOT NULL
+        """)
+        clusters = near_duplicate_clusters(cursor.fetchall(), max_distance)
+        report['near_duplicate_clusters'] = [
+            {'size': len(cluster), 'entry_ids': cluster[:10]} for cluster in clusters[:limit]
+        ]
+    return report
+
+
+def main(argv: List[str]):
+    command = argv[0] if argv else 'report'
+    schemas = [a for a in argv[1:] if not a.startswith('--')]
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        schemas = schemas or find_unit_schemas(cursor)
+        for schema in schemas:
+            try:
+                if command == 'backfill':
+                    count = backfill_schema(conn, schema, with_simhash='--simhash' in argv)
+                    logger.info(f"[OK] {schema}: {count:,} rows backfilled")
+                else:
+                    ensure_content_hash(cursor, schema)
+                    conn.commit()
+                    print(json.dumps(duplicate_report(cursor, schema, near='--near' in argv), indent=2))
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"[ERROR] {schema}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,145 @@
+"""
+R3AL3R Context Analysis Benchmark
+Per-call latency of R3AELERPrompts.analyze_context with the precomputed
+KnowledgeIndex against the previous implementation (keyword lists rebuilt
+and every KNOWLEDGE_BASE entry lower-cased on each call), plus a check that
+both return the same context.
+
+    python context_analysis_benchmark.py
+    python context_analysis_benchmark.py --iterations 20000 --extra-topics 5000
+"""
+
+import re
+import sys
+import time
+import argparse
+
+from prompts import R3AELERPrompts
+
+MESSAGES = [
+    'what is bitcoin', 'how do I recover a lost wallet with btcrecover',
+    'help me write python code for a database', 'analyze this blockchain transaction',
+    'what separates you from chatgpt and gemini', 'iphone forensics acquisition steps',
+    'explain missouri law on digital evidence', 'hello', 'build a defi exchange',
+    'investigate the extraction of evidence from an android device',
+    'why is free thinking important for ai and cybersecurity research'
+]
+
+
+class LegacyPrompts(R3AELERPrompts):
+    """Baseline: the previous analyze_context(), kept for comparison"""
+
+    @classmethod
+    def analyze_context(cls, user_message, conversation_history=None):
+        message_lower = user_message.lower()
+        context = {
+            "message": user_message,
+            "keywords": [],
+            "domain": None,
+            "intent": None,
+            "complexity": "medium",
+            "relevant_knowledge": [],
+            "available_sources": [],
+            "conversation_flow": conversation_history or []
+        }
+
+        tech_keywords = ['code', 'programming', 'python', 'javascript', 'algorithm', 'function', 'database']
+        crypto_keywords = ['bitcoin', 'cryptocurrency', 'blockchain', 'wallet', 'mining', 'defi', 'exchange']
+        forensics_keywords = ['forensics', 'investigation', 'analysis', 'evidence', 'recovery', 'extraction']
+        mobile_keywords = ['ios', 'iphone', 'android', 'mobile', 'device', 'jailbreak', 'acquisition']
+
+        words = set(re.findall(r'\b\w+\b', message_lower))
+
+        competitive_indicators = ['separates', 'different', 'advantage', 'versus', 'vs', 'compared', 'better', 'unique']
+        ai_competitor_names = ['gemini', 'grok', 'chatgpt', 'claude', 'bard', 'copilot']
+
+        has_competitive_terms = any(term in message_lower for term in competitive_indicators)
+        has_ai_competitors = any(name in message_lower for name in ai_competitor_names)
+
+        if has_competitive_terms and has_ai_competitors:
+            context["domain"] = "ai"
+            context["keywords"].extend(["competitive", "advantage", "ai"])
+
+        if words & set(tech_keywords):
+            context["domain"] = "technology"
+            context["keywords"].extend(list(words & set(tech_keywords)))
+        elif words & set(crypto_keywords):
+            context["domain"] = "cryptocurrency"
+            context["keywords"].extend(list(words & set(crypto_keywords)))
+        elif words & set(forensics_keywords):
+            context["domain"] = "forensics"
+            context["keywords"].extend(list(words & set(forensics_keywords)))
+        elif words & set(mobile_keywords):
+            context["domain"] = "mobile"
+            context["keywords"].extend(list(words & set(mobile_keywords)))
+
+        if any(word in message_lower for word in ['how', 'what', 'why', 'when', 'where']):
+            context["intent"] = "question"
+        elif any(word in message_lower for word in ['help', 'assist', 'support']):
+            context["intent"] = "assistance"
+        elif any(word in message_lower for word in ['analyze', 'examine', 'investigate']):
+            context["intent"] = "analysis"
+        elif any(word in message_lower for word in ['create', 'build', 'generate', 'make']):
+            context["intent"] = "creation"
+
+        for topic, knowledge in cls.KNOWLEDGE_BASE.items():
+            if topic in message_lower or any(keyword in knowledge.lower() for keyword in context["keywords"]):
+                context["relevant_knowledge"].append({"topic": topic, "content": knowledge})
+
+        if context["domain"] == "ai" and "competitive" in context["keywords"]:
+            if "r3aler_competitive_advantage" in cls.KNOWLEDGE_BASE:
+                context["relevant_knowledge"].append({
+                    "topic": "r3aler_competitive_advantage",
+                    "content": cls.KNOWLEDGE_BASE["r3aler_competitive_advantage"]
+                })
+
+        for source in cls.KNOWLEDGE_SOURCES:
+            if context["domain"] and context["domain"] in source["type"]:
+                context["available_sources"].append(source)
+
+        return context
+
+
+def same_context(a, b):
+    """Equal contexts, ignoring the order keywords were collected in (set order)"""
+    return ({**a, "keywords": sorted(a["keywords"])} == {**b, "keywords": sorted(b["keywords"])})
+
+
+def microseconds_per_call(analyze, messages, iterations: int) -> float:
+    for message in messages:
+        analyze(message)  # warm-up (and, for the index, the keyword memo)
+    started = time.perf_counter()
+    for i in range(iterations):
+        analyze(messages[i % len(messages)])
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark R3AL3R prompt context analysis')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--extra-topics', type=int, default=0,
+                        help='Grow the knowledge base with synthetic entries first')
+    args = parser.parse_args(argv)
+
+    R3AELERPrompts.update_knowledge({
+        f"synthetic_topic_{i}": f"Synthetic reference entry {i} on mining and analysis. " * 20
+        for i in range(args.extra_topics)
+    })
+
+    mismatches = [m for m in MESSAGES
+                  if not same_context(LegacyPrompts.analyze_context(m), R3AELERPrompts.analyze_context(m))]
+    if mismatches:
+        print(f"Context mismatch on: {mismatches}")
+        return 1
+
+    print(f"knowledge base: {len(R3AELERPrompts.KNOWLEDGE_BASE)} entries")
+    before = microseconds_per_call(LegacyPrompts.analyze_context, MESSAGES, args.iterations)
+    after = microseconds_per_call(R3AELERPrompts.analyze_context, MESSAGES, args.iterations)
+    print(f"{'analyze_context':<22}{'us per call':>14}")
+    print(f"{'lower() every entry':<22}{before:>14,.1f}")
+    print(f"{'KnowledgeIndex':<22}{after:>14,.1f}   ({before / after:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -206,16 +206,12 @@ class CryptoKnowledgeIngestion:
                     category,
                     subcategory,
                     source,
-                    ts_rank(
-                        to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, '')),
-                        plainto_tsquery('english', %s)
-                    ) as relevance
-                FROM crypto_unit.knowledge
-                WHERE to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, ''))
-                      @@ plainto_tsquery('english', %s)
+                    ts_rank(search_vector, q.query) as relevance
+                FROM crypto_unit.knowledge, plainto_tsquery('english', %s) AS q(query)
+                WHERE search_vector @@ q.query
                 ORDER BY relevance DESC
                 LIMIT %s
-            """, (query, query, limit))
+            """, (query, limit))
             
             results = cursor.fetchall()
             return [dict(row) for row in results]
@@ -8,6 +8,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from typing import List, Dict, Any
 import json
+import db_pool
 
 class CryptoKnowledgeQueryTool:
     """Query tool for cryptocurrency knowledge in R3ALER Storage Facility"""
@@ -22,7 +23,7 @@ class CryptoKnowledgeQueryTool:
         }
     
     def get_connection(self):
-        return psycopg2.connect(**self.db_config)
+        return db_pool.get_connection(self.db_config)
     
     def search_knowledge(self, query: str, limit: int = 10) -> List[Dict]:
         """Full-text search cryptocurrency knowledge"""
@@ -38,16 +39,12 @@ class CryptoKnowledgeQueryTool:
                     category,
                     subcategory,
                     source,
-                    ts_rank(
-                        to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, '')),
-                        plainto_tsquery('english', %s)
-                    ) as relevance
-                FROM crypto_unit.knowledge
-                WHERE to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, ''))
-                      @@ plainto_tsquery('english', %s)
+                    ts_rank(search_vector, q.query) as relevance
+                FROM crypto_unit.knowledge, plainto_tsquery('english', %s) AS q(query)
+                WHERE search_vector @@ q.query
                 ORDER BY relevance DESC
                 LIMIT %s
-            """, (query, query, limit))
+            """, (query, limit))
             
             return [dict(row) for row in cursor.fetchall()]
         finally:
@@ -238,24 +235,24 @@ def pgadmin_query_commands():
         'search_base58': """
             SELECT entry_id, topic, content, category, source
             FROM crypto_unit.knowledge
-            WHERE to_tsvector('english', content || ' ' || topic) @@ plainto_tsquery('english', 'base58')
-            ORDER BY ts_rank(to_tsvector('english', content || ' ' || topic), plainto_tsquery('english', 'base58')) DESC
+            WHERE search_vector @@ plainto_tsquery('english', 'base58')
+            ORDER BY ts_rank(search_vector, plainto_tsquery('english', 'base58')) DESC
             LIMIT 20;
         """,
         
         'search_bitcoin': """
             SELECT entry_id, topic, content, category, source
             FROM crypto_unit.knowledge
-            WHERE to_tsvector('english', content || ' ' || topic) @@ plainto_tsquery('english', 'bitcoin')
-            ORDER BY ts_rank(to_tsvector('english', content || ' ' || topic), plainto_tsquery('english', 'bitcoin')) DESC
+            WHERE search_vector @@ plainto_tsquery('english', 'bitcoin')
+            ORDER BY ts_rank(search_vector, plainto_tsquery('english', 'bitcoin')) DESC
             LIMIT 20;
         """,
         
         'search_cryptography': """
             SELECT entry_id, topic, content, category, source
             FROM crypto_unit.knowledge
-            WHERE to_tsvector('english', content || ' ' || topic) @@ plainto_tsquery('english', 'cryptography')
-            ORDER BY ts_rank(to_tsvector('english', content || ' ' || topic), plainto_tsquery('english', 'cryptography')) DESC
+            WHERE search_vector @@ plainto_tsquery('english', 'cryptography')
+            ORDER BY ts_rank(search_vector, plainto_tsquery('english', 'cryptography')) DESC
             LIMIT 20;
         """,
         
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Shared PostgreSQL Connection Pool
+One pooled connection provider for every Postgres-backed module
+"""
+
+import os
+import time
+import random
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import psycopg2
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+# Per-process sizing (each worker process gets its own pools)
+POOL_MIN_SIZE = int(os.getenv('R3ALER_DB_POOL_MIN', '1'))
+POOL_MAX_SIZE = int(os.getenv('R3ALER_DB_POOL_MAX', '10'))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv('R3ALER_DB_POOL_TIMEOUT', '10'))
+# Idle connections older than this are pinged before being handed out
+HEALTH_CHECK_INTERVAL = float(os.getenv('R3ALER_DB_POOL_HEALTH_INTERVAL', '30'))
+CONNECT_RETRIES = int(os.getenv('R3ALER_DB_CONNECT_RETRIES', '4'))
+CONNECT_BACKOFF_BASE = 0.1  # seconds, doubled on every retry
+CONNECT_BACKOFF_MAX = 2.0
+WAIT_SAMPLES = 1000  # recent checkout waits kept for percentiles
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    """Raised when no pooled connection becomes free before the checkout timeout"""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a psycopg2 connection.
+
+    Behaves like the real connection, except close() hands it back to the
+    pool instead of tearing down the socket, so existing
+    ``conn = get_connection() ... conn.close()`` code needs no changes.
+    """
+
+    __slots__ = ('_conn', '_pool', '_released')
+
+    def __init__(self, conn, pool: 'ConnectionPool'):
+        self._conn = conn
+        self._pool = pool
+        self._released = False
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._conn)
+
+    @property
+    def raw(self):
+        """The underlying psycopg2 connection"""
+        return self._conn
+
+    def __getattr__(self, name):
+        if name in PooledConnection.__slots__:
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        if name in PooledConnection.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # Safety net for code paths that forget to close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Blocking, health-checked connection pool for one database config"""
+
+    def __init__(self, db_config: Dict[str, Any], min_size: int = POOL_MIN_SIZE,
+                 max_size: int = POOL_MAX_SIZE, timeout: float = POOL_CHECKOUT_TIMEOUT):
+        self.db_config = dict(db_config)
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+
+        self._idle = deque()  # (connection, last_used) pairs
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'connect_failures': 0,
+            'health_check_failures': 0
+        }
+        self._wait_times = deque(maxlen=WAIT_SAMPLES)
+
+        for _ in range(self.min_size):
+            try:
+                self._idle.append((self._connect(), time.monotonic()))
+            except psycopg2.Error as e:
+                logger.warning(f"Could not pre-fill connection pool: {e}")
+                break
+
+    def _connect(self):
+        """Open a new connection, retrying with exponential backoff"""
+        delay = CONNECT_BACKOFF_BASE
+        for attempt in range(CONNECT_RETRIES + 1):
+            try:
+                conn = psycopg2.connect(**self.db_config)
+                self._stats['connections_created'] += 1
+                return conn
+            except psycopg2.OperationalError as e:
+                self._stats['connect_failures'] += 1
+                if attempt == CONNECT_RETRIES:
+                    raise
+                logger.warning(f"Database connect failed (attempt {attempt + 1}): {e}")
+                time.sleep(delay + random.uniform(0, delay / 2))
+                delay = min(delay * 2, CONNECT_BACKOFF_MAX)
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        """Cheap local check always, server ping only for long-idle connections"""
+        if conn.closed:
+            return False
+        status = conn.info.transaction_status
+        if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            self._stats['health_check_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        self._stats['connections_discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Check out a healthy connection, waiting if the pool is exhausted"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        with self._cond:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {timeout:.1f}s "
+                        f"(max_size={self.max_size})"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            idle = self._idle.pop() if self._idle else None
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._wait_times.append(time.monotonic() - started)
+
+        # Health check / connect outside the lock
+        try:
+            while idle is not None:
+                conn, last_used = idle
+                if self._is_healthy(conn, last_used):
+                    return PooledConnection(conn, self)
+                self._discard(conn)
+                with self._cond:
+                    idle = self._idle.pop() if self._idle else None
+            return PooledConnection(self._connect(), self)
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for a with-block; it goes back to the pool even if the block raises"""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def release(self, conn):
+        """Return a connection; broken or dirty connections are dropped"""
+        keep = not conn.closed
+        if keep:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                keep = False
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if not keep:
+            self._discard(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waits = sorted(self._wait_times)
+            stats = dict(self._stats)
+            stats.update({
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle)
+            })
+
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(len(waits) * p))] * 1000 if waits else 0.0
+
+        stats['wait_ms'] = {
+            'avg': (sum(waits) / len(waits)) * 1000 if waits else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'max': waits[-1] * 1000 if waits else 0.0,
+            'samples': len(waits)
+        }
+        return stats
+
+
+_pools: Dict[Any, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+_pools_pid = os.getpid()
+
+
+def _pool_key(db_config: Dict[str, Any]):
+    return tuple(sorted((k, str(v)) for k, v in db_config.items()))
+
+
+def get_pool(db_config: Dict[str, Any], **kwargs) -> ConnectionPool:
+    """Get (or lazily create) the process-wide pool for a database config"""
+    global _pools_pid
+    key = _pool_key(db_config)
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # Forked worker: never share sockets with the parent process
+            _pools.clear()
+            _pools_pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_config, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def get_connection(db_config: Dict[str, Any], timeout: Optional[float] = None) -> PooledConnection:
+    """Drop-in replacement for psycopg2.connect(**db_config); close() returns it to the pool"""
+    return get_pool(db_config).getconn(timeout)
+
+
+def connection(db_config: Dict[str, Any], timeout: Optional[float] = None):
+    """``with connection(cfg) as conn:`` - the connection is always returned to the pool"""
+    return get_pool(db_config).connection(timeout)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Stats for every pool in this process, keyed by user@host:port/database"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    stats = {}
+    for pool in pools:
+        cfg = pool.db_config
+        name = f"{cfg.get('user')}@{cfg.get('host')}:{cfg.get('port')}/{cfg.get('database')}"
+        stats[name] = pool.get_stats()
+    return {'pid': os.getpid(), 'pools': stats}
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.closeall()
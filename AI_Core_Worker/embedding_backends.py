@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Pluggable embedding backends for VectorEngine
+
+    openai                 text-embedding-3-small over the network (original behaviour)
+    hashed                 hashed TF-IDF projection: pure NumPy, no model files, no network
+    sentence-transformers  local CPU transformer model (optionally on the ONNX runtime)
+
+Every backend returns float32 row vectors with the same width as the
+embedding column (EMBEDDING_DIMENSIONS), and is created once per process
+by get_backend(). Pick one with R3ALER_EMBEDDING_BACKEND; a column must be
+embedded and queried with the same backend.
+"""
+
+import os
+import re
+import math
+import zlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 1536  # width of the knowledge.embedding vector column
+DEFAULT_BACKEND = os.getenv('R3ALER_EMBEDDING_BACKEND', 'openai')
+MAX_INPUT_CHARS = 8000
+
+_TOKEN = re.compile(r'\w+')
+
+
+def document_text(title: Optional[str], content: Optional[str]) -> str:
+    """Text embedded for a knowledge row; the query side embeds the raw query"""
+    return f"{title or ''} {content or ''}".strip()
+
+
+def fit_dimensions(vectors: np.ndarray, dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """
+    Zero-pad narrower model output to the column width. Padding leaves
+    cosine distances unchanged; truncation would not, so it is refused.
+    """
+    width = vectors.shape[1]
+    if width == dimensions:
+        return vectors
+    if width > dimensions:
+        raise ValueError(f"Model produces {width}-d vectors but the column holds {dimensions}")
+    padded = np.zeros((vectors.shape[0], dimensions), dtype=np.float32)
+    padded[:, :width] = vectors
+    return padded
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingBackend:
+    """Base class: embed() maps a batch of texts to an (n, dimensions) float32 array"""
+
+    name = 'base'
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    @property
+    def model_id(self) -> str:
+        """Identifies the vectors this backend produces (cache keys, bookkeeping)"""
+        return f"{self.name}:{self.dimensions}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_one(self, text: str) -> Optional[np.ndarray]:
+        if not text or not text.strip():
+            return None
+        return self.embed([text])[0]
+
+
+class HashedTfidfBackend(EmbeddingBackend):
+    """
+    Feature-hashed TF-IDF: unigrams and bigrams are hashed (crc32) into
+    `dimensions` signed buckets with sublinear term frequency, weighted by
+    an optional IDF table learned with fit(), then L2-normalised.
+    Deterministic across processes and machines.
+    """
+
+    name = 'hashed'
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, idf_path: Optional[str] = None):
+        super().__init__(dimensions)
+        self.idf = None
+        self.idf_path = idf_path or os.getenv('R3ALER_HASHED_IDF_PATH')
+        if self.idf_path and os.path.exists(self.idf_path):
+            self.idf = np.load(self.idf_path).astype(np.float32)
+            if self.idf.shape != (dimensions,):
+                raise ValueError(f"IDF table {self.idf_path} does not match {dimensions} dimensions")
+
+    @property
+    def model_id(self) -> str:
+        idf = f":idf{zlib.crc32(self.idf.tobytes()):08x}" if self.idf is not None else ''
+        return f"{self.name}:{self.dimensions}{idf}"
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        tokens = _TOKEN.findall(text[:MAX_INPUT_CHARS].lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _hash(self, features: Iterable[str]) -> Dict[int, float]:
+        """Signed bucket -> raw count; the sign comes from a second hash bit"""
+        counts = {}
+        for feature in features:
+            h = zlib.crc32(feature.encode('utf-8'))
+            bucket = h % self.dimensions
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for bucket, count in self._hash(self._features(text or '')).items():
+                if count:
+                    rows.append(row)
+                    cols.append(bucket)
+                    values.append(math.copysign(1.0 + math.log(abs(count)), count))
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if values:
+            matrix[np.asarray(rows), np.asarray(cols)] = np.asarray(values, dtype=np.float32)
+        if self.idf is not None:
+            matrix *= self.idf
+        return l2_normalize(matrix)
+
+    def fit(self, texts: Iterable[str], save_path: Optional[str] = None) -> np.ndarray:
+        """Learn per-bucket IDF weights from a corpus sample"""
+        document_frequency = np.zeros(self.dimensions, dtype=np.float64)
+        documents = 0
+        for text in texts:
+            documents += 1
+            buckets = list(self._hash(self._features(text or '')))
+            document_frequency[buckets] += 1
+        self.idf = (np.log((1 + documents) / (1 + document_frequency)) + 1).astype(np.float32)
+        save_path = save_path or self.idf_path
+        if save_path:
+            np.save(save_path, self.idf)
+        return self.idf
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Local transformer model; batched CPU inference, zero-padded to the column width"""
+
+    name = 'sentence-transformers'
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, model_name: Optional[str] = None,
+                 runtime: Optional[str] = None, batch_size: int = 64):
+        super().__init__(dimensions)
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("sentence-transformers backend requires: pip install sentence-transformers")
+
+        model_name = model_name or os.getenv('R3ALER_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+        runtime = runtime or os.getenv('R3ALER_EMBEDDING_RUNTIME')  # e.g. 'onnx'
+        kwargs = {'device': 'cpu'}
+        if runtime:
+            kwargs['backend'] = runtime
+        self.model = SentenceTransformer(model_name, **kwargs)
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model_name}:{self.dimensions}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            [(text or '')[:MAX_INPUT_CHARS] for text in texts],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        return fit_dimensions(vectors.astype(np.float32), self.dimensions)
+
+
+class OpenAIBackend(EmbeddingBackend):
+    """OpenAI embeddings API; one request per batch"""
+
+    name = 'openai'
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, model: str = 'text-embedding-3-small'):
+        super().__init__(dimensions)
+        import openai
+
+        openai.api_key = os.getenv("OPENAI_API_KEY", "sk-XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX")
+        self.client = openai
+        self.model = model
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model}:{self.dimensions}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        response = self.client.embeddings.create(
+            input=[(text or ' ').strip()[:MAX_INPUT_CHARS] or ' ' for text in texts],
+            model=self.model
+        )
+        vectors = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        return fit_dimensions(vectors, self.dimensions)
+
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'hashed': HashedTfidfBackend,
+    'sentence-transformers': SentenceTransformerBackend,
+}
+
+_backends: Dict[str, EmbeddingBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None, **kwargs) -> EmbeddingBackend:
+    """Process-wide backend instance (models load once)"""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}' (choose from {', '.join(BACKENDS)})")
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = BACKENDS[name](**kwargs)
+            _backends[name] = backend
+            logger.info(f"Embedding backend '{name}' ready ({backend.dimensions} dims)")
+        return backend
+
+
+def to_vector_literal(vector) -> str:
+    """pgvector text form, e.g. '[0.1,0.2]'; bind it with a ::vector cast"""
+    return '[' + ','.join(f"{float(x):.7g}" for x in vector) + ']'
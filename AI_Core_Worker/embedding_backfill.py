@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Bulk embedding backfill for every storage unit
+Walks each unit's knowledge table by keyset pagination (id > last_id),
+embeds whole pages in one backend call inside a process pool, and writes
+each page back with a single UPDATE ... FROM (VALUES ...).
+
+Progress is checkpointed per table as the last id of the longest run of
+finished pages, so a killed backfill resumes where it stopped.
+
+Usage:
+    python embedding_backfill.py                          # rows without an embedding, every *_unit schema
+    python embedding_backfill.py physics_unit crypto_unit
+    python embedding_backfill.py --since 2025-06-01T00:00:00
+    python embedding_backfill.py --since last             # rows changed since the last completed run
+    python embedding_backfill.py --all --backend hashed   # re-embed everything (e.g. after a backend switch)
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from embedding_backends import EMBEDDING_DIMENSIONS, document_text, get_backend, to_vector_literal
+from ingestion_pipeline import Checkpoint
+from migrate_search_vector import DB_CONFIG, SCHEMA_PATTERN, find_unit_schemas
+from vector_index import maintain_vector_index
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 256
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'embedding_backfill_checkpoint.json')
+
+
+def ensure_embedding_column(cursor, schema: str, table: str = 'knowledge',
+                            dimensions: int = EMBEDDING_DIMENSIONS):
+    """pgvector extension + embedding column; safe to run repeatedly"""
+    if not SCHEMA_PATTERN.match(schema):
+        raise ValueError(f"Refusing to migrate unexpected schema name: {schema}")
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    cursor.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN IF NOT EXISTS embedding vector({dimensions})")
+
+
+def parse_since(value: Optional[str], last_completed_run: Optional[str] = None) -> Optional[datetime]:
+    """
+    --since value -> timestamp. 'last' means the start of the previous
+    completed run for the table (None if it has never completed).
+    """
+    if not value:
+        return None
+    if value == 'last':
+        return datetime.fromisoformat(last_completed_run) if last_completed_run else None
+    return datetime.fromisoformat(value)
+
+
+class CompletionTracker:
+    """
+    Pages finish out of order in the pool. The safe resume position is the
+    last id of the longest prefix of finished pages; a failed page is never
+    marked finished, so the checkpoint stays before it and a rerun retries it.
+    """
+
+    def __init__(self, position: int = 0):
+        self.position = position
+        self._pages = deque()  # [last_id, finished] in submission order
+
+    def submitted(self, last_id: int):
+        self._pages.append([last_id, False])
+
+    def finished(self, last_id: int) -> int:
+        for page in self._pages:
+            if page[0] == last_id:
+                page[1] = True
+                break
+        while self._pages and self._pages[0][1]:
+            self.position = self._pages.popleft()[0]
+        return self.position
+
+    @property
+    def pending(self) -> int:
+        return len(self._pages)
+
+
+# ============ WORKERS ============
+# Each pool process holds one backend instance and one connection
+
+_worker = {}
+
+
+def init_worker(backend_name: Optional[str], db_config: Dict):
+    _worker['backend'] = get_backend(backend_name)
+    _worker['conn'] = psycopg2.connect(**db_config)
+
+
+def embed_page(schema: str, table: str, rows: List[Tuple]) -> Tuple[int, int]:
+    """Embed one page of (id, title, content) rows and write it back; returns (last_id, rows)"""
+    conn = _worker['conn']
+    vectors = _worker['backend'].embed([document_text(title, content) for _, title, content in rows])
+    try:
+        with conn.cursor() as cursor:
+            execute_values(cursor, f"""
+                UPDATE {schema}.{table} AS k
+                SET embedding = v.embedding::vector
+                FROM (VALUES %s) AS v(id, embedding)
+                WHERE k.id = v.id
+            """, [(row[0], to_vector_literal(vector)) for row, vector in zip(rows, vectors)],
+                page_size=len(rows))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return rows[-1][0], len(rows)
+
+
+# ============ BACKFILL ============
+
+def _page_sql(schema: str, table: str, mode: str) -> str:
+    if mode == 'all':
+        where = "TRUE"
+    elif mode == 'since':
+        where = "(embedding IS NULL OR updated_at >= %s)"
+    else:
+        where = "embedding IS NULL"
+    return f"""
+        SELECT id, topic, content FROM {schema}.{table}
+        WHERE id > %s AND {where}
+        ORDER BY id
+        LIMIT %s
+    """
+
+
+def backfill_table(schema: str, table: str = 'knowledge', backend: Optional[str] = None,
+                   workers: Optional[int] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                   reembed_all: bool = False, since: Optional[str] = None, reset: bool = False,
+                   build_index: bool = True,
+                   db_config: Dict = DB_CONFIG, checkpoint_path: Optional[str] = CHECKPOINT_PATH) -> Dict:
+    """
+    Embed one table. workers=0 embeds in this process; None uses cpu_count - 1.
+    Returns counts and throughput (rows per second).
+    """
+    workers = max(1, (os.cpu_count() or 2) - 1) if workers is None else workers
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    key = f"{schema}.{table}"
+    state = checkpoint.load(key) if checkpoint else {}
+
+    since_ts = parse_since(since, state.get('last_completed_run'))
+    mode = 'all' if reembed_all else ('since' if since_ts else 'missing')
+    run_filter = f"{mode}:{since_ts.isoformat() if since_ts else ''}"
+    resume = not reset and state.get('filter') == run_filter and not state.get('completed')
+    start_id = state.get('last_id', 0) if resume else 0
+
+    conn = psycopg2.connect(**db_config)
+    cursor = conn.cursor()
+    ensure_embedding_column(cursor, schema, table)
+    cursor.execute("SELECT NOW()")
+    run_started = cursor.fetchone()[0].isoformat()
+    conn.commit()
+
+    stats = {'table': key, 'mode': mode, 'since': since_ts.isoformat() if since_ts else None,
+             'start_id': start_id, 'embedded': 0, 'errors': 0, 'pages': 0}
+    embedded_before = state.get('embedded', 0) if resume else 0
+    tracker = CompletionTracker(start_id)
+
+    def save(completed: bool):
+        if not checkpoint:
+            return
+        new_state = {
+            'filter': run_filter,
+            'last_id': tracker.position,
+            'embedded': embedded_before + stats['embedded'],
+            'completed': completed,
+            'run_started': state.get('run_started') if resume else run_started,
+            'last_completed_run': state.get('last_completed_run'),
+        }
+        if completed:
+            new_state['last_completed_run'] = new_state['run_started']
+        checkpoint.save(key, new_state)
+
+    def on_done(last_id: int, rows: Optional[int], error: Optional[Exception] = None):
+        if error is not None:
+            stats['errors'] += 1
+            logger.error(f"[ERROR] {key} page ending at id {last_id}: {error}")
+            return
+        stats['embedded'] += rows
+        stats['pages'] += 1
+        tracker.finished(last_id)
+        save(False)
+        if stats['pages'] % 20 == 0:
+            elapsed = time.perf_counter() - started
+            logger.info(f"{key}: {stats['embedded']} rows, {stats['embedded'] / elapsed:.1f} rows/s")
+
+    sql = _page_sql(schema, table, mode)
+    pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(backend, db_config)) if workers else None
+    if not pool:
+        init_worker(backend, db_config)
+    in_flight = {}
+    started = time.perf_counter()
+    last_id = start_id
+
+    def drain(block_until: int):
+        while len(in_flight) > block_until:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_last_id = in_flight.pop(future)
+                try:
+                    on_done(*future.result())
+                except Exception as e:
+                    on_done(page_last_id, None, e)
+
+    try:
+        while True:
+            params = (last_id, since_ts, page_size) if mode == 'since' else (last_id, page_size)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            conn.commit()  # end the read transaction; workers write in their own
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            tracker.submitted(last_id)
+
+            if pool:
+                in_flight[pool.submit(embed_page, schema, table, rows)] = last_id
+                drain(workers * 2)
+            else:
+                try:
+                    on_done(*embed_page(schema, table, rows))
+                except Exception as e:
+                    on_done(last_id, None, e)
+        drain(0)
+    finally:
+        if pool:
+            pool.shutdown()
+        cursor.close()
+        conn.close()
+
+    elapsed = time.perf_counter() - started
+    save(stats['errors'] == 0)
+    stats['last_id'] = tracker.position
+    stats['seconds'] = round(elapsed, 2)
+    stats['rows_per_second'] = round(stats['embedded'] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info(f"[OK] {key}: {stats['embedded']} rows in {stats['seconds']}s "
+                f"({stats['rows_per_second']} rows/s, {stats['errors']} failed pages)")
+
+    if build_index and stats['errors'] == 0:
+        # Build the ANN index once the column is filled (or rebuild a stale IVFFlat one)
+        conn = psycopg2.connect(**db_config)
+        try:
+            with conn.cursor() as cursor:
+                stats['index'] = maintain_vector_index(cursor, schema, table)['action']
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"[ERROR] {key} vector index: {e}")
+        finally:
+            conn.close()
+    return stats
+
+
+def run_backfill(tables: Optional[List[Tuple[str, str]]] = None, db_config: Dict = DB_CONFIG, **kwargs) -> Dict:
+    """Backfill every (schema, table); defaults to each *_unit.knowledge"""
+    if tables is None:
+        conn = psycopg2.connect(**db_config)
+        try:
+            tables = [(schema, 'knowledge') for schema in find_unit_schemas(conn.cursor())]
+        finally:
+            conn.close()
+
+    started = time.perf_counter()
+    results = []
+    for schema, table in tables:
+        try:
+            results.append(backfill_table(schema, table, db_config=db_config, **kwargs))
+        except Exception as e:
+            logger.error(f"[ERROR] {schema}.{table}: {e}")
+            results.append({'table': f"{schema}.{table}", 'error': str(e)})
+
+    elapsed = time.perf_counter() - started
+    embedded = sum(r.get('embedded', 0) for r in results)
+    return {
+        'tables': results,
+        'embedded': embedded,
+        'seconds': round(elapsed, 2),
+        'rows_per_second': round(embedded / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backfill knowledge embeddings for every storage unit')
+    parser.add_argument('schemas', nargs='*', help='Unit schemas (default: every *_unit)')
+    parser.add_argument('--table', default='knowledge')
+    parser.add_argument('--backend', help='Embedding backend (default: R3ALER_EMBEDDING_BACKEND)')
+    parser.add_argument('--workers', type=int, help='Embedding processes (0 = in-process)')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--since', help="ISO timestamp, or 'last' for the previous completed run")
+    parser.add_argument('--all', action='store_true', help='Re-embed every row')
+    parser.add_argument('--reset', action='store_true', help='Ignore saved progress')
+    parser.add_argument('--no-index', action='store_true', help='Skip building/maintaining the ANN index')
+    args = parser.parse_args(argv)
+
+    tables = [(schema, args.table) for schema in args.schemas] or None
+    summary = run_backfill(tables, backend=args.backend, workers=args.workers, page_size=args.page_size,
+                           reembed_all=args.all, since=args.since, reset=args.reset,
+                           build_index=not args.no_index)
+    print(f"\nEmbedded {summary['embedded']} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']} rows/s)")
+    return summary
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
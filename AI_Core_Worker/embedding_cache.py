@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Query Embedding Cache
+Two-tier cache for query embeddings, keyed on the normalised text and the
+backend's model id:
+
+    memory  in-process LRU bounded by a byte budget
+    shared  optional tier every worker can read, set with
+            R3ALER_EMBED_CACHE_SHARED = 'sqlite:/path/to/cache.db' (one host)
+                                      | 'postgres' (public.query_embedding_cache)
+
+Vectors are held as raw float32 buffers (4 bytes per dimension) and handed
+out as read-only NumPy views, never as Python lists of floats.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBED_CACHE_MAX_BYTES = int(os.getenv('R3ALER_EMBED_CACHE_MAX_MB', '64')) * 1024 * 1024
+EMBED_CACHE_SHARED = os.getenv('R3ALER_EMBED_CACHE_SHARED', '')
+ENTRY_OVERHEAD = 160  # key string, OrderedDict node and bytes header, per entry
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Whitespace-collapsed text. Case is kept: unlike the full-text search
+    cache, model embeddings can differ by case.
+    """
+    return _WHITESPACE.sub(' ', text or '').strip()
+
+
+def cache_key(text: str, model_id: str) -> str:
+    return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+# ============ SHARED TIERS ============
+# get(key) -> bytes or None; put(key, model_id, buffer)
+
+class SqliteEmbeddingStore:
+    """Local disk file shared by every worker process on this host (WAL mode)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_embedding_cache (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embedding_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put(self, key: str, model_id: str, buffer: bytes):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO query_embedding_cache (key, model_id, vector, created_at) VALUES (?, ?, ?, ?)",
+                (key, model_id, buffer, time.time())
+            )
+            self._conn.commit()
+
+
+class PostgresEmbeddingStore:
+    """public.query_embedding_cache, shared by every worker that reaches the database"""
+
+    TABLE = 'public.query_embedding_cache'
+
+    def __init__(self, db_config: Dict[str, Any]):
+        import db_pool
+
+        self._db_pool = db_pool
+        self.db_config = db_config
+        conn = db_pool.get_connection(db_config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        key CHAR(64) PRIMARY KEY,
+                        model_id VARCHAR(200) NOT NULL,
+                        vector BYTEA NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW()
+                    )
+                """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        conn = self._db_pool.get_connection(self.db_config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT vector FROM {self.TABLE} WHERE key = %s", (key,))
+                row = cursor.fetchone()
+            return bytes(row[0]) if row else None
+        finally:
+            conn.close()
+
+    def put(self, key: str, model_id: str, buffer: bytes):
+        import psycopg2
+
+        conn = self._db_pool.get_connection(self.db_config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    INSERT INTO {self.TABLE} (key, model_id, vector) VALUES (%s, %s, %s)
+                    ON CONFLICT (key) DO NOTHING
+                """, (key, model_id, psycopg2.Binary(buffer)))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def shared_store_from_spec(spec: str, db_config: Optional[Dict[str, Any]] = None):
+    """'' -> None, 'sqlite:<path>' -> SqliteEmbeddingStore, 'postgres' -> PostgresEmbeddingStore"""
+    if not spec:
+        return None
+    if spec.startswith('sqlite:'):
+        return SqliteEmbeddingStore(spec[len('sqlite:'):])
+    if spec == 'postgres':
+        if db_config is None:
+            from migrate_search_vector import DB_CONFIG as db_config
+        return PostgresEmbeddingStore(db_config)
+    raise ValueError(f"Unknown shared embedding cache '{spec}' (use sqlite:<path> or postgres)")
+
+
+# ============ CACHE ============
+
+class EmbeddingCache:
+    """Thread-safe LRU of float32 buffers with a byte budget, in front of an optional shared tier"""
+
+    def __init__(self, max_bytes: int = EMBED_CACHE_MAX_BYTES, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+
+        self._entries = OrderedDict()  # key -> float32 buffer
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'shared_errors': 0
+        }
+
+    def get(self, text: str, model_id: str) -> Optional[np.ndarray]:
+        key = cache_key(text, model_id)
+        with self._lock:
+            buffer = self._entries.get(key)
+            if buffer is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return np.frombuffer(buffer, dtype=np.float32)
+
+        if self.shared is not None:
+            try:
+                buffer = self.shared.get(key)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"Shared embedding cache read failed: {e}")
+            if buffer is not None:
+                self._count('shared_hits')
+                self._remember(key, buffer)
+                return np.frombuffer(buffer, dtype=np.float32)
+
+        self._count('misses')
+        return None
+
+    def put(self, text: str, model_id: str, vector) -> np.ndarray:
+        buffer = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+        key = cache_key(text, model_id)
+        self._remember(key, buffer)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, model_id, buffer)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"Shared embedding cache write failed: {e}")
+        return np.frombuffer(buffer, dtype=np.float32)
+
+    def get_or_embed(self, text: str, backend) -> np.ndarray:
+        """Cached embedding of `text` under `backend`, embedding (and caching) on a miss"""
+        vector = self.get(text, backend.model_id)
+        if vector is None:
+            vector = self.put(text, backend.model_id, backend.embed([normalize_text(text)])[0])
+        return vector
+
+    def _remember(self, key: str, buffer: bytes):
+        size = len(buffer) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = buffer
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted) + ENTRY_OVERHEAD
+                self._stats['evictions'] += 1
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'shared_tier': type(self.shared).__name__ if self.shared is not None else None
+            })
+        lookups = stats['hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache configured from R3ALER_EMBED_CACHE_* (a broken shared tier is logged and skipped)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            shared = None
+            try:
+                shared = shared_store_from_spec(EMBED_CACHE_SHARED)
+            except Exception as e:
+                logger.warning(f"Shared embedding cache disabled: {e}")
+            _cache = EmbeddingCache(shared=shared)
+        return _cache
@@ -11,6 +11,7 @@ from collections import defaultdict
 import json
 import logging
 import statistics
+import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +25,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 class EvolutionEngine:
     """System that evolves and optimizes itself based on performance metrics"""
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: External Data Cache
+Bounded cache for ExternalDataAggregator responses (CoinGecko, NVD, GitHub, ...):
+
+    ttl        per source (SOURCE_TTLS); a fresh entry is returned as is
+    stale      for another ttl * STALE_FACTOR an expired entry is still
+               returned while one background refresh replaces it
+    coalesce   concurrent misses on one key make a single upstream call
+    LRU        at most R3ALER_EXTERNAL_CACHE_MAX_ENTRIES entries in memory
+    shared     optional tier every worker on the host reads before calling
+               upstream, set with R3ALER_EXTERNAL_CACHE_SHARED = 'sqlite:/path/to/cache.db'
+
+Error responses ({'error': ...}) and None are never cached, so a failing
+source is retried on the next request (its circuit breaker still applies).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import inspect
+import logging
+import threading
+import functools
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXTERNAL_CACHE_MAX_ENTRIES = int(os.getenv('R3ALER_EXTERNAL_CACHE_MAX_ENTRIES', '2000'))
+EXTERNAL_CACHE_SHARED = os.getenv('R3ALER_EXTERNAL_CACHE_SHARED', '')
+STALE_FACTOR = float(os.getenv('R3ALER_EXTERNAL_CACHE_STALE_FACTOR', '1.0'))
+DEFAULT_TTL = 300  # seconds
+
+SOURCE_TTLS = {
+    'coingecko': 300,
+    'nvd': 3600,
+    'wikipedia': 86400,
+    'github': 1800,
+    'stackoverflow': 3600,
+    'mitre': 86400,
+    'sec': 3600,
+    'alphavantage': 300
+}
+
+
+def cacheable(value: Any) -> bool:
+    return value is not None and not (isinstance(value, dict) and 'error' in value)
+
+
+class SqliteExternalStore:
+    """Local disk file shared by every worker process on this host (WAL mode)"""
+
+    PRUNE_EVERY = 500  # puts between deletes of entries past every source's stale window
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS external_data_cache (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                value TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fetched_at FROM external_data_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put(self, key: str, source: str, value: Any, fetched_at: float):
+        document = json.dumps(value, default=str)
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO external_data_cache (key, source, value, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at
+            """, (key, source, document, fetched_at))
+            self._puts += 1
+            if self._puts % self.PRUNE_EVERY == 0:
+                max_age = max(list(SOURCE_TTLS.values()) + [DEFAULT_TTL]) * (1 + STALE_FACTOR)
+                self._conn.execute("DELETE FROM external_data_cache WHERE fetched_at < ?",
+                                   (time.time() - max_age,))
+            self._conn.commit()
+
+
+def shared_store_from_spec(spec: str):
+    """'' -> None, 'sqlite:<path>' -> SqliteExternalStore"""
+    if not spec:
+        return None
+    if spec.startswith('sqlite:'):
+        return SqliteExternalStore(spec[len('sqlite:'):])
+    raise ValueError(f"Unknown external cache tier '{spec}' (use sqlite:<path>)")
+
+
+class ExternalDataCache:
+    """Thread-safe TTL + LRU cache with stale-while-revalidate and request coalescing"""
+
+    def __init__(self, max_entries: int = EXTERNAL_CACHE_MAX_ENTRIES, shared=None,
+                 ttls: Optional[Dict[str, float]] = None, stale_factor: float = STALE_FACTOR):
+        self.max_entries = max_entries
+        self.ttls = dict(SOURCE_TTLS if ttls is None else ttls)
+        self.stale_factor = stale_factor
+        self.shared = shared
+
+        self._entries = OrderedDict()  # key -> (value, fetched_at)
+        self._inflight = {}            # key -> Future of the one upstream call in progress
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix='external-refresh')
+
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'upstream_calls': 0,
+            'errors': 0,
+            'evictions': 0
+        }
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    def get_or_fetch(self, source: str, key: str, fetch: Callable[[], Any],
+                     ttl: Optional[float] = None) -> Any:
+        """Cached value for key, calling fetch() upstream only when there is nothing usable"""
+        ttl = self.ttl_for(source) if ttl is None else ttl
+        entry = self._lookup(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < ttl:
+                self._count('hits')
+                return value
+            if age < ttl * (1 + self.stale_factor):
+                self._count('stale_hits')
+                self._refresh(source, key, fetch)
+                return value
+
+        self._count('misses')
+        return self._load(source, key, fetch)
+
+    def _lookup(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.shared is None:
+            return None
+        try:
+            entry = self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"Shared external cache read failed: {e}")
+            return None
+        if entry is not None:
+            self._count('shared_hits')
+            self._remember(key, *entry)
+        return entry
+
+    def _load(self, source: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Call fetch() once per key at a time; concurrent callers wait for that call"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._stats['coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            self._count('upstream_calls')
+            value = fetch()
+            if cacheable(value):
+                self._store(source, key, value)
+            else:
+                self._count('errors')
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, source: str, key: str, fetch: Callable[[], Any]):
+        """Re-fetch a stale key in the background; the stale value stays until it succeeds"""
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._stats['refreshes'] += 1
+
+        def run():
+            try:
+                self._load(source, key, fetch)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {e}")
+        self._refresher.submit(run)
+
+    def _store(self, source: str, key: str, value: Any):
+        fetched_at = time.time()
+        self._remember(key, value, fetched_at)
+        if self.shared is not None:
+            try:
+                self.shared.put(key, source, value, fetched_at)
+            except Exception as e:
+                logger.warning(f"Shared external cache write failed: {e}")
+
+    def _remember(self, key: str, value: Any, fetched_at: float):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, fetched_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'shared': type(self.shared).__name__ if self.shared is not None else None
+            })
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def cached_fetch(source: str):
+    """
+    Decorator for ExternalDataAggregator.fetch_* methods: the call's bound
+    arguments (defaults applied) form the key, and the method body only runs
+    upstream when self.cache has nothing usable for it.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])  # without self
+            key = f"{source}:{method.__name__}:{json.dumps(arguments, sort_keys=True, default=str)}"
+            return self.cache.get_or_fetch(source, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def external_cache_from_env() -> ExternalDataCache:
+    shared = None
+    try:
+        shared = shared_store_from_spec(EXTERNAL_CACHE_SHARED)
+    except Exception as e:
+        logger.error(f"Shared external cache '{EXTERNAL_CACHE_SHARED}' unavailable, using memory only: {e}")
+    return ExternalDataCache(shared=shared)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Materialised storage unit statistics
+Keeps one row per unit in public.facility_unit_stats so facility status is
+a single indexed read instead of COUNT(*) / COUNT(DISTINCT) scans:
+
+- total_entries is bumped by the write path in the same transaction
+- categories / sources (and an exact total) are recounted on a schedule
+- units without a row are seeded from planner estimates
+  (pg_class.reltuples, pg_stats.n_distinct), which cost nothing to read
+
+Usage:
+    python facility_stats.py refresh                # exact recount of every *_unit schema
+    python facility_stats.py refresh physics_unit
+"""
+
+import sys
+import logging
+from typing import Dict, Iterable, List
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from migrate_search_vector import DB_CONFIG, SCHEMA_PATTERN, find_unit_schemas
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+STATS_TABLE = 'public.facility_unit_stats'
+
+# Shared with the async server; parameter is the list of unit ids
+UNIT_STATS_SQL = f"""
+    SELECT
+        unit_id,
+        total_entries,
+        categories,
+        sources,
+        pg_size_pretty(pg_total_relation_size(to_regclass(schema_name || '.knowledge'))) AS size,
+        exact,
+        refreshed_at
+    FROM {STATS_TABLE}
+    WHERE unit_id = ANY(%s)
+"""
+
+
+def ensure_stats_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+            unit_id VARCHAR(100) PRIMARY KEY,
+            schema_name VARCHAR(100) NOT NULL,
+            total_entries BIGINT NOT NULL DEFAULT 0,
+            categories INTEGER NOT NULL DEFAULT 0,
+            sources INTEGER NOT NULL DEFAULT 0,
+            exact BOOLEAN NOT NULL DEFAULT FALSE,
+            refreshed_at TIMESTAMP DEFAULT NOW(),
+            updated_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+
+def _check_schema(schema: str):
+    if not SCHEMA_PATTERN.match(schema):
+        raise ValueError(f"Refusing to read unexpected schema name: {schema}")
+
+
+def seed_unit_stats(cursor, unit_id: str, schema: str):
+    """Insert an estimated row for a unit that has none yet (no table scan)"""
+    _check_schema(schema)
+    cursor.execute(f"""
+        WITH est AS (
+            SELECT GREATEST(c.reltuples, 0) AS rows
+            FROM pg_class c
+            WHERE c.oid = to_regclass(%s)
+        ),
+        distinct_est AS (
+            SELECT attname,
+                   CASE WHEN n_distinct >= 0 THEN n_distinct
+                        ELSE -n_distinct * (SELECT rows FROM est) END AS n
+            FROM pg_stats
+            WHERE schemaname = %s AND tablename = 'knowledge' AND attname IN ('category', 'source')
+        )
+        INSERT INTO {STATS_TABLE} (unit_id, schema_name, total_entries, categories, sources, exact, refreshed_at)
+        SELECT %s, %s,
+               COALESCE((SELECT rows FROM est), 0)::bigint,
+               COALESCE((SELECT n FROM distinct_est WHERE attname = 'category'), 0)::int,
+               COALESCE((SELECT n FROM distinct_est WHERE attname = 'source'), 0)::int,
+               FALSE, NOW()
+        ON CONFLICT (unit_id) DO NOTHING
+    """, (f"{schema}.knowledge", schema, unit_id, schema))
+
+
+def refresh_unit_stats(cursor, unit_id: str, schema: str):
+    """Exact recount for one unit (full scan; run on a schedule, not per request)"""
+    _check_schema(schema)
+    cursor.execute(f"""
+        INSERT INTO {STATS_TABLE} (unit_id, schema_name, total_entries, categories, sources, exact, refreshed_at, updated_at)
+        SELECT %s, %s, COUNT(*), COUNT(DISTINCT category), COUNT(DISTINCT source), TRUE, NOW(), NOW()
+        FROM {schema}.knowledge
+        ON CONFLICT (unit_id) DO UPDATE SET
+            schema_name = EXCLUDED.schema_name,
+            total_entries = EXCLUDED.total_entries,
+            categories = EXCLUDED.categories,
+            sources = EXCLUDED.sources,
+            exact = TRUE,
+            refreshed_at = NOW(),
+            updated_at = NOW()
+    """, (unit_id, schema))
+
+
+def increment_unit_entries(cursor, unit_id: str, inserted: int):
+    """Write-path bump, executed inside the caller's transaction"""
+    if inserted:
+        cursor.execute(f"""
+            UPDATE {STATS_TABLE}
+            SET total_entries = total_entries + %s, updated_at = NOW()
+            WHERE unit_id = %s
+        """, (inserted, unit_id))
+
+
+def fetch_unit_stats(cursor, unit_ids: Iterable[str]) -> Dict[str, Dict]:
+    """Materialised stats for the given units, keyed by unit id"""
+    cursor.execute(UNIT_STATS_SQL, (list(unit_ids),))
+    return {row['unit_id']: dict(row) for row in cursor.fetchall()}
+
+
+def stale_units(cursor, max_age_seconds: float) -> List[str]:
+    """Units whose row is an estimate or older than max_age_seconds"""
+    cursor.execute(f"""
+        SELECT unit_id FROM {STATS_TABLE}
+        WHERE NOT exact OR refreshed_at < NOW() - make_interval(secs => %s)
+    """, (max_age_seconds,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def main(argv: List[str]):
+    schemas = [a for a in argv[1:] if not a.startswith('--')]
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        ensure_stats_table(cursor)
+        conn.commit()
+        for schema in schemas or find_unit_schemas(conn.cursor()):
+            try:
+                refresh_unit_stats(cursor, schema[:-len('_unit')], schema)
+                conn.commit()
+                logger.info(f"[OK] {schema} refreshed")
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"[ERROR] {schema}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    if not sys.argv[1:] or sys.argv[1] != 'refresh':
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1:])
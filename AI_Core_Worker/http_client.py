@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Shared HTTP client
+One pooled requests.Session per process for every inter-service and
+upstream call, instead of module-level requests.get/post (which open a new
+TCP, and TLS, connection per call):
+
+    pools      urllib3 keeps up to R3ALER_HTTP_POOL_SIZE keep-alive
+               connections per host, reused across calls and threads
+    retries    R3ALER_HTTP_RETRIES on connection errors and 502/503/504,
+               with R3ALER_HTTP_BACKOFF exponential backoff; non-idempotent
+               requests (POST) are only retried when they never reached the server
+    timeouts   R3ALER_HTTP_TIMEOUT when a call does not pass its own
+    HTTP/2     R3ALER_HTTP2=1 enables urllib3's HTTP/2 support for TLS hosts
+               that negotiate it (needs the h2 package); plain http stays on
+               HTTP/1.1 keep-alive
+    latency    a histogram per upstream host (see get_latency_stats())
+
+Drop-in: http_client.get(url, ...) / post(url, ...) take the same arguments
+and raise the same requests.exceptions as requests.get / requests.post.
+"""
+
+import os
+import time
+import bisect
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = int(os.getenv('R3ALER_HTTP_POOL_SIZE', '20'))
+HTTP_RETRIES = int(os.getenv('R3ALER_HTTP_RETRIES', '2'))
+HTTP_BACKOFF = float(os.getenv('R3ALER_HTTP_BACKOFF', '0.2'))  # seconds, doubled per retry
+HTTP_TIMEOUT = float(os.getenv('R3ALER_HTTP_TIMEOUT', '10'))
+HTTP2 = os.getenv('R3ALER_HTTP2', '').lower() in ('1', 'true', 'yes')
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus-style upper bounds, in ms)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last bucket is +Inf
+        self.total_ms = 0.0
+        self.errors = 0
+
+    def observe(self, duration_ms: float, error: bool = False):
+        self.counts[bisect.bisect_left(self.buckets, duration_ms)] += 1
+        self.total_ms += duration_ms
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None when empty or past the last bound)"""
+        count = sum(self.counts)
+        if not count:
+            return None
+        rank, seen = q * count, 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            'count': count,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / count, 2) if count else 0.0,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets_ms': {**{str(bound): n for bound, n in zip(self.buckets, self.counts)},
+                           '+Inf': self.counts[-1]}
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _record(upstream: str, duration_ms: float, error: bool):
+    with _histograms_lock:
+        histogram = _histograms.get(upstream)
+        if histogram is None:
+            histogram = _histograms[upstream] = LatencyHistogram()
+        histogram.observe(duration_ms, error)
+
+
+def get_latency_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-upstream (host:port) latency histograms for health/metrics endpoints"""
+    with _histograms_lock:
+        return {upstream: histogram.snapshot() for upstream, histogram in sorted(_histograms.items())}
+
+
+class PooledSession(requests.Session):
+    """requests.Session with pooled, retrying adapters, a default timeout and latency tracking"""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES,
+                 backoff: float = HTTP_BACKOFF, timeout: float = HTTP_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False  # hand the last 5xx response back, as requests.get would
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        upstream = urlsplit(url).netloc or url
+        started = time.perf_counter()
+        error = True
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            _record(upstream, (time.perf_counter() - started) * 1000, error)
+
+
+_session: Optional[PooledSession] = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def _enable_http2():
+    try:
+        import urllib3.http2
+        urllib3.http2.inject_into_urllib3()
+        logger.info("HTTP/2 enabled for TLS upstreams that negotiate it")
+    except Exception as e:
+        logger.warning(f"HTTP/2 requested but unavailable ({e}); using HTTP/1.1 keep-alive")
+
+
+def get_session() -> PooledSession:
+    """The process-wide session; a forked worker builds its own rather than share sockets"""
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            if HTTP2 and _session is None:
+                _enable_http2()
+            _session = PooledSession()
+            _session_pid = os.getpid()
+        return _session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_session().request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_session().request('POST', url, **kwargs)
@@ -12,17 +12,71 @@ Datasets:
 Total: ~2 million code examples
 """
 
+import os
 import psycopg2
 from psycopg2.extras import execute_batch
 import logging
-from datasets import load_dataset
 from datetime import datetime
+from functools import partial
 import json
 import hashlib
 
+from ingestion_pipeline import IngestionPipeline, huggingface_reader, extract_keywords, content_hash
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Progress of each dataset import, so an interrupted run picks up where it stopped
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'codexglue_import_checkpoint.json')
+
+
+# Row transforms run in the pipeline's worker processes, so they live at module level
+def clone_detection_row(example, source, unit_id, language='java'):
+    func1 = example.get('func1', '')
+    func2 = example.get('func2', '')
+    label = example.get('label', False)
+    return (
+        content_hash(func1, func2, label),
+        func1,
+        func2,
+        label,
+        example.get('id1', 0),
+        example.get('id2', 0),
+        language,
+        source,
+        extract_keywords(func1 + " " + func2),
+        unit_id
+    )
+
+
+def code_completion_row(example, source, unit_id, language='java'):
+    input_code = example.get('input', '')
+    completion = example.get('gt', '')  # ground truth
+    return (
+        content_hash(input_code, completion),
+        input_code,
+        completion,
+        language,
+        source,
+        extract_keywords(input_code + " " + completion),
+        unit_id
+    )
+
+
+def cloze_testing_row(example, source, unit_id, language='java'):
+    code = example.get('code', '')
+    target = example.get('target', '')
+    return (
+        content_hash(code, target),
+        code,
+        example.get('mask', ''),
+        target,
+        language,
+        source,
+        extract_keywords(code),
+        unit_id
+    )
+
 
 class CodeXGLUEImporter:
     """Import CodeXGLUE datasets to Storage Facility"""
@@ -201,32 +255,18 @@ class CodeXGLUEImporter:
     
     def extract_keywords(self, code_text: str) -> list:
         """Extract programming keywords from code"""
-        import re
-        
-        # Extract identifiers and keywords
-        identifiers = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', code_text.lower())
-        
-        # Filter common keywords and keep meaningful ones
-        common_words = {'the', 'a', 'an', 'and', 'or', 'if', 'else', 'for', 'while', 'do', 'return'}
-        keywords = [word for word in identifiers if len(word) > 2 and word not in common_words]
-        
-        # Return unique keywords (limit to 50)
-        return list(set(keywords))[:50]
+        return extract_keywords(code_text)
     
     def generate_hash(self, text: str) -> str:
         """Generate SHA-256 hash for deduplication"""
-        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return content_hash(text)
     
-    def import_clone_detection(self, dataset_key: str):
-        """Import clone detection dataset"""
+    def _import_dataset(self, dataset_key: str, table: str, columns: str,
+                        transform, language: str = None) -> int:
+        """Stream one dataset through the shared ingestion pipeline into table"""
         try:
             config = self.datasets_config[dataset_key]
-            logger.info(f"Loading {config['hf_name']}...")
-            
-            dataset = load_dataset(config['hf_name'], split='train')
-            max_import = min(config['max_import'], len(dataset))
-            
-            logger.info(f"Importing {max_import} examples from {dataset_key}")
+            logger.info(f"Streaming {config['hf_name']} (up to {config['max_import']} examples)...")
             
             cursor = self.conn.cursor()
             
@@ -234,275 +274,67 @@ class CodeXGLUEImporter:
             cursor.execute("SELECT unit_id FROM knowledge_units WHERE unit_name = 'code_examples'")
             unit_id = cursor.fetchone()[0]
             
-            batch = []
-            imported = 0
-            duplicates = 0
+            placeholders = ', '.join(['%s'] * len(columns.split(',')))
+            sql = f"""
+                INSERT INTO {table} ({columns})
+                VALUES ({placeholders})
+                ON CONFLICT (code_hash) DO NOTHING
+            """
             
-            for idx in range(max_import):
-                example = dataset[idx]
-                
-                func1 = example.get('func1', '')
-                func2 = example.get('func2', '')
-                label = example.get('label', False)
-                id1 = example.get('id1', 0)
-                id2 = example.get('id2', 0)
-                
-                # Generate unique hash
-                hash_text = f"{func1}{func2}{label}"
-                code_hash = self.generate_hash(hash_text)
-                
-                # Extract keywords from both functions
-                keywords = self.extract_keywords(func1 + " " + func2)
-                
-                batch.append((
-                    code_hash,
-                    func1,
-                    func2,
-                    label,
-                    id1,
-                    id2,
-                    'java',
-                    config['hf_name'],
-                    keywords,
-                    unit_id
-                ))
-                
-                # Execute batch
-                if len(batch) >= config['batch_size']:
-                    try:
-                        execute_batch(
-                            cursor,
-                            """
-                            INSERT INTO code_clone_detection 
-                            (code_hash, func1, func2, is_clone, func1_id, func2_id, language, dataset_source, keywords, unit_id)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (code_hash) DO NOTHING
-                            """,
-                            batch
-                        )
-                        self.conn.commit()
-                        imported += len(batch)
-                        logger.info(f"Imported {imported}/{max_import} clone detection examples")
-                        batch = []
-                    except Exception as e:
-                        self.conn.rollback()
-                        duplicates += len(batch)
-                        logger.warning(f"Batch failed (likely duplicates): {e}")
-                        batch = []
-            
-            # Import remaining
-            if batch:
+            def write_batch(batch):
                 try:
-                    execute_batch(
-                        cursor,
-                        """
-                        INSERT INTO code_clone_detection 
-                        (code_hash, func1, func2, is_clone, func1_id, func2_id, language, dataset_source, keywords, unit_id)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (code_hash) DO NOTHING
-                        """,
-                        batch
-                    )
+                    execute_batch(cursor, sql, batch)
                     self.conn.commit()
-                    imported += len(batch)
+                    return {'stored': len(batch)}
                 except Exception as e:
                     self.conn.rollback()
-                    duplicates += len(batch)
-            
-            logger.info(f"Completed {dataset_key}: {imported} imported, {duplicates} duplicates skipped")
+                    logger.warning(f"Batch failed (likely duplicates): {e}")
+                    return {'errors': len(batch)}
+            
+            stats = IngestionPipeline(
+                f"codexglue_{dataset_key}",
+                huggingface_reader(config['hf_name'], language),
+                write_batch,
+                partial(transform, source=config['hf_name'], unit_id=unit_id, language=language or 'java'),
+                batch_size=config['batch_size'],
+                limit=config['max_import'],
+                checkpoint_path=CHECKPOINT_PATH
+            ).run()
+            
+            imported = stats['stored']
+            logger.info(f"Completed {dataset_key}: {imported} imported, {stats['errors']} duplicates skipped "
+                        f"({stats.get('rows_per_second', 0)} rows/s)")
             return imported
             
         except Exception as e:
             logger.error(f"Failed to import {dataset_key}: {e}")
             return 0
     
+    def import_clone_detection(self, dataset_key: str):
+        """Import clone detection dataset"""
+        return self._import_dataset(
+            dataset_key, 'code_clone_detection',
+            'code_hash, func1, func2, is_clone, func1_id, func2_id, language, dataset_source, keywords, unit_id',
+            clone_detection_row
+        )
+    
     def import_code_completion(self, dataset_key: str):
         """Import code completion dataset"""
-        try:
-            config = self.datasets_config[dataset_key]
-            logger.info(f"Loading {config['hf_name']}...")
-            
-            language = config.get('language_config', 'java')
-            dataset = load_dataset(config['hf_name'], language, split='train')
-            max_import = min(config['max_import'], len(dataset))
-            
-            logger.info(f"Importing {max_import} examples from {dataset_key}")
-            
-            cursor = self.conn.cursor()
-            
-            # Get unit_id
-            cursor.execute("SELECT unit_id FROM knowledge_units WHERE unit_name = 'code_examples'")
-            unit_id = cursor.fetchone()[0]
-            
-            batch = []
-            imported = 0
-            duplicates = 0
-            
-            for idx in range(max_import):
-                example = dataset[idx]
-                
-                input_code = example.get('input', '')
-                completion = example.get('gt', '')  # ground truth
-                
-                # Generate unique hash
-                code_hash = self.generate_hash(input_code + completion)
-                
-                # Extract keywords
-                keywords = self.extract_keywords(input_code + " " + completion)
-                
-                batch.append((
-                    code_hash,
-                    input_code,
-                    completion,
-                    language,
-                    config['hf_name'],
-                    keywords,
-                    unit_id
-                ))
-                
-                # Execute batch
-                if len(batch) >= config['batch_size']:
-                    try:
-                        execute_batch(
-                            cursor,
-                            """
-                            INSERT INTO code_completion 
-                            (code_hash, input_code, completion, language, dataset_source, keywords, unit_id)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (code_hash) DO NOTHING
-                            """,
-                            batch
-                        )
-                        self.conn.commit()
-                        imported += len(batch)
-                        logger.info(f"Imported {imported}/{max_import} code completion examples")
-                        batch = []
-                    except Exception as e:
-                        self.conn.rollback()
-                        duplicates += len(batch)
-                        logger.warning(f"Batch failed: {e}")
-                        batch = []
-            
-            # Import remaining
-            if batch:
-                try:
-                    execute_batch(
-                        cursor,
-                        """
-                        INSERT INTO code_completion 
-                        (code_hash, input_code, completion, language, dataset_source, keywords, unit_id)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (code_hash) DO NOTHING
-                        """,
-                        batch
-                    )
-                    self.conn.commit()
-                    imported += len(batch)
-                except Exception as e:
-                    self.conn.rollback()
-                    duplicates += len(batch)
-            
-            logger.info(f"Completed {dataset_key}: {imported} imported, {duplicates} duplicates skipped")
-            return imported
-            
-        except Exception as e:
-            logger.error(f"Failed to import {dataset_key}: {e}")
-            return 0
+        return self._import_dataset(
+            dataset_key, 'code_completion',
+            'code_hash, input_code, completion, language, dataset_source, keywords, unit_id',
+            code_completion_row,
+            language=self.datasets_config[dataset_key].get('language_config', 'java')
+        )
     
     def import_cloze_testing(self, dataset_key: str):
         """Import cloze testing dataset"""
-        try:
-            config = self.datasets_config[dataset_key]
-            logger.info(f"Loading {config['hf_name']}...")
-            
-            language = config.get('language_config', 'java')
-            dataset = load_dataset(config['hf_name'], language, split='train')
-            max_import = min(config['max_import'], len(dataset))
-            
-            logger.info(f"Importing {max_import} examples from {dataset_key}")
-            
-            cursor = self.conn.cursor()
-            
-            # Get unit_id
-            cursor.execute("SELECT unit_id FROM knowledge_units WHERE unit_name = 'code_examples'")
-            unit_id = cursor.fetchone()[0]
-            
-            batch = []
-            imported = 0
-            duplicates = 0
-            
-            for idx in range(max_import):
-                example = dataset[idx]
-                
-                code = example.get('code', '')
-                masked = example.get('mask', '')
-                target = example.get('target', '')
-                
-                # Generate unique hash
-                code_hash = self.generate_hash(code + target)
-                
-                # Extract keywords
-                keywords = self.extract_keywords(code)
-                
-                batch.append((
-                    code_hash,
-                    code,
-                    masked,
-                    target,
-                    language,
-                    config['hf_name'],
-                    keywords,
-                    unit_id
-                ))
-                
-                # Execute batch
-                if len(batch) >= config['batch_size']:
-                    try:
-                        execute_batch(
-                            cursor,
-                            """
-                            INSERT INTO code_cloze_testing 
-                            (code_hash, code, masked_code, target, language, dataset_source, keywords, unit_id)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (code_hash) DO NOTHING
-                            """,
-                            batch
-                        )
-                        self.conn.commit()
-                        imported += len(batch)
-                        logger.info(f"Imported {imported}/{max_import} cloze testing examples")
-                        batch = []
-                    except Exception as e:
-                        self.conn.rollback()
-                        duplicates += len(batch)
-                        logger.warning(f"Batch failed: {e}")
-                        batch = []
-            
-            # Import remaining
-            if batch:
-                try:
-                    execute_batch(
-                        cursor,
-                        """
-                        INSERT INTO code_cloze_testing 
-                        (code_hash, code, masked_code, target, language, dataset_source, keywords, unit_id)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (code_hash) DO NOTHING
-                        """,
-                        batch
-                    )
-                    self.conn.commit()
-                    imported += len(batch)
-                except Exception as e:
-                    self.conn.rollback()
-                    duplicates += len(batch)
-            
-            logger.info(f"Completed {dataset_key}: {imported} imported, {duplicates} duplicates skipped")
-            return imported
-            
-        except Exception as e:
-            logger.error(f"Failed to import {dataset_key}: {e}")
-            return 0
+        return self._import_dataset(
+            dataset_key, 'code_cloze_testing',
+            'code_hash, code, masked_code, target, language, dataset_source, keywords, unit_id',
+            cloze_testing_row,
+            language=self.datasets_config[dataset_key].get('language_config', 'java')
+        )
     
     def import_all(self):
         """Import all CodeXGLUE datasets"""
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Streaming Dataset Ingestion Pipeline
+Reader -> multiprocessing transform -> batched writer, with resumable checkpoints
+
+    reader     streams (position, record) pairs from Hugging Face iterable
+               datasets, local JSONL or Parquet, or any Python iterable
+    transform  runs in a process pool (keyword extraction, hashing,
+               categorisation); returns an entry or None to skip the record
+    writer     receives ordered batches, e.g. FacilityWriter -> bulk COPY
+
+Stages are connected by bounded queues, so a slow writer throttles the
+transform stage, which in turn stops the reader. After every written batch
+the position of the last record is saved, and a killed load restarts from
+there instead of from row zero.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Record = Tuple[int, Any]  # (source position, raw record)
+
+
+# ============ READERS ============
+# Every reader takes the position to resume from and yields (position, record)
+# in a stable order, so a checkpointed position always means the same row.
+
+def jsonl_reader(path: str) -> Callable[[int], Iterator[Record]]:
+    """Stream a local JSON Lines file (one record per non-empty line)"""
+    def read(start: int = 0) -> Iterator[Record]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for position, line in enumerate(f):
+                if position < start:
+                    continue
+                line = line.strip()
+                if line:
+                    yield position, json.loads(line)
+    return read
+
+
+def parquet_reader(path: str, columns: Optional[List[str]] = None,
+                   batch_rows: int = 1024) -> Callable[[int], Iterator[Record]]:
+    """Stream a local Parquet file row group by row group (requires pyarrow)"""
+    def read(start: int = 0) -> Iterator[Record]:
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        first_row = 0
+        for group in range(parquet.num_row_groups):
+            group_rows = parquet.metadata.row_group(group).num_rows
+            if first_row + group_rows <= start:
+                first_row += group_rows  # whole row group already ingested
+                continue
+            position = first_row
+            for batch in parquet.iter_batches(batch_size=batch_rows, row_groups=[group], columns=columns):
+                for row in batch.to_pylist():
+                    if position >= start:
+                        yield position, row
+                    position += 1
+            first_row += group_rows
+    return read
+
+
+def huggingface_reader(dataset_name: str, config: Optional[str] = None, split: str = 'train',
+                       **load_kwargs) -> Callable[[int], Iterator[Record]]:
+    """Stream a Hugging Face dataset without downloading it in full"""
+    def read(start: int = 0) -> Iterator[Record]:
+        from datasets import load_dataset
+
+        dataset = load_dataset(dataset_name, config, split=split, streaming=True, **load_kwargs)
+        if start:
+            dataset = dataset.skip(start)
+        for position, record in enumerate(dataset, start):
+            yield position, record
+    return read
+
+
+def iterable_reader(records: Iterable[Any]) -> Callable[[int], Iterator[Record]]:
+    """Wrap an in-memory list or generator (positions are its enumeration order)"""
+    def read(start: int = 0) -> Iterator[Record]:
+        return enumerate(islice(records, start, None), start)
+    return read
+
+
+# ============ TRANSFORM HELPERS ============
+# Module-level so they can be pickled into worker processes.
+
+STOPWORDS = {'the', 'a', 'an', 'and', 'or', 'if', 'else', 'for', 'while', 'do', 'return'}
+_IDENTIFIER = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b')
+
+
+def extract_keywords(text: str, limit: int = 50) -> List[str]:
+    """Unique identifiers/words longer than two characters, in first-seen order"""
+    words = (w for w in _IDENTIFIER.findall(text.lower()) if len(w) > 2 and w not in STOPWORDS)
+    return list(islice(dict.fromkeys(words), limit))
+
+
+def content_hash(*parts: Any) -> str:
+    """SHA-256 over the given parts, used for deduplication"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def categorize(text: str, rules: Dict[str, Iterable[str]], default: Optional[str] = None) -> Optional[str]:
+    """First category whose keywords appear in text"""
+    text = text.lower()
+    for category, keywords in rules.items():
+        if any(keyword in text for keyword in keywords):
+            return category
+    return default
+
+
+def _identity(record):
+    return record
+
+
+def _transform_chunk(transform: Callable, chunk: List[Record]) -> Tuple[List[Any], int, int]:
+    """Worker entry point: returns (results, skipped, errors) for one chunk"""
+    results = []
+    skipped = errors = 0
+    for position, record in chunk:
+        try:
+            result = transform(record)
+        except Exception as e:
+            errors += 1
+            if errors <= 3:
+                logger.warning(f"Transform failed at position {position}: {e}")
+            continue
+        if result is None:
+            skipped += 1
+        else:
+            results.append(result)
+    return results, skipped, errors
+
+
+# ============ CHECKPOINTS ============
+
+class Checkpoint:
+    """Small JSON file of per-pipeline progress, written atomically"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read_all(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, name: str) -> Dict:
+        with self._lock:
+            return self._read_all().get(name, {})
+
+    def save(self, name: str, state: Dict):
+        with self._lock:
+            states = self._read_all()
+            states[name] = {**state, 'updated_at': time.time()}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(states, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def clear(self, name: str):
+        with self._lock:
+            states = self._read_all()
+            if states.pop(name, None) is not None:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(states, f, indent=2)
+                os.replace(tmp_path, self.path)
+
+
+# ============ WRITERS ============
+# A writer is any callable taking a list of transformed entries and returning
+# a dict of counts ('stored', 'updated', 'duplicates', 'errors'); missing keys count as 0.
+
+WRITE_COUNTS = ('stored', 'updated', 'duplicates', 'errors')
+
+class FacilityWriter:
+    """Write entries straight into a StorageFacility via the bulk COPY path"""
+
+    def __init__(self, facility, default_unit: Optional[str] = None):
+        self.facility = facility
+        self.default_unit = default_unit
+
+    def __call__(self, entries: List[Dict]) -> Dict:
+        totals = dict.fromkeys(WRITE_COUNTS, 0)
+        for unit, unit_entries in _group_by_unit(entries, self.default_unit).items():
+            result = self.facility.bulk_store_knowledge(unit, unit_entries)
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        return totals
+
+
+class HttpWriter:
+    """Stream entries to a storage facility over HTTP as NDJSON"""
+
+    def __init__(self, storage_url: str, default_unit: Optional[str] = None, timeout: float = 300):
+        import requests
+
+        self.storage_url = storage_url.rstrip('/')
+        self.default_unit = default_unit
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def __call__(self, entries: List[Dict]) -> Dict:
+        totals = dict.fromkeys(WRITE_COUNTS, 0)
+        for unit, unit_entries in _group_by_unit(entries, self.default_unit).items():
+            body = (json.dumps(entry).encode('utf-8') + b'\n' for entry in unit_entries)
+            response = self.session.post(
+                f"{self.storage_url}/api/unit/{unit}/store",
+                data=body,
+                headers={'Content-Type': 'application/x-ndjson'},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            result = response.json()
+            if 'error' in result:
+                raise RuntimeError(result['error'])
+            for key in totals:
+                totals[key] += result.get(key, 0)
+        return totals
+
+
+def _group_by_unit(entries: List[Dict], default_unit: Optional[str]) -> Dict[str, List[Dict]]:
+    by_unit: Dict[str, List[Dict]] = {}
+    for entry in entries:
+        entry = dict(entry)
+        unit = entry.pop('unit', None) or default_unit
+        if unit is None:
+            raise ValueError(f"Entry {entry.get('entry_id', entry.get('id'))} has no target unit")
+        by_unit.setdefault(unit, []).append(entry)
+    return by_unit
+
+
+# ============ PIPELINE ============
+
+class IngestionPipeline:
+    """
+    Run reader -> transform -> writer with bounded buffering between stages.
+
+    Args:
+        name: checkpoint key; reruns with the same name resume where the last run stopped
+        reader: callable(start_position) yielding (position, record) pairs
+        transform: picklable callable(record) -> entry or None; defaults to identity
+        writer: callable(list_of_entries) -> counts dict
+        batch_size: entries handed to the writer per call (and per checkpoint)
+        workers: transform processes; 0 runs transforms inline in this process
+        chunk_size: records sent to a worker per task
+        max_pending_chunks: transform tasks in flight before the reader pauses
+        queue_batches: transformed batches buffered ahead of the writer
+        checkpoint_path: JSON checkpoint file; None disables resuming
+        limit: stop at this source position (absolute, so resuming respects it)
+    """
+
+    def __init__(self, name: str, reader: Callable[[int], Iterator[Record]],
+                 writer: Callable[[List[Any]], Dict], transform: Optional[Callable] = None,
+                 batch_size: int = 1000, workers: Optional[int] = None, chunk_size: int = 200,
+                 max_pending_chunks: Optional[int] = None, queue_batches: int = 4,
+                 checkpoint_path: Optional[str] = None, limit: Optional[int] = None):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.transform = transform or _identity
+        self.batch_size = batch_size
+        self.workers = max(1, (os.cpu_count() or 2) - 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_pending_chunks = max_pending_chunks or max(2, self.workers * 2)
+        self.queue_batches = queue_batches
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        self.limit = limit
+
+    def run(self, reset: bool = False) -> Dict:
+        """Run (or resume) the pipeline and return throughput/count statistics"""
+        if self.checkpoint and reset:
+            self.checkpoint.clear(self.name)
+        state = self.checkpoint.load(self.name) if self.checkpoint else {}
+        start = state.get('position', 0)
+
+        stats = {
+            'name': self.name,
+            'start_position': start,
+            'position': start,
+            'read': 0,
+            'skipped': 0,
+            'transform_errors': 0,
+            'written': 0,
+            **{key: state.get(key, 0) for key in WRITE_COUNTS},
+            'batches': 0,
+            'completed': False
+        }
+        if state.get('completed') and (self.limit is None or start >= self.limit):
+            logger.info(f"[{self.name}] already completed at position {start}; nothing to do")
+            stats['completed'] = True
+            return stats
+
+        started = time.time()
+        write_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_batches)
+        writer_error: List[BaseException] = []
+        writer_thread = threading.Thread(
+            target=self._write_loop, args=(write_queue, stats, writer_error),
+            name=f"{self.name}-writer", daemon=True
+        )
+        writer_thread.start()
+
+        pool = None
+        if self.workers > 0:
+            pool = multiprocessing.get_context().Pool(self.workers)
+
+        try:
+            exhausted = self._read_and_transform(start, pool, write_queue, stats, writer_error)
+        finally:
+            write_queue.put(None)
+            writer_thread.join()
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        if writer_error:
+            raise writer_error[0]
+
+        stats['completed'] = exhausted
+        if self.checkpoint:
+            self._save_checkpoint(stats)
+
+        elapsed = time.time() - started
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['rows_per_second'] = round(stats['read'] / elapsed, 1) if elapsed > 0 else 0.0
+        logger.info(
+            f"[{self.name}] read {stats['read']:,} rows, wrote {stats['written']:,} "
+            f"({stats['rows_per_second']:,} rows/s), position {stats['position']:,}"
+        )
+        return stats
+
+    def _read_and_transform(self, start, pool, write_queue, stats, writer_error) -> bool:
+        """Feed chunks through the transform stage in order; True once the source ran out (not at the limit)"""
+        pending = deque()  # (async result, or inline result tuple, end position)
+        buffered: List[Any] = []
+        buffered_end = start
+
+        def drain_one():
+            nonlocal buffered, buffered_end
+            task, end_position = pending.popleft()
+            results, skipped, errors = task.get() if pool is not None else task
+            stats['skipped'] += skipped
+            stats['transform_errors'] += errors
+            buffered.extend(results)
+            buffered_end = end_position
+            # Batches only close on chunk boundaries, so checkpoints are exact
+            if len(buffered) >= self.batch_size:
+                self._enqueue(write_queue, buffered, end_position, writer_error)
+                buffered = []
+
+        records = iter(self.reader(start))
+        source_done = False
+        hit_limit = False
+        while not source_done and not writer_error:
+            chunk = []
+            source_done = True
+            for position, record in records:
+                if self.limit is not None and position >= self.limit:
+                    hit_limit = True
+                    break
+                chunk.append((position, record))
+                if len(chunk) >= self.chunk_size:
+                    source_done = False
+                    break
+            if not chunk:
+                break
+
+            stats['read'] += len(chunk)
+            if pool is not None:
+                task = pool.apply_async(_transform_chunk, (self.transform, chunk))
+            else:
+                task = _transform_chunk(self.transform, chunk)
+            pending.append((task, chunk[-1][0] + 1))
+
+            # Backpressure: stop reading while too many chunks are in flight
+            while len(pending) >= self.max_pending_chunks:
+                drain_one()
+
+        while pending and not writer_error:
+            drain_one()
+        if not writer_error:
+            # Flush the tail (possibly empty, which still advances the checkpoint)
+            self._enqueue(write_queue, buffered, buffered_end, writer_error)
+        # Stopping at the limit is not the end of the source: a later, larger run must carry on
+        return source_done and not hit_limit and not writer_error
+
+    def _enqueue(self, write_queue, batch, end_position, writer_error):
+        """Blocks while the writer is queue_batches behind (backpressure)"""
+        while not writer_error:
+            try:
+                write_queue.put((list(batch), end_position), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _write_loop(self, write_queue, stats, writer_error):
+        while True:
+            item = write_queue.get()
+            if item is None:
+                return
+            if writer_error:
+                continue  # drain without writing after a failure
+            batch, end_position = item
+            try:
+                result = self.writer(batch) if batch else {}
+            except BaseException as e:
+                logger.error(f"[{self.name}] writer failed before position {end_position}: {e}")
+                writer_error.append(e)
+                continue
+            stats['written'] += len(batch)
+            stats['batches'] += 1 if batch else 0
+            for key in WRITE_COUNTS:
+                stats[key] += (result or {}).get(key, 0)
+            stats['position'] = end_position
+            if self.checkpoint:
+                self._save_checkpoint(stats)
+
+    def _save_checkpoint(self, stats):
+        self.checkpoint.save(self.name, {
+            'position': stats['position'],
+            **{key: stats[key] for key in WRITE_COUNTS},
+            'completed': stats['completed']
+        })
+
+
+def run_pipeline(name: str, reader, writer, transform=None, **kwargs) -> Dict:
+    """One-call helper: build an IngestionPipeline and run it"""
+    reset = kwargs.pop('reset', False)
+    return IngestionPipeline(name, reader, writer, transform, **kwargs).run(reset=reset)
+
+
+__all__ = [
+    'IngestionPipeline', 'run_pipeline', 'Checkpoint',
+    'jsonl_reader', 'parquet_reader', 'huggingface_reader', 'iterable_reader',
+    'FacilityWriter', 'HttpWriter',
+    'extract_keywords', 'content_hash', 'categorize'
+]
@@ -3,18 +3,54 @@ R3ÆLƎR AI: Intelligence Layer
 Wraps Storage Facility with advanced AI capabilities WITHOUT modifying the database
 """
 
-import requests
+import os
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import json
 import hashlib
 from collections import defaultdict
 import re
 
+import http_client
+from external_cache import cached_fetch, external_cache_from_env
+
 logger = logging.getLogger(__name__)
 
+# Storage search and external fetches for one request share this deadline (seconds)
+SEARCH_DEADLINE = float(os.getenv('R3ALER_SEARCH_DEADLINE', '5'))
+FETCH_WORKERS = int(os.getenv('R3ALER_FETCH_WORKERS', '32'))
+
+
+def run_with_deadline(executor: ThreadPoolExecutor, calls: Dict[str, Callable[[], Any]],
+                      timeout: float) -> Tuple[Dict[str, Any], List[str], List[str]]:
+    """
+    Run every call concurrently and wait at most `timeout` seconds overall.
+    Returns (results of the calls that finished, names that timed out,
+    names that raised). Stragglers keep running in the pool and still fill
+    the cache for the next request; their results are just not waited for.
+    """
+    futures = {executor.submit(call): name for name, call in calls.items()}
+    done, pending = wait(futures, timeout=max(0.0, timeout))
+
+    results = {}
+    failed = []
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            failed.append(futures[future])
+            logger.error(f"{futures[future]} fetch failed: {e}")
+
+    timed_out = sorted(futures[future] for future in pending)
+    for future in pending:
+        future.cancel()
+    if timed_out:
+        logger.warning(f"Dropped sources that missed the {timeout:.1f}s deadline: {', '.join(timed_out)}")
+    return results, timed_out, sorted(failed)
+
 # ========== CIRCUIT BREAKER ==========
 class CircuitBreaker:
     """Prevents cascading failures when external services fail"""
@@ -129,17 +165,44 @@ class IntentClassifier:
                 r'\b(alpha vantage|stock)\b.*\b(api|data)\b'
             ]
         }
+        self.compile()
+    
+    def compile(self):
+        """
+        Compile intent_patterns once (call again after changing them). Each
+        intent becomes one alternation, so classify() makes one search per
+        intent, in priority order; the individual patterns are kept for scoring.
+        """
+        self._compiled = [
+            (intent, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)),
+             [re.compile(pattern) for pattern in patterns])
+            for intent, patterns in self.intent_patterns.items()
+        ]
     
     def classify(self, query: str) -> str:
         """Classify query intent"""
         query_lower = query.lower()
         
-        for intent, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, query_lower):
-                    return intent
+        for intent, any_pattern, _ in self._compiled:
+            if any_pattern.search(query_lower):
+                return intent
         
         return 'knowledge_search'  # Default
+    
+    def classify_all(self, query: str) -> List[Tuple[str, float]]:
+        """
+        Every matching intent with a score (the share of its patterns that
+        match), highest first and in priority order among equals. Empty when
+        nothing matches; classify() remains the first match by priority.
+        """
+        query_lower = query.lower()
+        scored = []
+        for intent, any_pattern, patterns in self._compiled:
+            if any_pattern.search(query_lower):
+                matched = sum(1 for pattern in patterns if pattern.search(query_lower))
+                scored.append((intent, round(matched / len(patterns), 4)))
+        scored.sort(key=lambda item: -item[1])  # stable: priority order among equals
+        return scored
 
 
 # ========== EXTERNAL DATA SOURCES ==========
@@ -147,9 +210,10 @@ class ExternalDataAggregator:
     """Fetch live data from external APIs without touching Storage Facility"""
     
     def __init__(self):
-        self.cache = {}  # Simple in-memory cache
-        self.cache_ttl = 300  # 5 minutes
+        self.cache = external_cache_from_env()  # per-source TTL, LRU, optional shared tier
         self.circuit_breakers = {}
+        self.deadline = SEARCH_DEADLINE
+        self.executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='external-fetch')
     
     def get_breaker(self, source_name):
         """Get or create circuit breaker for source"""
@@ -157,30 +221,20 @@ class ExternalDataAggregator:
             self.circuit_breakers[source_name] = CircuitBreaker(fail_max=3, reset_timeout=60)
         return self.circuit_breakers[source_name]
     
+    @cached_fetch('coingecko')
     def fetch_crypto_price(self, symbol='bitcoin'):
         """Fetch live crypto price from CoinGecko (free, no API key)"""
-        cache_key = f'crypto_{symbol}'
-        
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return cached_data
-        
         breaker = self.get_breaker('coingecko')
         
         try:
             def fetch():
                 url = f'https://api.coingecko.com/api/v3/simple/price?ids={symbol}&vs_currencies=usd&include_24hr_change=true'
-                response = requests.get(url, timeout=5)
+                response = http_client.get(url, timeout=5)
                 response.raise_for_status()
                 return response.json()
             
             data = breaker.call(fetch)
             
-            # Cache result
-            self.cache[cache_key] = (data, time.time())
-            
             return {
                 'source': 'CoinGecko',
                 'symbol': symbol,
@@ -196,22 +250,16 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch crypto price: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('nvd')
     def fetch_cve_data(self, search_term='recent'):
         """Fetch recent CVEs from NIST NVD (free, public API)"""
-        cache_key = f'cve_{search_term}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 3600:  # 1 hour cache for CVEs
-                return cached_data
-        
         breaker = self.get_breaker('nvd')
         
         try:
             def fetch():
                 # NVD API v2 (free, no key for basic queries)
                 url = 'https://services.nvd.nist.gov/rest/json/cves/2.0?resultsPerPage=5'
-                response = requests.get(url, timeout=10)
+                response = http_client.get(url, timeout=10)
                 response.raise_for_status()
                 return response.json()
             
@@ -233,7 +281,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -243,21 +290,15 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch CVE data: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('wikipedia')
     def fetch_wikipedia_summary(self, topic):
         """Fetch Wikipedia summary"""
-        cache_key = f'wiki_{topic}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 86400:  # 24 hour cache
-                return cached_data
-        
         breaker = self.get_breaker('wikipedia')
         
         try:
             def fetch():
                 url = f'https://en.wikipedia.org/api/rest_v1/page/summary/{topic}'
-                response = requests.get(url, timeout=5)
+                response = http_client.get(url, timeout=5)
                 response.raise_for_status()
                 return response.json()
             
@@ -271,7 +312,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -281,22 +321,16 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch Wikipedia data: {e}")
             return None
     
+    @cached_fetch('github')
     def fetch_github_repos(self, query, sort='stars', order='desc'):
         """Fetch GitHub repositories based on search query"""
-        cache_key = f'github_{query}_{sort}_{order}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 1800:  # 30 min cache
-                return cached_data
-        
         breaker = self.get_breaker('github')
         
         try:
             def fetch():
                 url = f'https://api.github.com/search/repositories?q={query}&sort={sort}&order={order}&per_page=5'
                 headers = {'Accept': 'application/vnd.github.v3+json'}
-                response = requests.get(url, headers=headers, timeout=10)
+                response = http_client.get(url, headers=headers, timeout=10)
                 response.raise_for_status()
                 return response.json()
             
@@ -322,7 +356,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -332,21 +365,15 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch GitHub data: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('stackoverflow')
     def fetch_stack_overflow(self, query, sort='relevance', order='desc'):
         """Fetch Stack Overflow questions and answers"""
-        cache_key = f'stackoverflow_{query}_{sort}_{order}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 3600:  # 1 hour cache
-                return cached_data
-        
         breaker = self.get_breaker('stackoverflow')
         
         try:
             def fetch():
                 url = f'https://api.stackexchange.com/2.3/search?order={order}&sort={sort}&intitle={query}&site=stackoverflow&pagesize=5'
-                response = requests.get(url, timeout=10)
+                response = http_client.get(url, timeout=10)
                 response.raise_for_status()
                 return response.json()
             
@@ -371,7 +398,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -381,15 +407,9 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch Stack Overflow data: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('mitre')
     def fetch_mitre_attack(self, technique_id=None):
         """Fetch MITRE ATT&CK framework data"""
-        cache_key = f'mitre_{technique_id or "overview"}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 86400:  # 24 hour cache
-                return cached_data
-        
         breaker = self.get_breaker('mitre')
         
         try:
@@ -398,7 +418,7 @@ class ExternalDataAggregator:
                     url = f'https://attack.mitre.org/api/techniques/{technique_id}'
                 else:
                     url = 'https://attack.mitre.org/api/techniques?limit=5'
-                response = requests.get(url, timeout=10)
+                response = http_client.get(url, timeout=10)
                 response.raise_for_status()
                 return response.json()
             
@@ -432,7 +452,6 @@ class ExternalDataAggregator:
                     'timestamp': datetime.now().isoformat()
                 }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -442,15 +461,9 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch MITRE ATT&CK data: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('sec')
     def fetch_sec_filings(self, company_symbol=None, filing_type='10-K'):
         """Fetch SEC EDGAR filings"""
-        cache_key = f'sec_{company_symbol or "recent"}_{filing_type}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 3600:  # 1 hour cache
-                return cached_data
-        
         breaker = self.get_breaker('sec')
         
         try:
@@ -458,14 +471,14 @@ class ExternalDataAggregator:
                 if company_symbol:
                     # Search for specific company
                     url = f'https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={company_symbol}&type={filing_type}&dateb=&owner=exclude&count=5'
-                    response = requests.get(url, timeout=10)
+                    response = http_client.get(url, timeout=10)
                     response.raise_for_status()
                     # Note: This returns HTML, would need parsing for full implementation
                     return {'html_response': response.text[:1000]}
                 else:
                     # Recent filings
                     url = f'https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&CIK=&type={filing_type}&company=&dateb=&owner=include&accno=&state=&country=&SIC=&mycompany=&FilingDate=&filenum=&RSS=1'
-                    response = requests.get(url, timeout=10)
+                    response = http_client.get(url, timeout=10)
                     response.raise_for_status()
                     return {'html_response': response.text[:1000]}
             
@@ -481,7 +494,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -491,16 +503,10 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch SEC EDGAR data: {e}")
             return {'error': str(e)}
     
+    @cached_fetch('alphavantage')
     def fetch_alpha_vantage(self, symbol='IBM', function='TIME_SERIES_DAILY'):
         """Fetch Alpha Vantage stock data (requires API key)"""
         # Note: This would require an API key for full functionality
-        cache_key = f'alphavantage_{symbol}_{function}'
-        
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < 300:  # 5 min cache
-                return cached_data
-        
         breaker = self.get_breaker('alphavantage')
         
         try:
@@ -508,7 +514,7 @@ class ExternalDataAggregator:
                 # Demo API key - replace with real key for production
                 api_key = 'demo'  # Replace with actual API key
                 url = f'https://www.alphavantage.co/query?function={function}&symbol={symbol}&apikey={api_key}'
-                response = requests.get(url, timeout=10)
+                response = http_client.get(url, timeout=10)
                 response.raise_for_status()
                 return response.json()
             
@@ -526,7 +532,6 @@ class ExternalDataAggregator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = (result, time.time())
             return result
             
         except CircuitBreakerError:
@@ -536,53 +541,55 @@ class ExternalDataAggregator:
             logger.error(f"Failed to fetch Alpha Vantage data: {e}")
             return {'error': str(e)}
     
-    def aggregate_data(self, query: str) -> List[Dict[str, Any]]:
+    def fetch_concurrently(self, calls: Dict[str, Callable[[], Any]],
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run fetches in parallel under one deadline; keep the ones that succeeded in time"""
+        results, _, _ = run_with_deadline(self.executor, calls, self.deadline if timeout is None else timeout)
+        return {name: data for name, data in results.items() if data and 'error' not in data}
+    
+    def aggregate_data(self, query: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
         """Aggregate external data based on query content"""
         query_lower = query.lower()
-        results = []
+        calls = {}
         
         # Crypto-related queries
         if any(word in query_lower for word in ['bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'price', 'market']):
-            crypto_data = self.fetch_crypto_price('bitcoin')
-            if crypto_data and 'error' not in crypto_data:
-                results.append(crypto_data)
+            calls['crypto'] = lambda: self.fetch_crypto_price('bitcoin')
         
         # Security/Cybersecurity queries
         if any(word in query_lower for word in ['cve', 'vulnerability', 'exploit', 'security', 'hack']):
-            cve_data = self.fetch_cve_data()
-            if cve_data and 'error' not in cve_data:
-                results.append(cve_data)
+            calls['cve'] = self.fetch_cve_data
         
         # Programming/Development queries
         if any(word in query_lower for word in ['github', 'repository', 'repo', 'code']):
-            github_data = self.fetch_github_repos(query.split()[-1] if len(query.split()) > 1 else 'python')
-            if github_data and 'error' not in github_data:
-                results.append(github_data)
+            term = query.split()[-1] if len(query.split()) > 1 else 'python'
+            calls['github'] = lambda: self.fetch_github_repos(term)
         
         # Programming Q&A queries
         if any(word in query_lower for word in ['how to', 'error', 'problem', 'debug', 'fix']):
-            stack_data = self.fetch_stack_overflow(query)
-            if stack_data and 'error' not in stack_data:
-                results.append(stack_data)
+            calls['stackoverflow'] = lambda: self.fetch_stack_overflow(query)
         
         # Cybersecurity tactics
         if any(word in query_lower for word in ['mitre', 'att&ck', 'technique', 'tactic']):
-            mitre_data = self.fetch_mitre_attack()
-            if mitre_data and 'error' not in mitre_data:
-                results.append(mitre_data)
+            calls['mitre'] = self.fetch_mitre_attack
         
-        return results
+        if not calls:
+            return []
+        fetched = self.fetch_concurrently(calls, timeout)
+        return [fetched[name] for name in calls if name in fetched]  # keep the fixed source order
 
 
 # ========== HYBRID SEARCH ENGINE ==========
 class HybridSearchEngine:
     """Combines Storage Facility (static knowledge) with live external data"""
     
-    def __init__(self, storage_facility_url='http://localhost:5003'):
+    def __init__(self, storage_facility_url='http://localhost:5003', metrics=None):
         self.storage_url = storage_facility_url
         self.intent_classifier = IntentClassifier()
         self.external_data = ExternalDataAggregator()
         self.storage_breaker = CircuitBreaker(fail_max=10, reset_timeout=30)
+        self.metrics = metrics  # optional MetricsCollector for facility cache hits/misses
+        self.request_deadline = SEARCH_DEADLINE  # seconds for storage + external fetches together
     
     def search(self, query: str, user_id: Optional[str] = None, max_results: int = 5) -> Dict[str, Any]:
         """
@@ -595,11 +602,15 @@ class HybridSearchEngine:
         intent = self.intent_classifier.classify(query)
         logger.info(f"Classified query '{query}' as intent: {intent}")
         
-        # 2. Search Storage Facility (your existing 30,657 entries)
-        storage_results = self._search_storage_facility(query, max_results * 2)
+        # 2+3. Search Storage Facility (your existing 30,657 entries) and fetch
+        # external data for the intent (WITHOUT modifying database) concurrently,
+        # under one deadline; anything that misses it is left out of the merge
+        calls = self._external_calls(query, intent)
+        calls['storage_facility'] = lambda: self._search_storage_facility(query, max_results * 2)
+        results, timed_out, _ = run_with_deadline(self.external_data.executor, calls, self.request_deadline)
         
-        # 3. Fetch external data based on intent (WITHOUT modifying database)
-        external_results = self._fetch_external_data(query, intent)
+        storage_results = results.pop('storage_facility', None) or []
+        external_results = {name: data for name, data in results.items() if data and 'error' not in data}
         
         # 4. Merge results
         merged_results = self._merge_results(
@@ -622,8 +633,9 @@ class HybridSearchEngine:
             'results': final_results,
             'response_time_ms': round(response_time, 2),
             'sources': {
-                'storage_facility': True,
-                'external_apis': list(external_results.keys()) if external_results else []
+                'storage_facility': 'storage_facility' not in timed_out,
+                'external_apis': list(external_results.keys()) if external_results else [],
+                'timed_out': timed_out
             }
         }
     
@@ -631,7 +643,7 @@ class HybridSearchEngine:
         """Query existing Storage Facility - NO MODIFICATIONS"""
         try:
             def fetch():
-                response = requests.post(
+                response = http_client.post(
                     f'{self.storage_url}/api/facility/search',
                     json={'query': query, 'limit_per_unit': limit},
                     timeout=5
@@ -640,6 +652,8 @@ class HybridSearchEngine:
                 return response.json()
             
             data = self.storage_breaker.call(fetch)
+            if self.metrics is not None and 'cached' in data:
+                self.metrics.increment('cache_hits' if data['cached'] else 'cache_misses')
             return data.get('results', [])
             
         except CircuitBreakerError:
@@ -649,72 +663,64 @@ class HybridSearchEngine:
             logger.error(f"Storage Facility error: {e}")
             return []
     
-    def _fetch_external_data(self, query: str, intent: str) -> Dict[str, Any]:
+    def _fetch_external_data(self, query: str, intent: str, timeout: Optional[float] = None) -> Dict[str, Any]:
         """Fetch live external data based on intent"""
-        external_data = {}
+        calls = self._external_calls(query, intent)
+        if not calls:
+            return {}
+        return self.external_data.fetch_concurrently(calls, timeout)
+    
+    def _external_calls(self, query: str, intent: str) -> Dict[str, Callable[[], Any]]:
+        """External fetches to make for this intent, keyed by result name (not yet called)"""
+        external = self.external_data
+        calls = {}
         
         if intent == 'crypto_price':
             # Extract crypto symbol
             symbols = ['bitcoin', 'ethereum', 'btc', 'eth']
             for symbol in symbols:
                 if symbol in query.lower():
-                    crypto_data = self.external_data.fetch_crypto_price(symbol)
-                    if crypto_data and 'error' not in crypto_data:
-                        external_data['crypto'] = crypto_data
+                    calls['crypto'] = lambda: external.fetch_crypto_price(symbol)
                     break
         
         elif intent == 'security_vulnerability':
-            cve_data = self.external_data.fetch_cve_data()
-            if cve_data and 'error' not in cve_data:
-                external_data['cve'] = cve_data
+            calls['cve'] = external.fetch_cve_data
         
         elif intent in ['knowledge_search', 'news_trends']:
             # Extract main topic
             topic = self._extract_topic(query)
             if topic:
-                wiki_data = self.external_data.fetch_wikipedia_summary(topic)
-                if wiki_data:
-                    external_data['wikipedia'] = wiki_data
+                calls['wikipedia'] = lambda: external.fetch_wikipedia_summary(topic)
         
         elif intent == 'code_repository':
             # Extract search terms for GitHub
             search_terms = self._extract_code_terms(query)
             if search_terms:
-                github_data = self.external_data.fetch_github_repos(search_terms)
-                if github_data and 'error' not in github_data:
-                    external_data['github'] = github_data
+                calls['github'] = lambda: external.fetch_github_repos(search_terms)
         
         elif intent == 'programming_qa':
             # Extract programming question terms
             qa_terms = self._extract_qa_terms(query)
             if qa_terms:
-                so_data = self.external_data.fetch_stack_overflow(qa_terms)
-                if so_data and 'error' not in so_data:
-                    external_data['stackoverflow'] = so_data
+                calls['stackoverflow'] = lambda: external.fetch_stack_overflow(qa_terms)
         
         elif intent == 'cybersecurity_tactics':
             # Check if specific technique ID mentioned
             technique_id = self._extract_technique_id(query)
-            mitre_data = self.external_data.fetch_mitre_attack(technique_id)
-            if mitre_data and 'error' not in mitre_data:
-                external_data['mitre'] = mitre_data
+            calls['mitre'] = lambda: external.fetch_mitre_attack(technique_id)
         
         elif intent == 'financial_filings':
             # Extract company symbol or filing type
             company_symbol = self._extract_company_symbol(query)
-            sec_data = self.external_data.fetch_sec_filings(company_symbol)
-            if sec_data and 'error' not in sec_data:
-                external_data['sec'] = sec_data
+            calls['sec'] = lambda: external.fetch_sec_filings(company_symbol)
         
         elif intent == 'stock_market_data':
             # Extract stock symbol
             stock_symbol = self._extract_stock_symbol(query)
             if stock_symbol:
-                av_data = self.external_data.fetch_alpha_vantage(stock_symbol)
-                if av_data and 'error' not in av_data:
-                    external_data['alphavantage'] = av_data
+                calls['alphavantage'] = lambda: external.fetch_alpha_vantage(stock_symbol)
         
-        return external_data
+        return calls
     
     def _extract_topic(self, query: str) -> Optional[str]:
         """Extract main topic from query"""
@@ -961,9 +967,9 @@ class IntelligenceLayer:
     """
     
     def __init__(self, storage_facility_url='http://localhost:5003'):
-        self.hybrid_search = HybridSearchEngine(storage_facility_url)
-        self.security = SecurityCore()
         self.metrics = MetricsCollector()
+        self.hybrid_search = HybridSearchEngine(storage_facility_url, metrics=self.metrics)
+        self.security = SecurityCore()
         
         logger.info("Intelligence Layer initialized (Storage Facility preserved)")
     
@@ -1024,7 +1030,9 @@ class IntelligenceLayer:
         return {
             'status': 'healthy' if not self.security.kill_switch_active else 'locked',
             'metrics': self.metrics.get_stats(),
-            'circuit_breakers': circuit_breakers
+            'circuit_breakers': circuit_breakers,
+            'external_cache': self.hybrid_search.external_data.cache.get_stats(),
+            'http_latency': http_client.get_latency_stats()
         }
     
     def classify_intent(self, query: str) -> str:
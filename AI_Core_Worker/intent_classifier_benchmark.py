@@ -0,0 +1,75 @@
+"""
+R3AL3R Intent Classifier Benchmark
+Classifications per second for the compiled IntentClassifier against the
+previous implementation (one re.search per pattern, through the re module
+cache, on every call), plus a check that both pick the same intent.
+
+    python intent_classifier_benchmark.py
+    python intent_classifier_benchmark.py --iterations 200000 --all
+"""
+
+import re
+import sys
+import time
+import argparse
+
+from intelligence_layer import IntentClassifier
+
+QUERIES = [
+    'what is the price of bitcoin today', 'how much is ethereum worth',
+    'latest cve vulnerability in openssl', 'write a python function to sort a list',
+    'best tool for network scanning', 'react vs vue which is better',
+    'what is happening in space exploration', 'explain quantum entanglement',
+    'find github repo for flask auth', 'how to fix this error in my python script',
+    'mitre att&ck technique for lateral movement', 'AAPL 10-K filing',
+    'stock market data api for technical analysis', 'hello there', 'why is the sky blue',
+    'tell me about black holes and general relativity in plain words please'
+]
+
+
+class LegacyIntentClassifier(IntentClassifier):
+    """Baseline: the previous classify(), kept for comparison"""
+
+    def classify(self, query: str) -> str:
+        query_lower = query.lower()
+        for intent, patterns in self.intent_patterns.items():
+            for pattern in patterns:
+                if re.search(pattern, query_lower):
+                    return intent
+        return 'knowledge_search'
+
+
+def classifications_per_second(classify, queries, iterations: int) -> float:
+    for query in queries:
+        classify(query)  # warm-up
+    started = time.perf_counter()
+    for i in range(iterations):
+        classify(queries[i % len(queries)])
+    return iterations / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the R3AL3R intent classifier')
+    parser.add_argument('--iterations', type=int, default=100000)
+    parser.add_argument('--all', action='store_true', help='Also time classify_all (scored, every intent)')
+    args = parser.parse_args(argv)
+
+    legacy, compiled = LegacyIntentClassifier(), IntentClassifier()
+    mismatches = [q for q in QUERIES if legacy.classify(q) != compiled.classify(q)]
+    if mismatches:
+        print(f"Intent mismatch on: {mismatches}")
+        return 1
+
+    before = classifications_per_second(legacy.classify, QUERIES, args.iterations)
+    after = classifications_per_second(compiled.classify, QUERIES, args.iterations)
+    print(f"{'classifier':<22}{'per second':>14}")
+    print(f"{'re.search per pattern':<22}{before:>14,.0f}")
+    print(f"{'compiled':<22}{after:>14,.0f}   ({after / before:.1f}x)")
+    if args.all:
+        scored = classifications_per_second(compiled.classify_all, QUERIES, args.iterations)
+        print(f"{'classify_all':<22}{scored:>14,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
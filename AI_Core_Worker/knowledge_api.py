@@ -44,6 +44,7 @@ logger = logging.getLogger(__name__)
 sys.path.append(os.path.dirname(__file__))
 
 from prompts import R3AELERPrompts
+import http_client
 
 # Import AI Intelligence Modules
 try:
@@ -52,6 +53,7 @@ try:
     from recommendation_engine import RecommendationEngine
     from self_learning_engine import SelfLearningEngine
     from evolution_engine import EvolutionEngine
+    import db_pool
     AI_MODULES_LOADED = True
     logger.info("AI Intelligence Modules Loaded Successfully")
 except ImportError as e:
@@ -177,7 +179,8 @@ def make_secure_storage_request(endpoint, json_data, timeout=None):
         if STORAGE_FACILITY_CERT and os.path.exists(STORAGE_FACILITY_CERT):
             request_kwargs['verify'] = STORAGE_FACILITY_CERT
         
-        response = requests.post(url, **request_kwargs)
+        # Pooled keep-alive session: no new TCP/TLS handshake per user query
+        response = http_client.post(url, **request_kwargs)
         return response
         
     except requests.exceptions.SSLError as e:
@@ -440,18 +443,11 @@ def search_legacy_knowledge(query: str, max_passages: int, max_chars: int):
     local_results = []
     passages = []
     
-    for key, value in R3AELERPrompts.KNOWLEDGE_BASE.items():
-        if isinstance(value, dict):
-            topic = str(value.get('topic', key))[:100]
-            content = str(value.get('content', ''))
-            category = str(value.get('category', ''))[:50]
-        else:
-            topic = str(key)[:100]
-            content = str(value)
-            category = 'General'
-        
-        if q in topic.lower() or q in content.lower():
-            passage_text = content[:max_chars]
+    # Topic and content are lower-cased once, when the index is built
+    for entry in R3AELERPrompts.knowledge_index().entries:
+        if q in entry.topic_lower or q in entry.content_lower:
+            key, topic, category = entry.key, entry.topic, entry.category
+            passage_text = entry.content[:max_chars]
             
             passages.append({
                 'text': passage_text,
@@ -563,6 +559,20 @@ def health_check():
         }
     }), 200
 
+@app.route('/api/db/pool/stats', methods=['GET'])
+@require_auth
+def db_pool_stats():
+    """Connection pool sizing and checkout wait times for this process"""
+    if not AI_MODULES_LOADED:
+        return jsonify({'success': False, 'error': 'AI modules not loaded'}), 503
+    return jsonify({'success': True, **db_pool.get_pool_stats()}), 200
+
+@app.route('/api/http/stats', methods=['GET'])
+@require_auth
+def http_stats():
+    """Latency histograms for this process's outbound HTTP calls, per upstream"""
+    return jsonify({'success': True, 'upstreams': http_client.get_latency_stats()}), 200
+
 @app.errorhandler(429)
 def ratelimit_handler(e):
     """Handle rate limit exceeded"""
@@ -3,28 +3,271 @@ Memory Manager for R3ÆLƎR AI
 Advanced memory management with short-term and long-term memory capabilities
 """
 
+import os
+import sys
+import atexit
 import logging
+import math
 import time
 import json
 import hashlib
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import heapq
+from array import array
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, FrozenSet, Iterable
+from datetime import datetime
 from collections import defaultdict, deque
 import threading
 
+import numpy as np
+
+from memory_store import MEMORY_STORE, memory_store_from_spec
+
 logger = logging.getLogger(__name__)
 
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Lower-cased whitespace token set used for Jaccard relevance (tokens interned)"""
+    return frozenset(map(sys.intern, text.lower().split()))
+
+
+def _epoch_ms(iso_timestamp: Optional[str]) -> int:
+    if not iso_timestamp:
+        return int(time.time() * 1000)
+    return round(datetime.fromisoformat(iso_timestamp).timestamp() * 1000)
+
+
+def _iso(epoch_ms: int) -> str:
+    seconds, millis = divmod(epoch_ms, 1000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=millis * 1000).isoformat()
+
+
+class Interaction:
+    """
+    One query/response turn. A single instance is shared by reference
+    between conversation history, short-term and long-term memory; the
+    owning partition supplies user_id, so it is not stored per turn.
+    Read access by key (interaction['query']) is kept for existing callers.
+    """
+
+    __slots__ = ('timestamp', 'query', 'response')
+
+    def __init__(self, query: str, response: str, timestamp: Optional[int] = None):
+        self.timestamp = int(time.time() * 1000) if timestamp is None else timestamp  # epoch ms
+        self.query = sys.intern(query)  # repeated questions share one string
+        self.response = response
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return _iso(self.timestamp) if key == 'timestamp' else getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self, user_id: str) -> Dict[str, Any]:
+        return {'timestamp': _iso(self.timestamp), 'query': self.query,
+                'response': self.response, 'user_id': user_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Interaction':
+        return cls(data.get('query', ''), data.get('response', ''), _epoch_ms(data.get('timestamp')))
+
+
+class LongTermMemory:
+    """A promoted interaction (a reference, not a copy) plus its access statistics"""
+
+    __slots__ = ('interaction', 'promoted_at', 'access_count', 'last_access')
+
+    def __init__(self, interaction: Interaction, promoted_at: Optional[int] = None,
+                 access_count: int = 0, last_access: Optional[int] = None):
+        self.interaction = interaction
+        self.promoted_at = int(time.time() * 1000) if promoted_at is None else promoted_at
+        self.access_count = access_count
+        self.last_access = last_access  # epoch ms, None until first accessed
+
+    def to_dict(self, user_id: str) -> Dict[str, Any]:
+        data = {**self.interaction.to_dict(user_id), 'promoted_at': _iso(self.promoted_at),
+                'access_count': self.access_count}
+        if self.last_access is not None:
+            data['last_access'] = _iso(self.last_access)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], interaction: Interaction) -> 'LongTermMemory':
+        last_access = data.get('last_access')
+        return cls(interaction, _epoch_ms(data.get('promoted_at')), data.get('access_count', 0),
+                   _epoch_ms(last_access) if last_access else None)
+
+
+class ShortTermIndex:
+    """
+    One user's short-term memories with cached token sets and a small
+    inverted index (term -> interaction ids). Writers must be serialised by
+    the caller; lookups are safe to run alongside a writer. Token sets are
+    kept as tuples of interned strings, a fraction of a frozenset's size.
+
+    Jaccard(q, d) > t needs |q & d| > t * |q|, so d must contain at least one
+    of the |q| - ceil(t * |q|) + 1 rarest query terms. Only postings of those
+    terms are read, and only the resulting candidates are scored, so lookup
+    cost follows the number of matching interactions, not history length.
+    """
+
+    def __init__(self, maxlen: int, interactions: Iterable[Dict] = ()):
+        self.maxlen = maxlen
+        self._order = deque()           # interaction ids, oldest first
+        self._interactions = {}         # id -> interaction
+        self._text_tokens = {}          # id -> tuple of distinct tokens of query + response
+        self._query_tokens = {}         # id -> tuple of distinct tokens of query
+        # term -> int64 array of ids; ids only grow and leave oldest first, so each stays sorted
+        self._text_postings = defaultdict(lambda: array('q'))
+        self._query_postings = defaultdict(lambda: array('q'))
+        self._next_id = 0
+
+        for interaction in interactions:
+            self.append(interaction)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self):
+        """Interactions, oldest first"""
+        return (self._interactions[item_id] for item_id in list(self._order))
+
+    def append(self, interaction):
+        item_id = self._next_id
+        self._next_id += 1
+
+        query = interaction.get('query', '')
+        text_tokens = tokenize(query + " " + interaction.get('response', ''))
+        query_tokens = tokenize(query)
+
+        self._order.append(item_id)
+        self._interactions[item_id] = interaction
+        self._text_tokens[item_id] = tuple(text_tokens)
+        self._query_tokens[item_id] = tuple(query_tokens)
+        for term in text_tokens:
+            self._text_postings[term].append(item_id)
+        for term in query_tokens:
+            self._query_postings[term].append(item_id)
+
+        while len(self._order) > self.maxlen:
+            self._evict(self._order.popleft())
+
+    def _evict(self, item_id: int):
+        del self._interactions[item_id]
+        for tokens, postings in ((self._text_tokens.pop(item_id), self._text_postings),
+                                 (self._query_tokens.pop(item_id), self._query_postings)):
+            for term in tokens:
+                ids = postings[term]
+                del ids[0]  # the oldest id in every list it appears in
+                if not ids:
+                    del postings[term]
+
+    @staticmethod
+    def _scores(query_tokens: FrozenSet[str], postings: Dict, token_sets: Dict,
+                threshold: float):
+        """(candidate ids, Jaccard scores) for every interaction that could exceed threshold"""
+        if not query_tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        by_rarity = sorted(query_tokens, key=lambda term: len(postings.get(term, ())))
+        prefix = len(query_tokens) - math.ceil(threshold * len(query_tokens)) + 1
+        candidates = set()
+        for term in by_rarity[:max(1, prefix)]:
+            candidates.update(postings.get(term, ()))
+        if not candidates:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # .get(): a concurrent writer may have evicted a candidate since the postings were read
+        found = [(item_id, token_sets.get(item_id)) for item_id in candidates]
+        found = [(item_id, tokens) for item_id, tokens in found if tokens is not None]
+        ids = np.fromiter((item_id for item_id, _ in found), dtype=np.int64, count=len(found))
+        shared = np.fromiter((len(query_tokens.intersection(tokens)) for _, tokens in found),
+                             dtype=np.float64, count=len(found))
+        sizes = np.fromiter((len(tokens) for _, tokens in found), dtype=np.float64, count=len(found))
+        return ids, shared / (len(query_tokens) + sizes - shared)
+
+    def relevant(self, query_tokens: FrozenSet[str], threshold: float = 0.3, limit: int = 3) -> List:
+        """Most recent interactions whose query + response overlap the query above threshold"""
+        ids, scores = self._scores(query_tokens, self._text_postings, self._text_tokens, threshold)
+        matches = ids[scores > threshold]
+        results = []
+        for item_id in np.sort(matches)[::-1]:  # ids grow with insertion order
+            interaction = self._interactions.get(int(item_id))
+            if interaction is not None:
+                results.append(interaction)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def count_similar_queries(self, query_tokens: FrozenSet[str], threshold: float = 0.7) -> int:
+        _, scores = self._scores(query_tokens, self._query_postings, self._query_tokens, threshold)
+        return int(np.count_nonzero(scores > threshold))
+
+
+
+
+class UserMemory:
+    """
+    Every kind of memory for one user, guarded by the user's own lock.
+    Fields read by get_context are either replaced wholesale on write
+    (recent, profile) or safe to read during a write (short_term).
+    """
+
+    def __init__(self, user_id: str, max_conversation_length: int, max_short_term_items: int):
+        self.user_id = user_id
+        self.lock = threading.Lock()
+        self.conversation_history = deque(maxlen=max_conversation_length)
+        self.short_term = ShortTermIndex(max_short_term_items)
+        self.long_term = {}  # key -> LongTermMemory
+        self.long_term_heap = []  # (access_count, seq, key, entry); min = eviction candidate
+        self.long_term_seq = 0
+        self.profile = None
+        self.recent = ()  # last 5 interactions, republished after every write
+
+        self.referenced = True  # CLOCK bit: set on every use, cleared by the evictor
+        self.dirty = False      # changed since it was last saved to the store
+        self.evicted = False    # written out; holders of a stale reference must reload
+
+
 class MemoryManager:
     """
     Advanced memory management system for AI context and learning
+
+    Memory is partitioned per user. Writers for different users never wait
+    on each other: each partition has its own lock, and creating a partition
+    only takes one of LOCK_SHARDS hash-sharded locks. get_context takes no
+    lock at all.
+
+    With a store (see memory_store.py) only max_hot_users partitions stay in
+    RAM. Idle users are picked by CLOCK (an approximate LRU that needs no
+    lock on the read path), written out, and loaded back on their next
+    request, so memory use stops growing with the number of users ever seen.
     """
 
-    def __init__(self):
-        self.short_term_memory = {}
-        self.long_term_memory = {}
-        self.conversation_history = defaultdict(list)
-        self.user_profiles = {}
-        self.memory_lock = threading.Lock()
+    LOCK_SHARDS = 64
+    EVICT_RETRY_SECONDS = 30  # pause eviction this long after the store fails a save
+
+    def __init__(self, store=None, max_hot_users: Optional[int] = None):
+        self._users = {}  # user_id -> UserMemory (hot users only when a store is set)
+        self._shard_locks = [threading.Lock() for _ in range(self.LOCK_SHARDS)]
+        self._clock = deque()  # hot user ids in admission order
+        self._clock_lock = threading.Lock()
+        self._evict_retry_at = 0.0
+
+        if store is None and MEMORY_STORE:
+            try:
+                store = memory_store_from_spec(MEMORY_STORE)
+            except Exception as e:
+                logger.error(f"Memory store '{MEMORY_STORE}' unavailable, keeping memory in-process: {e}")
+        self.store = store
+        self.max_hot_users = max_hot_users or int(os.getenv('R3ALER_MEMORY_HOT_USERS', '1000'))
+        if self.store is not None:
+            atexit.register(self.flush)
 
         # Memory limits
         self.max_short_term_items = 1000
@@ -34,95 +277,257 @@ class MemoryManager:
 
         logger.info("Memory manager initialized")
 
+    def _partition(self, user_id: str, create: bool = True) -> Optional[UserMemory]:
+        """
+        The user's hot partition. Otherwise it is loaded from the store, or
+        created when `create`, under the user's shard lock.
+        """
+        memory = self._users.get(user_id)
+        if memory is not None and not memory.evicted:
+            memory.referenced = True
+            return memory
+
+        with self._shard_locks[hash(user_id) % self.LOCK_SHARDS]:
+            memory = self._users.get(user_id)
+            if memory is not None and not memory.evicted:
+                return memory
+
+            data = self.store.load(user_id) if self.store is not None else None
+            if data is None and not create:
+                return None
+            memory = UserMemory(user_id, self.max_conversation_length, self.max_short_term_items)
+            if data is not None:
+                self._restore(memory, data)
+            self._users[user_id] = memory
+            with self._clock_lock:
+                self._clock.append(user_id)
+
+        self._evict_idle()
+        return memory
+
+    @contextmanager
+    def _locked(self, user_id: str):
+        """Hold the user's partition lock for a write, reloading if it was evicted meanwhile"""
+        while True:
+            memory = self._partition(user_id)
+            with memory.lock:
+                if memory.evicted:
+                    continue
+                memory.dirty = True
+                yield memory
+                return
+
+    def _evict_idle(self):
+        """
+        Write out idle users until at most max_hot_users remain in RAM. The
+        hand makes at most two sweeps per call (one to clear reference bits,
+        one to evict), and a failed save stops eviction for
+        EVICT_RETRY_SECONDS, so a store outage only keeps more users hot.
+        """
+        if self.store is None or time.monotonic() < self._evict_retry_at:
+            return
+        with self._clock_lock:
+            steps = 2 * len(self._clock)
+        while len(self._users) > self.max_hot_users and steps > 0:
+            steps -= 1
+            with self._clock_lock:
+                if not self._clock:
+                    return
+                user_id = self._clock.popleft()
+                memory = self._users.get(user_id)
+                if memory is None or memory.evicted:
+                    continue
+                if memory.referenced:
+                    # Second chance: used since the hand last passed
+                    memory.referenced = False
+                    self._clock.append(user_id)
+                    continue
+            if not self._write_out(memory):
+                self._evict_retry_at = time.monotonic() + self.EVICT_RETRY_SECONDS
+                return
+
+    def _write_out(self, memory: UserMemory) -> bool:
+        """Save and drop one partition; False (and the user stays hot) when the store fails"""
+        with memory.lock:
+            if memory.evicted:
+                return True
+            if memory.dirty:
+                try:
+                    self.store.save(memory.user_id, self._export(memory))
+                except Exception as e:
+                    logger.error(f"Could not persist memory for {memory.user_id}, keeping it in RAM: {e}")
+                    with self._clock_lock:
+                        self._clock.append(memory.user_id)
+                    return False
+            memory.evicted = True
+        with self._shard_locks[hash(memory.user_id) % self.LOCK_SHARDS]:
+            if self._users.get(memory.user_id) is memory:
+                del self._users[memory.user_id]
+        return True
+
+    def flush(self):
+        """Save every changed hot user to the store (also runs at interpreter exit)"""
+        if self.store is None:
+            return
+        for memory in list(self._users.values()):
+            with memory.lock:
+                if memory.dirty and not memory.evicted:
+                    try:
+                        self.store.save(memory.user_id, self._export(memory))
+                        memory.dirty = False
+                    except Exception as e:
+                        logger.error(f"Could not persist memory for {memory.user_id}: {e}")
+
+    def _export(self, memory: UserMemory) -> Dict[str, Any]:
+        """Serialisable copy of a partition; caller holds memory.lock"""
+        user_id = memory.user_id
+        return {
+            'conversation_history': [item.to_dict(user_id) for item in memory.conversation_history],
+            'short_term_memory': [item.to_dict(user_id) for item in memory.short_term],
+            'long_term_memory': {key: item.to_dict(user_id) for key, item in memory.long_term.items()},
+            'user_profile': memory.profile or {}
+        }
+
+    def _restore(self, memory: UserMemory, data: Dict[str, Any]):
+        """Replace partition contents with an export_memory() document; caller holds memory.lock"""
+        # The document repeats a turn in each view; rebuild one shared Interaction per turn
+        shared = {}
+
+        def interaction(item: Dict[str, Any]) -> Interaction:
+            key = (item.get('timestamp'), item.get('query'), item.get('response'))
+            if key not in shared:
+                shared[key] = Interaction.from_dict(item)
+            return shared[key]
+
+        if 'conversation_history' in data:
+            memory.conversation_history = deque(
+                map(interaction, data['conversation_history']),
+                maxlen=self.max_conversation_length
+            )
+            memory.recent = tuple(memory.conversation_history)[-5:]
+
+        if 'short_term_memory' in data:
+            memory.short_term = ShortTermIndex(
+                self.max_short_term_items,
+                map(interaction, data['short_term_memory'])
+            )
+
+        if 'long_term_memory' in data:
+            memory.long_term = {key: LongTermMemory.from_dict(item, interaction(item))
+                                for key, item in data['long_term_memory'].items()}
+            self._rebuild_long_term_heap(memory)
+
+        if 'user_profile' in data:
+            memory.profile = data['user_profile'] or None
+
     def store_interaction(self, user_id: str, query: str, response: str):
         """Store user interaction in memory"""
 
-        with self.memory_lock:
-            timestamp = datetime.now()
-            interaction = {
-                'timestamp': timestamp.isoformat(),
-                'query': query,
-                'response': response,
-                'user_id': user_id
-            }
-
-            # Store in conversation history
-            if len(self.conversation_history[user_id]) >= self.max_conversation_length:
-                self.conversation_history[user_id].pop(0)  # Remove oldest
+        with self._locked(user_id) as memory:
+            interaction = Interaction(query, response)
 
-            self.conversation_history[user_id].append(interaction)
+            # Store in conversation history (the deque drops the oldest)
+            memory.conversation_history.append(interaction)
+            memory.recent = tuple(memory.conversation_history)[-5:]
 
             # Store in short-term memory
-            self._store_short_term(user_id, interaction)
+            self._store_short_term(memory, interaction)
 
             # Check if should promote to long-term memory
-            self._check_long_term_promotion(user_id, interaction)
+            self._check_long_term_promotion(memory, interaction)
 
     def get_context(self, user_id: str, current_query: str) -> str:
-        """Get relevant context for current query"""
-
-        with self.memory_lock:
-            context_parts = []
-
-            # Get recent conversation context
-            recent_interactions = self.conversation_history.get(user_id, [])[-5:]  # Last 5 interactions
-
-            if recent_interactions:
-                context_parts.append("Recent conversation:")
-                for interaction in recent_interactions:
-                    context_parts.append(f"Q: {interaction['query'][:100]}...")
-                    context_parts.append(f"A: {interaction['response'][:100]}...")
-                context_parts.append("")
-
-            # Get relevant short-term memories
-            short_term_context = self._get_short_term_context(user_id, current_query)
-            if short_term_context:
-                context_parts.append("Relevant memories:")
-                context_parts.extend(short_term_context)
-                context_parts.append("")
-
-            # Get user profile context
-            profile_context = self._get_user_profile_context(user_id)
-            if profile_context:
-                context_parts.append("User preferences:")
-                context_parts.append(profile_context)
-                context_parts.append("")
-
-            return '\n'.join(context_parts).strip()
-
-    def _store_short_term(self, user_id: str, interaction: Dict):
-        """Store interaction in short-term memory"""
-
-        if user_id not in self.short_term_memory:
-            self.short_term_memory[user_id] = deque(maxlen=self.max_short_term_items)
+        """Get relevant context for current query (lock-free read)"""
 
-        self.short_term_memory[user_id].append(interaction)
+        memory = self._users.get(user_id)
+        if memory is None or memory.evicted:
+            memory = self._partition(user_id, create=False)
+            if memory is None:
+                return ""
+        memory.referenced = True
 
-        # Clean up if over limit
-        while len(self.short_term_memory[user_id]) > self.max_short_term_items:
-            self.short_term_memory[user_id].popleft()
+        context_parts = []
 
-    def _get_short_term_context(self, user_id: str, current_query: str) -> List[str]:
-        """Get relevant short-term memories for current query"""
+        # Get recent conversation context
+        recent_interactions = memory.recent  # Last 5 interactions
+
+        if recent_interactions:
+            context_parts.append("Recent conversation:")
+            for interaction in recent_interactions:
+                context_parts.append(f"Q: {interaction.query[:100]}...")
+                context_parts.append(f"A: {interaction.response[:100]}...")
+            context_parts.append("")
+
+        # Get relevant short-term memories
+        relevant = memory.short_term.relevant(tokenize(current_query), 0.3, 3)
+        short_term_context = self._get_short_term_context(memory, current_query, relevant)
+        if short_term_context:
+            context_parts.append("Relevant memories:")
+            context_parts.extend(short_term_context)
+            context_parts.append("")
+
+        # Get long-term memory of this question, unless already shown above
+        long_term_context = self._get_long_term_context(memory, current_query, relevant)
+        if long_term_context:
+            context_parts.append("Long-term memory:")
+            context_parts.append(long_term_context)
+            context_parts.append("")
+
+        # Get user profile context
+        profile_context = self._get_user_profile_context(memory)
+        if profile_context:
+            context_parts.append("User preferences:")
+            context_parts.append(profile_context)
+            context_parts.append("")
+
+        return '\n'.join(context_parts).strip()
+
+    def _store_short_term(self, memory: UserMemory, interaction: Interaction):
+        """Store interaction in short-term memory"""
 
-        if user_id not in self.short_term_memory:
-            return []
+        # Evicts (and unindexes) the oldest interaction once over the limit
+        memory.short_term.append(interaction)
 
-        relevant_memories = []
-        query_lower = current_query.lower()
+    def _get_short_term_context(self, memory: UserMemory, current_query: str,
+                                memories: Optional[List[Interaction]] = None) -> List[str]:
+        """Get relevant short-term memories for current query"""
 
-        for memory in reversed(list(self.short_term_memory[user_id])):
-            memory_query = memory.get('query', '').lower()
-            memory_response = memory.get('response', '').lower()
+        # Up to 3 most recent memories with relevance > 0.3
+        if memories is None:
+            memories = memory.short_term.relevant(tokenize(current_query), 0.3, 3)
+        for interaction in memories:
+            self._touch_long_term(memory, interaction.query)
+        return [f"Previous: {item.query[:50]}... -> {item.response[:50]}..." for item in memories]
 
-            # Check relevance
-            if self._calculate_relevance(query_lower, memory_query + " " + memory_response) > 0.3:
-                relevant_memories.append(f"Previous: {memory['query'][:50]}... -> {memory['response'][:50]}...")
+    def _get_long_term_context(self, memory: UserMemory, current_query: str,
+                               shown: List[Interaction] = ()) -> str:
+        """Long-term memory promoted from this same question, if any"""
 
-                if len(relevant_memories) >= 3:  # Limit to 3 relevant memories
-                    break
+        entry = self._touch_long_term(memory, current_query)
+        if entry is None:
+            return ""
+        interaction = entry.interaction
+        if any(interaction is item for item in shown) or any(interaction is item for item in memory.recent):
+            return ""
+        return f"Learned: {interaction.query[:50]}... -> {interaction.response[:50]}..."
 
-        return relevant_memories
+    @staticmethod
+    def _long_term_key(query: str) -> str:
+        # Use query as key (simplified)
+        return hashlib.md5(query.encode()).hexdigest()[:8]
+
+    def _touch_long_term(self, memory: UserMemory, query: str) -> Optional[LongTermMemory]:
+        """
+        Count a use of the long-term memory for `query`. Runs lock-free from
+        get_context: the heap is not touched here (a racing increment may be
+        lost, which only makes the count approximate); eviction reconciles
+        stale heap entries lazily.
+        """
+        entry = memory.long_term.get(self._long_term_key(query))
+        if entry is not None:
+            entry.access_count += 1
+            entry.last_access = int(time.time() * 1000)
+        return entry
 
     def _calculate_relevance(self, query1: str, query2: str) -> float:
         """Calculate relevance between two queries/texts"""
@@ -138,13 +543,13 @@ class MemoryManager:
 
         return len(intersection) / len(union)
 
-    def _check_long_term_promotion(self, user_id: str, interaction: Dict):
+    def _check_long_term_promotion(self, memory: UserMemory, interaction: Interaction):
         """Check if interaction should be promoted to long-term memory"""
 
         # Simple heuristic: interactions that are referenced multiple times
         # or contain important keywords
 
-        query = interaction.get('query', '').lower()
+        query = interaction.query.lower()
 
         # Check for important topics
         important_keywords = [
@@ -153,74 +558,91 @@ class MemoryManager:
         ]
 
         if any(keyword in query for keyword in important_keywords):
-            self._promote_to_long_term(user_id, interaction)
+            self._promote_to_long_term(memory, interaction)
 
         # Check frequency of similar queries
-        similar_count = self._count_similar_queries(user_id, query)
+        similar_count = self._count_similar_queries(memory, query)
         if similar_count >= 3:  # Asked similar question 3+ times
-            self._promote_to_long_term(user_id, interaction)
+            self._promote_to_long_term(memory, interaction)
 
-    def _count_similar_queries(self, user_id: str, query: str) -> int:
+    def _count_similar_queries(self, memory: UserMemory, query: str) -> int:
         """Count how many similar queries user has made"""
 
-        if user_id not in self.short_term_memory:
-            return 0
+        return memory.short_term.count_similar_queries(tokenize(query), 0.7)
 
-        count = 0
-        for memory in self.short_term_memory[user_id]:
-            if self._calculate_relevance(query, memory.get('query', '')) > 0.7:
-                count += 1
-
-        return count
-
-    def _promote_to_long_term(self, user_id: str, interaction: Dict):
+    def _promote_to_long_term(self, memory: UserMemory, interaction: Interaction):
         """Promote interaction to long-term memory"""
 
-        if user_id not in self.long_term_memory:
-            self.long_term_memory[user_id] = {}
+        key = self._long_term_key(interaction.query)
+        entry = memory.long_term.get(key)
+        if entry is not None:
+            # Asked again: keep its access history, remember the latest answer
+            entry.interaction = interaction
+            return
 
-        # Use query as key (simplified)
-        key = hashlib.md5(interaction['query'].encode()).hexdigest()[:8]
-
-        self.long_term_memory[user_id][key] = {
-            **interaction,
-            'promoted_at': datetime.now().isoformat(),
-            'access_count': 0
-        }
+        entry = LongTermMemory(interaction)
+        memory.long_term[key] = entry
+        self._push_long_term(memory, key, entry)
 
         # Clean up long-term memory if over limit
-        if len(self.long_term_memory[user_id]) > self.max_long_term_items:
-            # Remove least accessed items
-            sorted_items = sorted(
-                self.long_term_memory[user_id].items(),
-                key=lambda x: x[1].get('access_count', 0)
-            )
-            items_to_remove = sorted_items[:100]  # Remove 100 least accessed
-
-            for key, _ in items_to_remove:
-                del self.long_term_memory[user_id][key]
+        while len(memory.long_term) > self.max_long_term_items:
+            self._evict_long_term(memory)
+
+    def _push_long_term(self, memory: UserMemory, key: str, entry: LongTermMemory):
+        memory.long_term_seq += 1
+        heapq.heappush(memory.long_term_heap, (entry.access_count, memory.long_term_seq, key, entry))
+        if len(memory.long_term_heap) > 2 * len(memory.long_term) + 64:
+            # Mostly entries for memories removed by cleanup(); drop them
+            self._rebuild_long_term_heap(memory)
+
+    def _rebuild_long_term_heap(self, memory: UserMemory):
+        memory.long_term_heap = [(entry.access_count, seq, key, entry)
+                                 for seq, (key, entry) in enumerate(memory.long_term.items())]
+        heapq.heapify(memory.long_term_heap)
+        memory.long_term_seq = len(memory.long_term_heap)
+
+    def _evict_long_term(self, memory: UserMemory):
+        """
+        Remove the least frequently used long-term memory (oldest first among
+        equals). Heap entries carry the access count at push time; one that
+        has been used since is pushed back with its current count instead.
+        Each access causes at most one such re-push, so eviction is amortised
+        O(log n).
+        """
+        while memory.long_term_heap:
+            access_count, _, key, entry = heapq.heappop(memory.long_term_heap)
+            if memory.long_term.get(key) is not entry:
+                continue  # already removed
+            if entry.access_count != access_count:
+                self._push_long_term(memory, key, entry)
+                continue
+            del memory.long_term[key]
+            return
 
     def update_user_profile(self, user_id: str, preferences: Dict):
         """Update user profile with preferences and behavior patterns"""
 
-        if user_id not in self.user_profiles:
-            self.user_profiles[user_id] = {
+        with self._locked(user_id) as memory:
+            profile = memory.profile or {
                 'created': datetime.now().isoformat(),
                 'preferences': {},
                 'behavior_patterns': {}
             }
 
-        # Update preferences
-        self.user_profiles[user_id]['preferences'].update(preferences)
-        self.user_profiles[user_id]['last_updated'] = datetime.now().isoformat()
+            # Copy-on-write, so lock-free readers never see a dict mid-update
+            memory.profile = {
+                **profile,
+                'preferences': {**profile['preferences'], **preferences},
+                'last_updated': datetime.now().isoformat()
+            }
 
-    def _get_user_profile_context(self, user_id: str) -> str:
+    def _get_user_profile_context(self, memory: UserMemory) -> str:
         """Get user profile context"""
 
-        if user_id not in self.user_profiles:
+        profile = memory.profile
+        if not profile:
             return ""
 
-        profile = self.user_profiles[user_id]
         preferences = profile.get('preferences', {})
 
         context_parts = []
@@ -232,88 +654,71 @@ class MemoryManager:
     def get_memory_stats(self, user_id: str = None) -> Dict[str, Any]:
         """Get memory statistics"""
 
+        users = list(self._users.values())
         stats = {
-            'total_users': len(self.conversation_history),
-            'total_short_term_memories': sum(len(mem) for mem in self.short_term_memory.values()),
-            'total_long_term_memories': sum(len(mem) for mem in self.long_term_memory.values()),
-            'total_user_profiles': len(self.user_profiles)
+            'total_users': sum(1 for memory in users if memory.conversation_history),
+            'total_short_term_memories': sum(len(memory.short_term) for memory in users),
+            'total_long_term_memories': sum(len(memory.long_term) for memory in users),
+            'total_user_profiles': sum(1 for memory in users if memory.profile is not None),
+            'hot_users': len(users),
+            'persisted_users': self.store.count() if self.store is not None else None
         }
 
         if user_id:
-            stats['user_conversations'] = len(self.conversation_history.get(user_id, []))
-            stats['user_short_term'] = len(self.short_term_memory.get(user_id, deque()))
-            stats['user_long_term'] = len(self.long_term_memory.get(user_id, {}))
-            stats['user_profile'] = user_id in self.user_profiles
+            memory = self._users.get(user_id)
+            stats['user_conversations'] = len(memory.conversation_history) if memory else 0
+            stats['user_short_term'] = len(memory.short_term) if memory else 0
+            stats['user_long_term'] = len(memory.long_term) if memory else 0
+            stats['user_profile'] = bool(memory and memory.profile is not None)
 
         return stats
 
     def cleanup(self):
         """Clean up expired and irrelevant memories"""
 
-        with self.memory_lock:
-            logger.info("Starting memory cleanup...")
-
-            current_time = datetime.now()
-            cutoff_time = current_time - timedelta(hours=self.memory_decay_hours)
-
-            # Clean short-term memory (remove very old entries)
-            for user_id in list(self.short_term_memory.keys()):
-                # Keep only recent entries, remove older ones beyond our maxlen
-                # The deque automatically handles this, but we can be more aggressive
-                pass
+        logger.info("Starting memory cleanup...")
 
-            # Clean long-term memory (remove least accessed)
-            for user_id in list(self.long_term_memory.keys()):
-                memories = self.long_term_memory[user_id]
+        cutoff = int((time.time() - self.memory_decay_hours * 3600) * 1000)
 
+        # Short-term memory is bounded by ShortTermIndex, nothing to do there.
+        # Clean long-term memory one user at a time, so other users keep going
+        for memory in list(self._users.values()):
+            with memory.lock:
+                if memory.evicted:
+                    continue
                 # Remove memories not accessed in decay period
-                to_remove = []
-                for key, memory in memories.items():
-                    last_access = memory.get('last_access')
-                    if last_access:
-                        access_time = datetime.fromisoformat(last_access)
-                        if current_time - access_time > timedelta(hours=self.memory_decay_hours):
-                            to_remove.append(key)
+                to_remove = [key for key, item in memory.long_term.items()
+                             if item.last_access is not None and item.last_access < cutoff]
 
                 for key in to_remove:
-                    del memories[key]
+                    del memory.long_term[key]
+                if to_remove:
+                    memory.dirty = True
 
-                # If user has no long-term memories left, remove user entry
-                if not memories:
-                    del self.long_term_memory[user_id]
-
-            logger.info("Memory cleanup completed")
+        self.flush()
+        logger.info("Memory cleanup completed")
 
     def export_memory(self, user_id: str) -> Dict[str, Any]:
         """Export user's memory for backup/analysis"""
 
-        return {
-            'conversation_history': list(self.conversation_history.get(user_id, [])),
-            'short_term_memory': list(self.short_term_memory.get(user_id, deque())),
-            'long_term_memory': dict(self.long_term_memory.get(user_id, {})),
-            'user_profile': self.user_profiles.get(user_id, {}),
-            'export_timestamp': datetime.now().isoformat()
-        }
+        memory = self._partition(user_id, create=False)
+        if memory is None:
+            return {
+                'conversation_history': [],
+                'short_term_memory': [],
+                'long_term_memory': {},
+                'user_profile': {},
+                'export_timestamp': datetime.now().isoformat()
+            }
+
+        with memory.lock:
+            return {**self._export(memory), 'export_timestamp': datetime.now().isoformat()}
 
     def import_memory(self, user_id: str, memory_data: Dict):
         """Import user's memory from backup"""
 
-        with self.memory_lock:
-            if 'conversation_history' in memory_data:
-                self.conversation_history[user_id] = memory_data['conversation_history']
-
-            if 'short_term_memory' in memory_data:
-                self.short_term_memory[user_id] = deque(
-                    memory_data['short_term_memory'],
-                    maxlen=self.max_short_term_items
-                )
-
-            if 'long_term_memory' in memory_data:
-                self.long_term_memory[user_id] = memory_data['long_term_memory']
-
-            if 'user_profile' in memory_data:
-                self.user_profiles[user_id] = memory_data['user_profile']
-
+        with self._locked(user_id) as memory:
+            self._restore(memory, memory_data)
             logger.info(f"Imported memory for user: {user_id}")
 
     def optimize(self):
@@ -336,4 +741,4 @@ class MemoryManager:
             "component": "MemoryManager",
             **self.get_memory_stats(),
             "status": "active"
-        }
\ No newline at end of file
+        }
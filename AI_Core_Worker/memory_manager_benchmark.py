@@ -0,0 +1,208 @@
+"""
+R3AL3R Memory Manager Benchmark
+
+    contention  mixed store_interaction / get_context traffic from N threads
+                over many users, against the partitioned MemoryManager and a
+                single-lock baseline (the previous design)
+
+    python memory_manager_benchmark.py contention --threads 1 2 4 8 16 --users 500 --ops 20000
+    python memory_manager_benchmark.py contention --write-io-ms 2   # writes block on I/O (e.g. persistence)
+
+    footprint   memory held after N users x T turns, optionally with a
+                persistent store and a capped number of hot users
+
+    python memory_manager_benchmark.py footprint --users 10000 --turns 50
+    python memory_manager_benchmark.py footprint --users 10000 --turns 50 --store sqlite:/tmp/memory.db --hot-users 500
+
+                10k users x 50 turns, in RAM: ~3.9 GB RSS with dict records and
+                frozenset token sets, ~0.9 GB with shared Interaction records,
+                interned tokens and array postings
+
+Pure-Python work is serialised by the GIL, so on a standard build the gain
+shows up as get_context latency while writers hold their lock (readers no
+longer queue behind them), and as throughput once writes block on I/O.
+"""
+
+import gc
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import tracemalloc
+from typing import Dict, List, Optional
+
+from memory_manager import MemoryManager
+from memory_store import memory_store_from_spec
+
+WORDS = ('quantum entanglement black hole bitcoin mining blockchain consensus thermodynamics '
+         'entropy orbital mechanics neural network logical fallacy relativity proof induction '
+         'exoplanet detection smart contract wave function rocket propulsion what how why is the').split()
+
+
+class GlobalLockMemoryManager(MemoryManager):
+    """Baseline: every call queues on one process-wide lock, as before partitioning"""
+
+    def __init__(self):
+        super().__init__()
+        self.memory_lock = threading.Lock()
+
+    def store_interaction(self, user_id: str, query: str, response: str):
+        with self.memory_lock:
+            super().store_interaction(user_id, query, response)
+
+    def get_context(self, user_id: str, current_query: str) -> str:
+        with self.memory_lock:
+            return super().get_context(user_id, current_query)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def run_contention(manager: MemoryManager, threads: int, users: int, total_ops: int,
+                   write_ratio: float = 0.2, write_io_ms: float = 0.0, seed: int = 7) -> Dict:
+    """total_ops split across `threads`; returns throughput and get_context latency"""
+    warm = random.Random(seed)
+    for i in range(users):
+        for _ in range(20):
+            manager.store_interaction(f"user{i}", _sentence(warm, 6), _sentence(warm, 20))
+
+    if write_io_ms:
+        # Blocking call inside the write path, i.e. while the write lock is held
+        store_short_term = manager._store_short_term
+
+        def slow_store(*args):
+            time.sleep(write_io_ms / 1000)
+            store_short_term(*args)
+        manager._store_short_term = slow_store
+
+    per_thread = total_ops // threads
+    read_latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        latencies = read_latencies[index]
+        barrier.wait()
+        for _ in range(per_thread):
+            user_id = f"user{rng.randrange(users)}"
+            if rng.random() < write_ratio:
+                manager.store_interaction(user_id, _sentence(rng, 6), _sentence(rng, 20))
+            else:
+                started = time.perf_counter()
+                manager.get_context(user_id, _sentence(rng, 6))
+                latencies.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(value for values in read_latencies for value in values)
+    return {
+        'threads': threads,
+        'ops': per_thread * threads,
+        'ops_per_second': round(per_thread * threads / elapsed, 1),
+        'get_context_p50_us': round(percentile(latencies, 0.50) * 1e6, 1),
+        'get_context_p99_us': round(percentile(latencies, 0.99) * 1e6, 1)
+    }
+
+
+def contention(args):
+    print(f"{'manager':<14}{'threads':>8}{'ops/s':>12}{'p50 us':>10}{'p99 us':>10}")
+    for name, factory in (('global-lock', GlobalLockMemoryManager), ('partitioned', MemoryManager)):
+        for threads in args.threads:
+            result = run_contention(factory(), threads, args.users, args.ops, args.write_ratio,
+                                    args.write_io_ms)
+            print(f"{name:<14}{threads:>8}{result['ops_per_second']:>12}"
+                  f"{result['get_context_p50_us']:>10}{result['get_context_p99_us']:>10}")
+
+
+def rss_mb() -> float:
+    """Resident set size of this process (Linux /proc; peak RSS elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_footprint(manager: MemoryManager, users: int, turns: int, trace: bool = False,
+                  seed: int = 7) -> Dict:
+    """Store users x turns interactions and report what the manager keeps resident"""
+    rng = random.Random(seed)
+    gc.collect()
+    rss_before = rss_mb()
+    if trace:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    for _ in range(turns):
+        for i in range(users):
+            manager.store_interaction(f"user{i}", _sentence(rng, 8), _sentence(rng, 40))
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0] if trace else None
+    if trace:
+        tracemalloc.stop()
+    return {
+        'users': users,
+        'turns': turns,
+        'hot_users': len(manager._users),
+        'seconds': round(elapsed, 1),
+        'rss_growth_mb': round(rss_mb() - rss_before, 1),
+        'traced_mb': round(traced / 2 ** 20, 1) if traced is not None else None,
+        'traced_bytes_per_turn': round(traced / (users * turns)) if traced is not None else None
+    }
+
+
+def footprint(args):
+    store: Optional[object] = memory_store_from_spec(args.store) if args.store else None
+    manager = MemoryManager(store=store, max_hot_users=args.hot_users)
+    manager.max_short_term_items = args.short_term
+    result = run_footprint(manager, args.users, args.turns, args.tracemalloc)
+    for key, value in result.items():
+        print(f"{key:<24}{value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the R3AL3R memory manager')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('contention', help='Concurrent mixed traffic across threads')
+    p.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    p.add_argument('--users', type=int, default=500)
+    p.add_argument('--ops', type=int, default=20000)
+    p.add_argument('--write-ratio', type=float, default=0.2)
+    p.add_argument('--write-io-ms', type=float, default=0.0, help='Simulated blocking I/O per write')
+    p.set_defaults(func=contention)
+
+    p = sub.add_parser('footprint', help='Resident memory after users x turns')
+    p.add_argument('--users', type=int, default=10000)
+    p.add_argument('--turns', type=int, default=50)
+    p.add_argument('--short-term', type=int, default=1000, help='max_short_term_items')
+    p.add_argument('--store', help="Persistent store spec, e.g. sqlite:/tmp/memory.db")
+    p.add_argument('--hot-users', type=int, help='Users kept in RAM when a store is set')
+    p.add_argument('--tracemalloc', action='store_true', help='Also report Python-allocated bytes (slow)')
+    p.set_defaults(func=footprint)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Persistent storage for MemoryManager
+Holds each user's memory (the export_memory() document) so the manager
+only keeps recently active users in RAM and reloads the rest on demand.
+
+    sqlite:<path>   single host; WAL mode, so several worker processes can share it
+    postgres        user_unit.ai_memory in the facility database
+
+Pick one with R3ALER_MEMORY_STORE; unset keeps memory in-process only.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MEMORY_STORE = os.getenv('R3ALER_MEMORY_STORE', '')
+
+
+class SQLiteMemoryStore:
+    """One JSON document per user in a local SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_memory (
+                user_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM ai_memory WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, user_id: str, data: Dict[str, Any]):
+        document = json.dumps(data, default=str)
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO ai_memory (user_id, data, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+            """, (user_id, document, time.time()))
+            self._conn.commit()
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_memory WHERE user_id = ?", (user_id,))
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ai_memory").fetchone()[0]
+
+
+class PostgresMemoryStore:
+    """user_unit.ai_memory: one JSONB document per user, via the shared connection pool"""
+
+    TABLE = 'user_unit.ai_memory'
+
+    def __init__(self, db_config: Dict[str, Any]):
+        import db_pool
+
+        self._db_pool = db_pool
+        self.db_config = db_config
+        conn = db_pool.get_connection(db_config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("CREATE SCHEMA IF NOT EXISTS user_unit")
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        user_id VARCHAR(200) PRIMARY KEY,
+                        data JSONB NOT NULL,
+                        updated_at TIMESTAMP DEFAULT NOW()
+                    )
+                """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _execute(self, sql: str, params=(), fetch: bool = False):
+        conn = self._db_pool.get_connection(self.db_config)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                row = cursor.fetchone() if fetch else None
+            conn.commit()
+            return row
+        finally:
+            conn.close()
+
+    def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(f"SELECT data FROM {self.TABLE} WHERE user_id = %s", (user_id,), fetch=True)
+        return row[0] if row else None  # psycopg2 decodes JSONB
+
+    def save(self, user_id: str, data: Dict[str, Any]):
+        self._execute(f"""
+            INSERT INTO {self.TABLE} (user_id, data, updated_at) VALUES (%s, %s::jsonb, NOW())
+            ON CONFLICT (user_id) DO UPDATE SET data = EXCLUDED.data, updated_at = NOW()
+        """, (user_id, json.dumps(data, default=str)))
+
+    def delete(self, user_id: str):
+        self._execute(f"DELETE FROM {self.TABLE} WHERE user_id = %s", (user_id,))
+
+    def count(self) -> int:
+        return self._execute(f"SELECT COUNT(*) FROM {self.TABLE}", fetch=True)[0]
+
+
+def memory_store_from_spec(spec: str, db_config: Optional[Dict[str, Any]] = None):
+    """'' -> None, 'sqlite:<path>' -> SQLiteMemoryStore, 'postgres' -> PostgresMemoryStore"""
+    if not spec:
+        return None
+    if spec.startswith('sqlite:'):
+        return SQLiteMemoryStore(spec[len('sqlite:'):])
+    if spec == 'postgres':
+        if db_config is None:
+            from personalization_engine import DB_CONFIG as db_config
+        return PostgresMemoryStore(db_config)
+    raise ValueError(f"Unknown memory store '{spec}' (use sqlite:<path> or postgres)")
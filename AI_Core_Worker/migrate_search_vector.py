@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Stored search_vector migration
+Adds a generated, weighted tsvector column (topic = A, content = B) plus a
+GIN index to every *_unit.knowledge table, so searches stop re-tokenizing
+every row with to_tsvector() at query time.
+
+Adding the column rewrites the table under an ACCESS EXCLUSIVE lock, so it
+runs here (or in StorageFacility.initialize_facility at startup), never on
+the request path. Dynamic units that have not been migrated are skipped by
+unit discovery, with a warning, until this script has run for them.
+
+Usage:
+    python migrate_search_vector.py                 # migrate every *_unit schema
+    python migrate_search_vector.py physics_unit    # migrate selected schemas
+    python migrate_search_vector.py --drop-old-index
+"""
+
+import re
+import sys
+import logging
+
+import psycopg2
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DB_CONFIG = {
+    'host': 'localhost',
+    'port': 5432,
+    'database': 'r3aler_ai',
+    'user': 'r3aler_user_2025',
+    'password': 'password123'
+}
+
+# Must stay identical everywhere the column is created
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', COALESCE(topic, '')), 'A') || "
+    "setweight(to_tsvector('english', COALESCE(content, '')), 'B')"
+)
+
+SCHEMA_PATTERN = re.compile(r'^[a-z0-9_]+_unit$')
+
+
+def has_search_vector(cursor, schema: str) -> bool:
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = 'knowledge' AND column_name = 'search_vector'
+    """, (schema,))
+    return cursor.fetchone() is not None
+
+
+def ensure_search_vector(cursor, schema: str, drop_old_index: bool = False) -> bool:
+    """
+    Add the stored search_vector column and its GIN index to schema.knowledge.
+
+    Returns True when the column had to be added (the table was rewritten).
+    Safe to run repeatedly.
+    """
+    if not SCHEMA_PATTERN.match(schema):
+        raise ValueError(f"Refusing to migrate unexpected schema name: {schema}")
+
+    added = False
+    if not has_search_vector(cursor, schema):
+        cursor.execute(f"""
+            ALTER TABLE {schema}.knowledge
+            ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED
+        """)
+        added = True
+
+    cursor.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_{schema}_search_vector
+        ON {schema}.knowledge USING GIN(search_vector)
+    """)
+
+    if drop_old_index:
+        # Expression index built by initialize_facility before this migration
+        unit_id = schema[:-len('_unit')]
+        cursor.execute(f"DROP INDEX IF EXISTS {schema}.idx_{unit_id}_fts")
+
+    return added
+
+
+def find_unit_schemas(cursor):
+    cursor.execute("""
+        SELECT table_schema FROM information_schema.tables
+        WHERE table_name = 'knowledge' AND table_schema LIKE %s
+        ORDER BY table_schema
+    """, ('%\\_unit',))
+    return [row[0] for row in cursor.fetchall() if SCHEMA_PATTERN.match(row[0])]
+
+
+def migrate(schemas=None, drop_old_index: bool = False):
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    try:
+        schemas = schemas or find_unit_schemas(cursor)
+        logger.info(f"Migrating {len(schemas)} unit(s): {', '.join(schemas)}")
+
+        for schema in schemas:
+            try:
+                added = ensure_search_vector(cursor, schema, drop_old_index)
+                cursor.execute(f"ANALYZE {schema}.knowledge")
+                conn.commit()
+                logger.info(f"[OK] {schema}: {'column added' if added else 'already migrated'}")
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"[ERROR] {schema}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    migrate(args or None, drop_old_index='--drop-old-index' in sys.argv)
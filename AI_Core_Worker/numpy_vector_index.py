@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: In-process NumPy vector index
+Optional alternative to pgvector for small units: each unit's embeddings
+live in a contiguous, L2-normalised float32 matrix saved as .npy and
+memory-mapped on load, so a cold start only maps the file and the OS pages
+rows in on first use. Cosine top-k is one matrix-vector product plus
+argpartition, with no database round trip.
+
+The index is kept in sync with knowledge.updated_at: rows changed after the
+last sync, rows that gained an embedding and deleted rows are patched in.
+Each sync writes a new version directory (ids.npy + vectors.npy) and then
+switches the <schema>.<table>.json pointer to it with one os.replace, so a
+reader in any process sees either the old pair or the new pair, never a mix. Re-embedding a unit without touching
+updated_at (embedding_backfill.py --all) needs a 'build --rebuild'.
+
+Usage:
+    python numpy_vector_index.py build physics_unit crypto_unit
+    python numpy_vector_index.py build physics_unit --rebuild
+    python numpy_vector_index.py bench physics_unit --queries 200 --k 10
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import db_pool
+from migrate_search_vector import DB_CONFIG, SCHEMA_PATTERN
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.getenv(
+    'R3ALER_VECTOR_INDEX_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vector_index_cache')
+)
+MAX_ROWS = int(os.getenv('R3ALER_NUMPY_INDEX_MAX_ROWS', '10000'))  # larger units stay on pgvector (HNSW)
+SYNC_INTERVAL = float(os.getenv('R3ALER_NUMPY_INDEX_SYNC', '60'))  # seconds
+
+
+def parse_vector(text: str) -> np.ndarray:
+    """pgvector text form '[0.1,0.2,...]' -> float32 array"""
+    return np.array(text[1:-1].split(','), dtype=np.float32)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class NumpyVectorIndex:
+    """One unit's embeddings as an mmap'd float32 matrix; search() is cosine top-k"""
+
+    def __init__(self, schema: str, table: str = 'knowledge', directory: str = INDEX_DIR,
+                 db_config: Dict = DB_CONFIG):
+        if not SCHEMA_PATTERN.match(schema):
+            raise ValueError(f"Refusing to index unexpected schema name: {schema}")
+        self.schema = schema
+        self.table = table
+        self.directory = directory
+        self.db_config = db_config
+        self.synced_at = None
+        self.built_at = None
+        # (ids, vectors) swapped as one tuple so searches always see a consistent pair
+        self._snapshot = (np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32))
+        self._sync_lock = threading.Lock()
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.schema}.{self.table}.{suffix}")
+
+    def _version_prefix(self) -> str:
+        return f"{self.schema}.{self.table}.v"
+
+    @property
+    def size(self) -> int:
+        return len(self._snapshot[0])
+
+    # ---------- persistence ----------
+
+    def load(self) -> bool:
+        """Map the saved index if present; returns False when it has never been built"""
+        for attempt in range(3):
+            meta_path = self._path('json')
+            if not os.path.exists(meta_path):
+                return False
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            version_dir = os.path.join(self.directory, meta['version'])
+            try:
+                ids = np.load(os.path.join(version_dir, 'ids.npy'), mmap_mode='r')
+                vectors = np.load(os.path.join(version_dir, 'vectors.npy'), mmap_mode='r')
+            except FileNotFoundError:
+                # Another process swapped in a newer version and pruned this one; re-read the pointer
+                if attempt == 2:
+                    raise
+                continue
+            self._snapshot = (ids, vectors)
+            self.synced_at = meta.get('synced_at')
+            self.built_at = meta.get('built_at')
+            return True
+
+    def replace(self, ids: np.ndarray, vectors: np.ndarray, synced_at: Optional[str]):
+        """Write a new matrix (rows sorted by id, L2-normalised) as a new version and remap it"""
+        os.makedirs(self.directory, exist_ok=True)
+        order = np.argsort(ids, kind='stable')
+        ids = np.ascontiguousarray(ids[order], dtype=np.int64)
+        vectors = _normalize_rows(np.asarray(vectors, dtype=np.float32)[order]) if len(ids) else \
+            np.empty((0, 0), dtype=np.float32)
+
+        version = f"{self._version_prefix()}{time.time_ns()}.{os.getpid()}"
+        version_dir = os.path.join(self.directory, version)
+        os.makedirs(version_dir)
+        for name, array in (('ids.npy', ids), ('vectors.npy', vectors)):
+            with open(os.path.join(version_dir, name), 'wb') as f:
+                np.save(f, array)
+
+        # The pointer is the only file ever replaced in place: one rename switches both arrays
+        meta = {'version': version, 'rows': len(ids),
+                'dimensions': int(vectors.shape[1]) if len(ids) else 0,
+                'synced_at': synced_at, 'built_at': time.time()}
+        tmp_path = f"{self._path('json')}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path('json'))
+        self.load()
+        self._prune_versions(keep=(version, self._previous_version(version)))
+
+    def _versions(self) -> List[str]:
+        prefix = self._version_prefix()
+        return sorted((name for name in os.listdir(self.directory)
+                       if name.startswith(prefix) and os.path.isdir(os.path.join(self.directory, name))),
+                      key=lambda name: int(name[len(prefix):].split('.')[0]))
+
+    def _previous_version(self, version: str) -> Optional[str]:
+        older = [name for name in self._versions() if name != version]
+        return older[-1] if older else None
+
+    def _prune_versions(self, keep):
+        """Drop old versions, keeping the previous one for readers that just read the old pointer"""
+        for name in self._versions():
+            if name not in keep:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    # ---------- search ----------
+
+    def search(self, query_vector, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (id, cosine distance) pairs, nearest first; distances match pgvector's <=>"""
+        ids, vectors = self._snapshot
+        if not len(ids) or k <= 0:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = vectors @ (query / norm)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(1.0 - scores[i])) for i in top]
+
+    # ---------- sync ----------
+
+    def sync(self, rebuild: bool = False) -> Dict:
+        """Patch in rows changed since the last sync; rebuild=True re-reads every vector"""
+        with self._sync_lock:
+            conn = db_pool.get_connection(self.db_config)
+            try:
+                with conn.cursor() as cursor:
+                    return self._sync(cursor, rebuild)
+            finally:
+                conn.close()
+
+    def _sync(self, cursor, rebuild: bool) -> Dict:
+        started = time.perf_counter()
+        cursor.execute(f"""
+            SELECT id, updated_at FROM {self.schema}.{self.table}
+            WHERE embedding IS NOT NULL
+        """)
+        current = dict(cursor.fetchall())
+        if len(current) > MAX_ROWS:
+            raise ValueError(f"{self.schema}.{self.table} has {len(current)} embedded rows "
+                             f"(limit {MAX_ROWS}); use the pgvector index instead")
+
+        ids, vectors = self._snapshot
+        known = set() if rebuild else set(ids.tolist())
+        synced_at = datetime.fromisoformat(self.synced_at) if self.synced_at and not rebuild else None
+        changed = [row_id for row_id, updated_at in current.items()
+                   if row_id not in known or (synced_at and updated_at and updated_at > synced_at)]
+        removed = known - current.keys()
+
+        latest = max((u for u in current.values() if u), default=None)
+        latest = latest.isoformat() if latest else self.synced_at
+        if not changed and not removed and os.path.exists(self._path('json')):
+            return {'rows': self.size, 'changed': 0, 'removed': 0, 'seconds': 0.0}
+
+        new_ids, new_vectors = np.empty(0, dtype=np.int64), None
+        if changed:
+            cursor.execute(f"""
+                SELECT id, embedding::text FROM {self.schema}.{self.table}
+                WHERE id = ANY(%s)
+            """, (changed,))
+            rows = cursor.fetchall()
+            new_ids = np.array([row[0] for row in rows], dtype=np.int64)
+            new_vectors = np.stack([parse_vector(row[1]) for row in rows]) if rows else None
+
+        if rebuild or not len(ids):
+            merged_ids, merged_vectors = new_ids, new_vectors
+        else:
+            keep = ~np.isin(ids, np.array(list(removed) + changed, dtype=np.int64))
+            merged_ids = np.concatenate([ids[keep], new_ids])
+            merged_vectors = np.asarray(vectors[keep]) if new_vectors is None else \
+                np.vstack([vectors[keep], new_vectors])
+
+        if merged_vectors is None:
+            merged_ids, merged_vectors = np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        self.replace(merged_ids, merged_vectors, latest)
+        elapsed = time.perf_counter() - started
+        logger.info(f"{self.schema}.{self.table}: vector index synced "
+                    f"({self.size} rows, {len(changed)} changed, {len(removed)} removed, {elapsed:.2f}s)")
+        return {'rows': self.size, 'changed': len(changed), 'removed': len(removed),
+                'seconds': round(elapsed, 3)}
+
+
+# ============ LOADED INDEXES ============
+
+_indexes: Dict[Tuple[str, str], NumpyVectorIndex] = {}
+_indexes_lock = threading.Lock()
+_sync_thread = None
+
+
+def load_unit_index(schema: str, table: str = 'knowledge', db_config: Dict = DB_CONFIG,
+                    sync: bool = True) -> NumpyVectorIndex:
+    """Map a unit's index (building it on first use) and register it for routing and background sync"""
+    index = NumpyVectorIndex(schema, table, db_config=db_config)
+    if not index.load() or sync:
+        index.sync()
+    with _indexes_lock:
+        _indexes[(schema, table)] = index
+    start_sync_thread()
+    return index
+
+
+def get_unit_index(schema: str, table: str = 'knowledge') -> Optional[NumpyVectorIndex]:
+    return _indexes.get((schema, table))
+
+
+def unload_unit_index(schema: str, table: str = 'knowledge'):
+    with _indexes_lock:
+        _indexes.pop((schema, table), None)
+
+
+def sync_loaded_indexes() -> Dict[str, Dict]:
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    results = {}
+    for index in indexes:
+        try:
+            results[f"{index.schema}.{index.table}"] = index.sync()
+        except Exception as e:
+            logger.error(f"Vector index sync failed for {index.schema}.{index.table}: {e}")
+    return results
+
+
+def start_sync_thread(interval: float = SYNC_INTERVAL):
+    """Daemon thread that re-syncs every loaded index every `interval` seconds"""
+    global _sync_thread
+    with _indexes_lock:
+        if _sync_thread is not None or interval <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                sync_loaded_indexes()
+
+        _sync_thread = threading.Thread(target=loop, name='vector-index-sync', daemon=True)
+        _sync_thread.start()
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description='Build and benchmark in-process NumPy vector indexes')
+    parser.add_argument('command', choices=['build', 'bench'])
+    parser.add_argument('schemas', nargs='+')
+    parser.add_argument('--table', default='knowledge')
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    for schema in args.schemas:
+        index = NumpyVectorIndex(schema, args.table)
+        started = time.perf_counter()
+        loaded = index.load()
+        load_ms = (time.perf_counter() - started) * 1000
+        if args.command == 'build' or not loaded:
+            print(f"{schema}.{args.table}: {index.sync(rebuild=args.rebuild)}")
+        if args.command == 'bench' and index.size:
+            _, vectors = index._snapshot
+            sample = np.asarray(vectors[np.random.randint(0, index.size, args.queries)])
+            latencies = []
+            for query in sample:
+                started = time.perf_counter()
+                index.search(query, args.k)
+                latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            print(f"{schema}.{args.table}: {index.size} rows, mmap load {load_ms:.2f} ms, "
+                  f"top-{args.k} p50 {latencies[len(latencies) // 2] * 1000:.3f} ms, "
+                  f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
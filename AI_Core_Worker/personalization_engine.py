@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from collections import Counter
 import json
 import logging
+import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +24,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 class PersonalizationEngine:
     """AI-powered personalization based on user behavior"""
@@ -3,7 +3,75 @@ R3ÆLƎR AI Prompts System
 Contains AI personality, knowledge, and response templates
 """
 
+import re
 import logging
+from collections import namedtuple
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+KnowledgeEntry = namedtuple('KnowledgeEntry', 'key value topic content category topic_lower content_lower')
+
+
+def _any_term(terms):
+    """One compiled search standing in for any(term in text for term in terms)"""
+    return re.compile('|'.join(re.escape(term) for term in terms))
+
+
+class KnowledgeIndex:
+    """KNOWLEDGE_BASE with its text lower-cased once and topic lookups precomputed
+
+    Topic names are found in a message by walking a prefix set (a hashed trie)
+    from each position and stopping as soon as no topic continues, so the
+    cost follows the message length rather than the number of topics. Which
+    entries mention a keyword is worked out the first time it is asked and kept.
+    """
+
+    def __init__(self, knowledge_base):
+        self.signature = (id(knowledge_base), len(knowledge_base))
+        self.entries = []
+        self.topics = {}  # topic key -> entry position
+        self.prefixes = set()
+        self._mentions = {}
+
+        for position, (key, value) in enumerate(knowledge_base.items()):
+            if isinstance(value, dict):
+                topic = str(value.get('topic', key))[:100]
+                content = str(value.get('content', ''))
+                category = str(value.get('category', ''))[:50]
+            else:
+                topic = str(key)[:100]
+                content = str(value)
+                category = 'General'
+            self.entries.append(KnowledgeEntry(key, value, topic, content, category,
+                                               topic.lower(), content.lower()))
+
+            name = str(key)
+            self.topics[name] = position
+            self.prefixes.update(name[:end] for end in range(1, len(name) + 1))
+
+    def topics_in(self, text):
+        """Positions of the entries whose key occurs anywhere in text"""
+        found = set()
+        prefixes, topics = self.prefixes, self.topics
+        length = len(text)
+        for start in range(length):
+            end = start + 1
+            while end <= length and text[start:end] in prefixes:
+                position = topics.get(text[start:end])
+                if position is not None:
+                    found.add(position)
+                end += 1
+        return found
+
+    def mentioning(self, keyword):
+        """Positions of the entries whose lower-cased content contains keyword"""
+        positions = self._mentions.get(keyword)
+        if positions is None:
+            positions = frozenset(position for position, entry in enumerate(self.entries)
+                                  if keyword in entry.content_lower)
+            self._mentions[keyword] = positions
+        return positions
+
 
 class R3AELERPrompts:
     """R3ÆLƎR AI Personality and Knowledge System"""
@@ -804,6 +872,46 @@ class R3AELERPrompts:
             "confidence_scoring": False
         })
     
+    # Context analysis vocabularies, checked in order (first match wins)
+    DOMAIN_KEYWORDS = (
+        ("technology", frozenset(['code', 'programming', 'python', 'javascript', 'algorithm', 'function', 'database'])),
+        ("cryptocurrency", frozenset(['bitcoin', 'cryptocurrency', 'blockchain', 'wallet', 'mining', 'defi', 'exchange'])),
+        ("forensics", frozenset(['forensics', 'investigation', 'analysis', 'evidence', 'recovery', 'extraction'])),
+        ("mobile", frozenset(['ios', 'iphone', 'android', 'mobile', 'device', 'jailbreak', 'acquisition']))
+    )
+    
+    INTENT_TERMS = (
+        ("question", _any_term(['how', 'what', 'why', 'when', 'where'])),
+        ("assistance", _any_term(['help', 'assist', 'support'])),
+        ("analysis", _any_term(['analyze', 'examine', 'investigate'])),
+        ("creation", _any_term(['create', 'build', 'generate', 'make']))
+    )
+    
+    COMPETITIVE_INDICATORS = _any_term(['separates', 'different', 'advantage', 'versus', 'vs', 'compared', 'better', 'unique'])
+    AI_COMPETITOR_NAMES = _any_term(['gemini', 'grok', 'chatgpt', 'claude', 'bard', 'copilot'])
+    
+    _knowledge_index = None
+    
+    @classmethod
+    def knowledge_index(cls, refresh=False):
+        """KnowledgeIndex over KNOWLEDGE_BASE
+
+        The index is rebuilt on its own only when the dict is swapped or its
+        length changes. Replacing an entry in place, or adding and removing
+        the same number, is not noticed: load entries with update_knowledge(),
+        or pass refresh=True after mutating KNOWLEDGE_BASE directly.
+        """
+        index = cls._knowledge_index
+        if refresh or index is None or index.signature != (id(cls.KNOWLEDGE_BASE), len(cls.KNOWLEDGE_BASE)):
+            index = cls._knowledge_index = KnowledgeIndex(cls.KNOWLEDGE_BASE)
+        return index
+    
+    @classmethod
+    def update_knowledge(cls, entries):
+        """Merge entries into KNOWLEDGE_BASE (new or replacing existing topics) and rebuild the index"""
+        cls.KNOWLEDGE_BASE.update(entries)
+        return cls.knowledge_index(refresh=True)
+    
     @classmethod
     def analyze_context(cls, user_message, conversation_history=None):
         """Analyze user message and conversation context for dynamic response generation"""
@@ -819,54 +927,38 @@ class R3AELERPrompts:
             "conversation_flow": conversation_history or []
         }
         
-        # Extract keywords and determine domain
-        tech_keywords = ['code', 'programming', 'python', 'javascript', 'algorithm', 'function', 'database']
-        crypto_keywords = ['bitcoin', 'cryptocurrency', 'blockchain', 'wallet', 'mining', 'defi', 'exchange']
-        forensics_keywords = ['forensics', 'investigation', 'analysis', 'evidence', 'recovery', 'extraction']
-        mobile_keywords = ['ios', 'iphone', 'android', 'mobile', 'device', 'jailbreak', 'acquisition']
-        
-        # Check for whole word matches using regex word boundaries
-        import re
-        words = set(re.findall(r'\b\w+\b', message_lower))
+        # Extract keywords and determine domain (whole words only)
+        words = set(WORD_PATTERN.findall(message_lower))
         
         # Special handling for competitive positioning queries
-        competitive_indicators = ['separates', 'different', 'advantage', 'versus', 'vs', 'compared', 'better', 'unique']
-        ai_competitor_names = ['gemini', 'grok', 'chatgpt', 'claude', 'bard', 'copilot']
-        
-        has_competitive_terms = any(term in message_lower for term in competitive_indicators)
-        has_ai_competitors = any(name in message_lower for name in ai_competitor_names)
+        has_competitive_terms = cls.COMPETITIVE_INDICATORS.search(message_lower)
+        has_ai_competitors = cls.AI_COMPETITOR_NAMES.search(message_lower)
         
         if has_competitive_terms and has_ai_competitors:
             context["domain"] = "ai"
             context["keywords"].extend(["competitive", "advantage", "ai"])
         
-        if words & set(tech_keywords):
-            context["domain"] = "technology"
-            context["keywords"].extend(list(words & set(tech_keywords)))
-        elif words & set(crypto_keywords):
-            context["domain"] = "cryptocurrency"
-            context["keywords"].extend(list(words & set(crypto_keywords)))
-        elif words & set(forensics_keywords):
-            context["domain"] = "forensics"
-            context["keywords"].extend(list(words & set(forensics_keywords)))
-        elif words & set(mobile_keywords):
-            context["domain"] = "mobile"
-            context["keywords"].extend(list(words & set(mobile_keywords)))
+        for domain, domain_keywords in cls.DOMAIN_KEYWORDS:
+            matched = words & domain_keywords
+            if matched:
+                context["domain"] = domain
+                context["keywords"].extend(matched)
+                break
         
         # Determine intent
-        if any(word in message_lower for word in ['how', 'what', 'why', 'when', 'where']):
-            context["intent"] = "question"
-        elif any(word in message_lower for word in ['help', 'assist', 'support']):
-            context["intent"] = "assistance"
-        elif any(word in message_lower for word in ['analyze', 'examine', 'investigate']):
-            context["intent"] = "analysis"
-        elif any(word in message_lower for word in ['create', 'build', 'generate', 'make']):
-            context["intent"] = "creation"
-        
-        # Find relevant knowledge
-        for topic, knowledge in cls.KNOWLEDGE_BASE.items():
-            if topic in message_lower or any(keyword in knowledge.lower() for keyword in context["keywords"]):
-                context["relevant_knowledge"].append({"topic": topic, "content": knowledge})
+        for intent, terms in cls.INTENT_TERMS:
+            if terms.search(message_lower):
+                context["intent"] = intent
+                break
+        
+        # Find relevant knowledge, in KNOWLEDGE_BASE order
+        index = cls.knowledge_index()
+        relevant = index.topics_in(message_lower)
+        for keyword in context["keywords"]:
+            relevant |= index.mentioning(keyword)
+        for position in sorted(relevant):
+            entry = index.entries[position]
+            context["relevant_knowledge"].append({"topic": entry.key, "content": entry.value})
         
         # Special handling for competitive advantage queries
         if context["domain"] == "ai" and "competitive" in context["keywords"]:
@@ -1060,4 +1152,8 @@ class R3AELERPrompts:
     @classmethod
     def get_system_message(cls):
         """Get system initialization message"""
-        return "R3ÆLƎR TƎCH™ Authorization complete. Advanced AI systems online. How may I assist you?"
\ No newline at end of file
+        return "R3ÆLƎR TƎCH™ Authorization complete. Advanced AI systems online. How may I assist you?"
+
+
+# Build the index at import, not on the first request
+R3AELERPrompts.knowledge_index()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: Search Result Cache
+In-process LRU/TTL cache for storage facility search responses.
+
+Entries are keyed on the normalised query, the set of units searched and
+the search parameters. Each unit has a version counter that is bumped on
+every write, and a cached entry remembers the versions it was computed
+against, so storing knowledge in one unit only invalidates searches that
+touched that unit.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CACHE_TTL = float(os.getenv('R3ALER_SEARCH_CACHE_TTL', '300'))  # seconds
+CACHE_MAX_ENTRIES = int(os.getenv('R3ALER_SEARCH_CACHE_MAX_ENTRIES', '5000'))
+CACHE_MAX_BYTES = int(os.getenv('R3ALER_SEARCH_CACHE_MAX_MB', '64')) * 1024 * 1024
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Case-folded query with whitespace collapsed"""
+    return _WHITESPACE.sub(' ', (query or '').casefold()).strip()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-serialisable response"""
+    return len(json.dumps(value, default=str))
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache with TTL expiry, a byte budget and per-unit versions"""
+
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # key -> (value, size, expires_at, versions)
+        self._bytes = 0
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'invalidated': 0,
+            'evictions': 0,
+            'rejected': 0
+        }
+
+    @staticmethod
+    def make_key(query: str, units: Iterable[str], *params) -> Tuple:
+        return (normalize_query(query), tuple(sorted(units)), params)
+
+    def versions(self, units: Iterable[str]) -> Tuple[int, ...]:
+        """Current version of each unit, in key order; take this before running the search"""
+        with self._lock:
+            return tuple(self._versions[unit] for unit in sorted(units))
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            value, size, expires_at, versions = entry
+            if time.monotonic() >= expires_at:
+                self._stats['expired'] += 1
+            elif versions != tuple(self._versions[unit] for unit in key[1]):
+                self._stats['invalidated'] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return value
+
+            self._remove(key)
+            self._stats['misses'] += 1
+            return None
+
+    def put(self, key: Tuple, value: Any, versions: Optional[Tuple[int, ...]] = None):
+        """
+        Cache a response. Pass the versions read before the search ran, so a
+        write that lands during the search leaves the entry already stale.
+        """
+        if self.max_entries <= 0:
+            return
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats['rejected'] += 1
+                return
+            if versions is None:
+                versions = tuple(self._versions[unit] for unit in key[1])
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, time.monotonic() + self.ttl, versions)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate_unit(self, unit_id: str):
+        """Called after a write; stale entries are dropped lazily on lookup"""
+        with self._lock:
+            self._versions[unit_id] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Tuple):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
@@ -25,8 +25,8 @@ def search_knowledge(query):
         cur = conn.cursor()
         cur.execute("""
             SELECT topic, LEFT(content, 1000) FROM crypto_unit.knowledge 
-            WHERE to_tsvector('english', topic || ' ' || content) @@ plainto_tsquery(%s)
-            ORDER BY ts_rank_cd(to_tsvector(topic || ' ' || content), plainto_tsquery(%s)) DESC
+            WHERE search_vector @@ plainto_tsquery('english', %s)
+            ORDER BY ts_rank_cd(search_vector, plainto_tsquery('english', %s)) DESC
             LIMIT 3
         """, [query, query])
         results = cur.fetchall()
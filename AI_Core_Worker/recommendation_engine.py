@@ -9,6 +9,7 @@ from psycopg2.extras import RealDictCursor
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 import logging
+import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +23,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 class RecommendationEngine:
     """AI-powered recommendations for tools, topics, and learning paths"""
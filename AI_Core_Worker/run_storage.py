@@ -1,8 +1,13 @@
-"""Production runner for Storage Facility"""
+"""Production runner for Storage Facility (pass --async for the asyncio server)"""
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+if '--async' in sys.argv:
+    import async_storage_facility
+    async_storage_facility.main(['--host', '0.0.0.0', '--port', '3003'])
+    sys.exit(0)
+
 from waitress import serve
 import self_hosted_storage_facility
 
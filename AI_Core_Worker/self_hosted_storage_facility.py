@@ -5,18 +5,36 @@ Uses PostgreSQL schemas as "storage units"
 """
 
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
 from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 import json
 import os
+import re
+import io
+import csv
 from datetime import datetime, timedelta
 import threading
 import time
 import logging
 import statistics
+import heapq
+from itertools import islice
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+import db_pool
+from query_cache import QueryResultCache
+from migrate_search_vector import ensure_search_vector, has_search_vector
+from content_dedup import (
+    content_fingerprint, simhash, ensure_content_hash, has_content_hash,
+    find_existing_hashes, duplicate_report
+)
+from facility_stats import (
+    ensure_stats_table, seed_unit_stats, refresh_unit_stats, increment_unit_entries,
+    fetch_unit_stats, stale_units
+)
 
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 CORS(app)
@@ -87,6 +105,38 @@ class StorageFacility:
             }
         }
         
+        # search_all_units strategy: 'parallel' (fan-out), 'union' (one statement)
+        # or 'sequential' (one unit after another)
+        self.search_mode = 'parallel'
+        self.unit_search_timeout = 2.0  # seconds each unit gets before it is dropped
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=len(self.units) * 2,
+            thread_name_prefix='unit-search'
+        )
+        # One fan-out borrows a connection per unit, so size the shared pool for it
+        db_pool.get_pool(
+            self.db_config,
+            max_size=max(db_pool.POOL_MAX_SIZE, len(self.units) * 3)
+        )
+        
+        # Cached discovery of dynamic *_unit schemas
+        self.schema_cache_ttl = 300  # seconds
+        self._dynamic_units = {}
+        self._dynamic_units_loaded_at = None  # monotonic time of the last lookup
+        self._dynamic_units_lock = threading.Lock()
+        
+        # Every stored row gets a normalised content_hash that is checked before
+        # insert; SimHash near-duplicate signatures cost more and are opt-in
+        self.near_duplicate_signatures = False
+        
+        # Search responses cached per (query, units, params); writes bump unit versions
+        self.result_cache = QueryResultCache()
+        
+        # Status reads the materialised facility_unit_stats rows; the exact
+        # COUNT(DISTINCT) recount runs in the background at this interval
+        self.stats_refresh_interval = 900  # seconds
+        self._stats_refresher = None
+        
         print("\n[STORAGE] Initializing R3AL3R Storage Facility...")
         try:
             self.initialize_facility()
@@ -96,215 +146,624 @@ class StorageFacility:
             print("[WARNING] Make sure PostgreSQL is running and credentials are correct\n")
     
     def get_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(**self.db_config)
+        """Get a pooled database connection (close() returns it to the pool)"""
+        return db_pool.get_connection(self.db_config)
+    
+    def pooled_connection(self):
+        """Borrow a pooled connection and always hand it back (``with`` block)"""
+        return db_pool.connection(self.db_config)
     
     def initialize_facility(self):
         """Create all storage units (schemas and tables)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        for unit_id, unit_info in self.units.items():
-            schema = unit_info['schema']
-            
-            # Create schema (storage unit)
-            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
-            
-            # Create knowledge table
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {schema}.knowledge (
-                    id SERIAL PRIMARY KEY,
-                    entry_id VARCHAR(200) UNIQUE,
-                    topic TEXT,
-                    content TEXT,
-                    category VARCHAR(200),
-                    subcategory VARCHAR(200),
-                    level VARCHAR(100),
-                    source VARCHAR(200),
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            
-            # Create indexes for fast search
-            cursor.execute(f"""
-                CREATE INDEX IF NOT EXISTS idx_{unit_id}_category 
-                ON {schema}.knowledge(category)
-            """)
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
             
-            cursor.execute(f"""
-                CREATE INDEX IF NOT EXISTS idx_{unit_id}_topic 
-                ON {schema}.knowledge(topic)
-            """)
+            for unit_id, unit_info in self.units.items():
+                schema = unit_info['schema']
+                
+                # Create schema (storage unit)
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                
+                # Create knowledge table
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {schema}.knowledge (
+                        id SERIAL PRIMARY KEY,
+                        entry_id VARCHAR(200) UNIQUE,
+                        topic TEXT,
+                        content TEXT,
+                        category VARCHAR(200),
+                        subcategory VARCHAR(200),
+                        level VARCHAR(100),
+                        source VARCHAR(200),
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        updated_at TIMESTAMP DEFAULT NOW()
+                    )
+                """)
+                
+                # Create indexes for fast search
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{unit_id}_category 
+                    ON {schema}.knowledge(category)
+                """)
+                
+                cursor.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{unit_id}_topic 
+                    ON {schema}.knowledge(topic)
+                """)
+                
+                # Stored, weighted tsvector column + GIN index for full-text search
+                ensure_search_vector(cursor, schema)
+                
+                # content_hash / simhash fingerprints for deduplication
+                ensure_content_hash(cursor, schema)
             
-            # Full-text search index
-            cursor.execute(f"""
-                CREATE INDEX IF NOT EXISTS idx_{unit_id}_fts 
-                ON {schema}.knowledge 
-                USING GIN(to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, '')))
-            """)
+            # Materialised per-unit stats, seeded from planner estimates
+            ensure_stats_table(cursor)
+            for unit_id, unit_info in self.units.items():
+                seed_unit_stats(cursor, unit_id, unit_info['schema'])
             
-        conn.commit()
-        cursor.close()
-        conn.close()
-    
-    def store_knowledge(self, unit_id: str, entries: List[Dict]) -> Dict:
-        """Store knowledge in a specific unit"""
-        # Check if unit exists in predefined units or as a dynamic schema
-        schema = None
-        if unit_id in self.units:
-            schema = self.units[unit_id]['schema']
-        else:
-            # Check if it's a dynamic unit (schema exists)
-            schema = f"{unit_id}_unit"
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    SELECT schema_name FROM information_schema.schemata
-                    WHERE schema_name = %s
-                """, (schema,))
-                if not cursor.fetchone():
-                    cursor.close()
-                    conn.close()
-                    return {'error': f'Unit {unit_id} not found (schema {schema} does not exist)'}
-            except Exception as e:
-                cursor.close()
-                conn.close()
-                return {'error': f'Error checking unit {unit_id}: {e}'}
+            conn.commit()
             cursor.close()
-            conn.close()
-
+    
+    def discover_units(self, refresh: bool = False) -> Dict[str, str]:
+        """
+        Map every searchable unit id to its schema: the predefined units plus
+        any dynamic ``<unit>_unit`` schema that has a knowledge table.
+        
+        Dynamic schemas are looked up in information_schema at most once per
+        schema_cache_ttl seconds instead of on every call.
+        """
+        if refresh or not self.units_fresh():
+            with self._dynamic_units_lock:
+                if refresh or not self.units_fresh():
+                    self._dynamic_units = self._load_dynamic_units()
+                    self._dynamic_units_loaded_at = time.monotonic()
+        
+        units = {unit_id: info['schema'] for unit_id, info in self.units.items()}
+        for unit_id, schema in self._dynamic_units.items():
+            units.setdefault(unit_id, schema)
+        return units
+    
+    def units_fresh(self) -> bool:
+        """True while the cached dynamic unit lookup is younger than schema_cache_ttl"""
+        loaded_at = self._dynamic_units_loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at <= self.schema_cache_ttl
+    
+    def _load_dynamic_units(self) -> Dict[str, str]:
+        """Read *_unit schemas that contain a knowledge table"""
+        known = {info['schema'] for info in self.units.values()}
         conn = self.get_connection()
         cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT table_schema FROM information_schema.tables
+                WHERE table_name = 'knowledge' AND table_schema LIKE %s
+            """, ('%\\_unit',))
+            dynamic = {}
+            for (schema,) in cursor.fetchall():
+                # Schema names are interpolated into SQL, so only accept plain identifiers
+                if schema in known or not re.fullmatch(r'[a-z0-9_]+_unit', schema):
+                    continue
+                if not has_search_vector(cursor, schema):
+                    # Adding the stored column rewrites the table under an exclusive
+                    # lock, so it is never done here on the request path
+                    print(f"[WARNING] Skipping unit {schema}: no search_vector column "
+                          f"(run: python migrate_search_vector.py {schema})")
+                    continue
+                if not has_content_hash(cursor, schema):
+                    # Schema changes belong to the migration, not to discovery
+                    print(f"[WARNING] Skipping unit {schema}: no content_hash column "
+                          f"(run: python content_dedup.py backfill {schema})")
+                    continue
+                dynamic[schema[:-len('_unit')]] = schema
+            return dynamic
+        except Exception as e:
+            print(f"[WARNING] Unit discovery failed: {e}")
+            return dict(self._dynamic_units)
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def _resolve_schema(self, unit_id: str) -> Optional[str]:
+        """Schema for a unit id, re-checking the database only on a cache miss"""
+        if unit_id in self.units:
+            return self.units[unit_id]['schema']
+        schema = self.discover_units().get(unit_id)
+        if schema is None:
+            schema = self.discover_units(refresh=True).get(unit_id)
+        return schema
+    
+    def get_unit_name(self, unit_id: str) -> str:
+        if unit_id in self.units:
+            return self.units[unit_id]['name']
+        return f"{unit_id.replace('_', ' ').title()} Unit"
+    
+    KNOWLEDGE_COLUMNS = ('entry_id', 'topic', 'content', 'category', 'subcategory', 'level', 'source',
+                         'content_hash', 'simhash')
+    KNOWLEDGE_TEXT_COLUMNS = KNOWLEDGE_COLUMNS[1:7]
+    
+    def _normalize_entry(self, unit_id: str, entry: Dict) -> Optional[tuple]:
+        """Map an incoming entry onto the knowledge columns (None = nothing to store)"""
+        entry_id = entry.get('id', entry.get('entry_id', ''))
+        topic = entry.get('topic', entry.get('question', ''))
+        content = entry.get('content', entry.get('answer', entry.get('explanation', '')))
+        category = entry.get('category', entry.get('domain', ''))
+        subcategory = entry.get('subcategory', '')
+        level = entry.get('level', entry.get('difficulty', ''))
+        source = entry.get('source', '')
         
+        # Skip if no content
+        if not content and not topic:
+            return None
+        
+        content_hash = content_fingerprint(topic, content)
+        signature = simhash(f"{topic} {content}") if self.near_duplicate_signatures else None
+        
+        # Derive a missing ID from the content so re-running an ingestion upserts
+        if not entry_id:
+            entry_id = f"{unit_id}_{content_hash[:24]}"
+        
+        return (str(entry_id), topic, content, category, subcategory, level, source,
+                content_hash, signature)
+    
+    def _drop_duplicates(self, cursor, schema: str, rows: List[tuple]) -> tuple:
+        """
+        Drop rows whose content is already stored (or earlier in the batch)
+        under a different entry_id. One lookup per batch; returns (rows, dropped).
+        """
+        existing = find_existing_hashes(cursor, schema, (row[7] for row in rows))
+        kept = []
+        for row in rows:
+            owner = existing.setdefault(row[7], row[0])
+            if owner == row[0]:
+                kept.append(row)
+        return kept, len(rows) - len(kept)
+    
+    def store_knowledge(self, unit_id: str, entries: List[Dict]) -> Dict:
+        """Store knowledge in a specific unit"""
+        schema = self._resolve_schema(unit_id)
+        if schema is None:
+            return {'error': f'Unit {unit_id} not found (schema {unit_id}_unit does not exist)'}
+
         stored_count = 0
         updated_count = 0
         error_count = 0
         
+        rows = []
         for entry in entries:
             try:
-                # Get entry data
-                entry_id = entry.get('id', entry.get('entry_id', ''))
-                topic = entry.get('topic', entry.get('question', ''))
-                content = entry.get('content', entry.get('answer', entry.get('explanation', '')))
-                category = entry.get('category', entry.get('domain', ''))
-                subcategory = entry.get('subcategory', '')
-                level = entry.get('level', entry.get('difficulty', ''))
-                source = entry.get('source', '')
-                
-                # Skip if no content
-                if not content and not topic:
-                    continue
-                
-                # Generate ID if missing
-                if not entry_id:
-                    entry_id = f"{unit_id}_{stored_count}_{datetime.now().timestamp()}"
-                
-                cursor.execute(f"""
-                    INSERT INTO {schema}.knowledge 
-                    (entry_id, topic, content, category, subcategory, level, source)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (entry_id) DO UPDATE SET
-                        topic = EXCLUDED.topic,
-                        content = EXCLUDED.content,
-                        category = EXCLUDED.category,
-                        subcategory = EXCLUDED.subcategory,
-                        level = EXCLUDED.level,
-                        source = EXCLUDED.source,
-                        updated_at = NOW()
-                """, (entry_id, topic, content, category, subcategory, level, source))
-                
-                if cursor.rowcount > 0:
-                    stored_count += 1
-                else:
-                    updated_count += 1
-                    
+                row = self._normalize_entry(unit_id, entry)
+                if row is not None:
+                    rows.append(row)
             except Exception as e:
                 error_count += 1
                 if error_count < 5:  # Only print first few errors
                     print(f"[WARNING] Error storing entry: {e}")
         
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                rows, duplicate_count = self._drop_duplicates(cursor, schema, rows)
+                
+                for row in rows:
+                    try:
+                        # Savepoint so one bad entry doesn't abort the rest of the transaction
+                        cursor.execute("SAVEPOINT store_entry")
+                        cursor.execute(f"""
+                            INSERT INTO {schema}.knowledge 
+                            ({', '.join(self.KNOWLEDGE_COLUMNS)})
+                            VALUES ({', '.join(['%s'] * len(self.KNOWLEDGE_COLUMNS))})
+                            ON CONFLICT (entry_id) DO UPDATE SET
+                                topic = EXCLUDED.topic,
+                                content = EXCLUDED.content,
+                                category = EXCLUDED.category,
+                                subcategory = EXCLUDED.subcategory,
+                                level = EXCLUDED.level,
+                                source = EXCLUDED.source,
+                                content_hash = EXCLUDED.content_hash,
+                                simhash = EXCLUDED.simhash,
+                                updated_at = NOW()
+                            RETURNING (xmax = 0) AS inserted
+                        """, row)
+                        
+                        # xmax is only zero for freshly inserted row versions
+                        if cursor.fetchone()[0]:
+                            stored_count += 1
+                        else:
+                            updated_count += 1
+                        cursor.execute("RELEASE SAVEPOINT store_entry")
+                            
+                    except Exception as e:
+                        error_count += 1
+                        if error_count < 5:  # Only print first few errors
+                            print(f"[WARNING] Error storing entry: {e}")
+                        if conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+                            cursor.execute("ROLLBACK TO SAVEPOINT store_entry")
+                
+                increment_unit_entries(cursor, unit_id, stored_count)
+                conn.commit()
+            finally:
+                cursor.close()
+        
+        if stored_count or updated_count:
+            self.result_cache.invalidate_unit(unit_id)
         
         return {
             'unit': unit_id,
             'stored': stored_count,
             'updated': updated_count,
+            'duplicates': duplicate_count,
             'errors': error_count,
             'total': len(entries)
         }
     
-    def search_unit(self, unit_id: str, query: str, limit: int = 10) -> List[Dict]:
-        """Search within a specific storage unit"""
-        # Check if unit exists in predefined units or as a dynamic schema
-        schema = None
-        if unit_id in self.units:
-            schema = self.units[unit_id]['schema']
-        else:
-            # Check if it's a dynamic unit (schema exists)
-            schema = f"{unit_id}_unit"
-            conn = self.get_connection()
-            cursor = conn.cursor()
+    def bulk_store_knowledge(self, unit_id: str, entries: Iterable[Dict],
+                             batch_size: int = 5000) -> Dict:
+        """
+        Bulk ingestion: stream entries through COPY into a temp staging table
+        and merge each batch with one set-based upsert.
+        
+        entries may be any iterable (e.g. a generator over an NDJSON request
+        body); only one batch is held in memory at a time. A batch that fails
+        to COPY or merge is retried row by row so errors are counted per entry.
+        """
+        schema = self._resolve_schema(unit_id)
+        if schema is None:
+            return {'error': f'Unit {unit_id} not found (schema {unit_id}_unit does not exist)'}
+        
+        totals = {'stored': 0, 'updated': 0, 'duplicates': 0, 'errors': 0, 'total': 0, 'batches': 0}
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        def flush(rows):
+            if not rows:
+                return
+            rows, duplicates = self._drop_duplicates(cursor, schema, rows)
+            totals['duplicates'] += duplicates
+            if not rows:
+                conn.commit()
+                return
             try:
-                cursor.execute("""
-                    SELECT schema_name FROM information_schema.schemata
-                    WHERE schema_name = %s
-                """, (schema,))
-                if not cursor.fetchone():
-                    cursor.close()
-                    conn.close()
-                    return []
+                stored, updated = self._copy_merge_batch(cursor, schema, rows)
+                increment_unit_entries(cursor, unit_id, stored)
+                conn.commit()
             except Exception as e:
-                cursor.close()
-                conn.close()
-                return []
+                conn.rollback()
+                print(f"[WARNING] Bulk batch failed ({e}); retrying row by row")
+                stored, updated, errors = self._merge_rows_individually(cursor, schema, rows)
+                increment_unit_entries(cursor, unit_id, stored)
+                conn.commit()
+                totals['errors'] += errors
+            totals['stored'] += stored
+            totals['updated'] += updated
+            totals['batches'] += 1
+            if stored or updated:
+                self.result_cache.invalidate_unit(unit_id)
+        
+        try:
+            batch = []
+            for entry in entries:
+                totals['total'] += 1
+                if not isinstance(entry, dict):
+                    # Unparseable NDJSON lines arrive as error markers
+                    totals['errors'] += 1
+                    continue
+                row = self._normalize_entry(unit_id, entry)
+                if row is None:
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            flush(batch)
+        finally:
             cursor.close()
             conn.close()
+        
+        return {'unit': unit_id, 'mode': 'bulk', **totals}
+    
+    def _copy_merge_batch(self, cursor, schema: str, rows: List[tuple]) -> tuple:
+        """COPY one batch into staging and upsert it; returns (inserted, updated)"""
+        columns = ', '.join(self.KNOWLEDGE_COLUMNS)
+        cursor.execute(f"""
+            CREATE TEMP TABLE knowledge_staging (
+                seq INTEGER,
+                entry_id VARCHAR(200),
+                topic TEXT,
+                content TEXT,
+                category VARCHAR(200),
+                subcategory VARCHAR(200),
+                level VARCHAR(100),
+                source VARCHAR(200),
+                content_hash CHAR(64),
+                simhash BIGINT
+            ) ON COMMIT DROP
+        """)
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for seq, row in enumerate(rows):
+            writer.writerow((seq,) + row)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY knowledge_staging (seq, {columns}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(self.KNOWLEDGE_TEXT_COLUMNS)}))",
+            buffer
+        )
+        
+        # Last occurrence wins when an entry_id repeats inside the batch
+        cursor.execute(f"""
+            WITH upserted AS (
+                INSERT INTO {schema}.knowledge ({columns})
+                SELECT DISTINCT ON (entry_id) {columns}
+                FROM knowledge_staging
+                ORDER BY entry_id, seq DESC
+                ON CONFLICT (entry_id) DO UPDATE SET
+                    topic = EXCLUDED.topic,
+                    content = EXCLUDED.content,
+                    category = EXCLUDED.category,
+                    subcategory = EXCLUDED.subcategory,
+                    level = EXCLUDED.level,
+                    source = EXCLUDED.source,
+                    content_hash = EXCLUDED.content_hash,
+                    simhash = EXCLUDED.simhash,
+                    updated_at = NOW()
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                COUNT(*) FILTER (WHERE inserted),
+                COUNT(*) FILTER (WHERE NOT inserted)
+            FROM upserted
+        """)
+        inserted, updated = cursor.fetchone()
+        return inserted, updated
+    
+    def _merge_rows_individually(self, cursor, schema: str, rows: List[tuple]) -> tuple:
+        """Fallback for a failed batch; returns (inserted, updated, errors)"""
+        inserted = updated = errors = 0
+        for row in rows:
+            try:
+                cursor.execute("SAVEPOINT bulk_row")
+                cursor.execute(f"""
+                    INSERT INTO {schema}.knowledge ({', '.join(self.KNOWLEDGE_COLUMNS)})
+                    VALUES ({', '.join(['%s'] * len(self.KNOWLEDGE_COLUMNS))})
+                    ON CONFLICT (entry_id) DO UPDATE SET
+                        topic = EXCLUDED.topic,
+                        content = EXCLUDED.content,
+                        category = EXCLUDED.category,
+                        subcategory = EXCLUDED.subcategory,
+                        level = EXCLUDED.level,
+                        source = EXCLUDED.source,
+                        content_hash = EXCLUDED.content_hash,
+                        simhash = EXCLUDED.simhash,
+                        updated_at = NOW()
+                    RETURNING (xmax = 0) AS inserted
+                """, row)
+                if cursor.fetchone()[0]:
+                    inserted += 1
+                else:
+                    updated += 1
+                cursor.execute("RELEASE SAVEPOINT bulk_row")
+            except Exception as e:
+                errors += 1
+                if errors < 5:
+                    print(f"[WARNING] Error storing entry: {e}")
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+        return inserted, updated, errors
+    
+    def search_unit(self, unit_id: str, query: str, limit: int = 10,
+                    raise_errors: bool = False) -> List[Dict]:
+        """
+        Search within a specific storage unit. A failed query returns [] unless
+        raise_errors is set, so callers that cache can tell it from no results.
+        """
+        schema = self._resolve_schema(unit_id)
+        if schema is None:
+            return []
 
         conn = self.get_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         
         try:
-            # Full-text search with ranking
-            cursor.execute(f"""
-                SELECT 
-                    entry_id,
-                    topic,
-                    content,
-                    category,
-                    subcategory,
-                    level,
-                    source,
-                    ts_rank(
-                        to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, '')),
-                        plainto_tsquery('english', %s)
-                    ) as relevance
-                FROM {schema}.knowledge
-                WHERE to_tsvector('english', COALESCE(content, '') || ' ' || COALESCE(topic, ''))
-                      @@ plainto_tsquery('english', %s)
-                ORDER BY relevance DESC
-                LIMIT %s
-            """, (query, query, limit))
-            
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
+            return self._run_unit_search(cursor, schema, query, limit)
             
         except Exception as e:
             print(f"Search error: {e}")
+            if raise_errors:
+                raise
             return []
         finally:
             cursor.close()
             conn.close()
     
-    def search_all_units(self, query: str, limit_per_unit: int = 3) -> List[Dict]:
-        """Search across all storage units"""
+    @staticmethod
+    def _unit_search_sql(schema: str) -> str:
+        """Ranked full-text query for one unit; parameters are (query, limit)"""
+        return f"""
+            SELECT 
+                entry_id,
+                topic,
+                content,
+                category,
+                subcategory,
+                level,
+                source,
+                ts_rank(search_vector, q.query) as relevance
+            FROM {schema}.knowledge, plainto_tsquery('english', %s) AS q(query)
+            WHERE search_vector @@ q.query
+            ORDER BY relevance DESC
+            LIMIT %s
+        """
+    
+    def _run_unit_search(self, cursor, schema: str, query: str, limit: int) -> List[Dict]:
+        """Run the ranked full-text query against one unit schema"""
+        cursor.execute(self._unit_search_sql(schema), (query, limit))
+        return [dict(row) for row in cursor.fetchall()]
+    
+    def _search_unit_pooled(self, unit_id: str, query: str, limit: int,
+                            timeout: float) -> List[Dict]:
+        """Search one predefined unit on a pooled connection (fan-out worker)"""
+        schema = self.units[unit_id]['schema']
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                # Let Postgres cancel the query once the caller has stopped waiting
+                cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(timeout * 1000)),))
+                results = self._run_unit_search(cursor, schema, query, limit)
+            finally:
+                cursor.close()
+        
+        for result in results:
+            result['source_unit'] = unit_id
+            result['unit_name'] = self.units[unit_id]['name']
+        return results
+    
+    def fan_out_search(self, query: str, limit_per_unit: int = 3,
+                       max_results: Optional[int] = None,
+                       unit_timeout: Optional[float] = None) -> Dict:
+        """
+        Search every unit concurrently on pooled connections.
+        
+        Units that miss the deadline (or fail) are left out and reported, so the
+        caller still gets partial results. Each unit's rows arrive already sorted
+        by relevance and are merged with a heap, keeping only the top results.
+        """
+        timeout = unit_timeout if unit_timeout is not None else self.unit_search_timeout
+        futures = {
+            self._search_executor.submit(
+                self._search_unit_pooled, unit_id, query, limit_per_unit, timeout
+            ): unit_id
+            for unit_id in self.units
+        }
+        done, pending = wait(futures, timeout=timeout)
+        
+        streams = []
+        failed_units = []
+        for future in done:
+            try:
+                streams.append(future.result())
+            except Exception as e:
+                failed_units.append(futures[future])
+                print(f"Search error in unit {futures[future]}: {e}")
+        
+        timed_out_units = sorted(futures[future] for future in pending)
+        for future in pending:
+            future.cancel()
+        
+        merged = heapq.merge(*streams, key=lambda x: x.get('relevance', 0), reverse=True)
+        if max_results is not None:
+            merged = islice(merged, max_results)
+        
+        return {
+            'results': list(merged),
+            'timed_out_units': timed_out_units,
+            'failed_units': sorted(failed_units),
+            'partial': bool(timed_out_units or failed_units)
+        }
+    
+    def union_search(self, query: str, limit_per_unit: Optional[int] = 3,
+                     limit: Optional[int] = None, include_dynamic: bool = True) -> Dict:
+        """
+        Search all units with a single UNION ALL statement.
+        
+        limit_per_unit caps each unit's branch (same as search_all_units) and
+        limit caps the globally ordered result; either may be None. The total
+        number of hits before the global LIMIT is returned as total_results.
+        A failed statement loses every unit: it comes back as partial, with
+        all units in failed_units.
+        """
+        if include_dynamic:
+            units = self.discover_units()
+        else:
+            units = {unit_id: info['schema'] for unit_id, info in self.units.items()}
+        if not units:
+            return self._union_search_response([])
+        
+        sql, params = self._union_search_sql(units, query, limit_per_unit, limit)
+        conn = self.get_connection()
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cursor.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Search error: {e}")
+            return self._union_search_failed(units)
+        finally:
+            cursor.close()
+            conn.close()
+        
+        return self._union_search_response(rows)
+    
+    @staticmethod
+    def _union_search_sql(units: Dict[str, str], query: str, limit_per_unit: Optional[int],
+                          limit: Optional[int]) -> tuple:
+        """One UNION ALL statement over the given unit schemas; returns (sql, params)"""
+        branches = []
+        params = [query]
+        for unit_id, schema in units.items():
+            branch = f"""
+                SELECT
+                    %s::text AS source_unit,
+                    entry_id,
+                    topic,
+                    content,
+                    category,
+                    subcategory,
+                    level,
+                    source,
+                    ts_rank(search_vector, q.query) AS relevance
+                FROM {schema}.knowledge, q
+                WHERE search_vector @@ q.query
+            """
+            params.append(unit_id)
+            if limit_per_unit is not None:
+                branch += " ORDER BY relevance DESC LIMIT %s"
+                params.append(limit_per_unit)
+            branches.append(f"({branch})")
+        
+        sql = f"""
+            WITH q AS (SELECT plainto_tsquery('english', %s) AS query)
+            SELECT hits.*, COUNT(*) OVER () AS total_hits
+            FROM ({' UNION ALL '.join(branches)}) AS hits
+            ORDER BY relevance DESC
+        """
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+        return sql, params
+    
+    def _union_search_response(self, rows: List[Dict]) -> Dict:
+        total = rows[0]['total_hits'] if rows else 0
+        for row in rows:
+            del row['total_hits']
+            row['unit_name'] = self.get_unit_name(row['source_unit'])
+        return {'results': rows, 'total_results': total, 'failed_units': [], 'partial': False}
+    
+    @staticmethod
+    def _union_search_failed(units: Dict[str, str]) -> Dict:
+        return {'results': [], 'total_results': 0, 'failed_units': sorted(units), 'partial': True}
+    
+    def search_all_units(self, query: str, limit_per_unit: int = 3,
+                         mode: Optional[str] = None) -> List[Dict]:
+        """Search across all storage units ('parallel', 'union' or 'sequential')"""
+        mode = mode or self.search_mode
+        if mode == 'parallel':
+            return self.fan_out_search(query, limit_per_unit)['results']
+        if mode == 'union':
+            return self.union_search(query, limit_per_unit)['results']
+        return self.sequential_search(query, limit_per_unit)['results']
+    
+    def sequential_search(self, query: str, limit_per_unit: int = 3) -> Dict:
+        """Search one unit after another; units whose query fails are reported, not hidden"""
         all_results = []
+        failed_units = []
         
         for unit_id in self.units.keys():
-            results = self.search_unit(unit_id, query, limit_per_unit)
+            try:
+                results = self.search_unit(unit_id, query, limit_per_unit, raise_errors=True)
+            except Exception:
+                failed_units.append(unit_id)
+                continue
             for result in results:
                 result['source_unit'] = unit_id
                 result['unit_name'] = self.units[unit_id]['name']
@@ -312,54 +771,120 @@ class StorageFacility:
         
         # Sort by relevance
         all_results.sort(key=lambda x: x.get('relevance', 0), reverse=True)
-        return all_results
+        return {'results': all_results, 'failed_units': failed_units, 'partial': bool(failed_units)}
     
     def get_unit_stats(self, unit_id: str) -> Dict:
-        """Get statistics for a storage unit"""
+        """Get statistics for a storage unit (materialised, no table scan)"""
         if unit_id not in self.units:
             return {'error': f'Unit {unit_id} not found'}
-        
-        schema = self.units[unit_id]['schema']
+        return self._load_unit_stats([unit_id])[unit_id]
+    
+    def _load_unit_stats(self, unit_ids: List[str]) -> Dict[str, Dict]:
+        """Stats rows for the given predefined units in one query, seeding missing rows"""
         conn = self.get_connection()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         
         try:
-            cursor.execute(f"""
-                SELECT 
-                    COUNT(*) as total_entries,
-                    COUNT(DISTINCT category) as categories,
-                    COUNT(DISTINCT source) as sources,
-                    pg_size_pretty(pg_total_relation_size('{schema}.knowledge')) as size
-                FROM {schema}.knowledge
-            """)
-            
-            stats = dict(cursor.fetchone())
-            return {
-                **self.units[unit_id],
-                **stats,
-                'unit_id': unit_id
-            }
+            rows = fetch_unit_stats(cursor, unit_ids)
+            missing = [unit_id for unit_id in unit_ids if unit_id not in rows]
+            if missing:
+                for unit_id in missing:
+                    seed_unit_stats(cursor, unit_id, self.units[unit_id]['schema'])
+                conn.commit()
+                rows.update(fetch_unit_stats(cursor, missing))
+            return {unit_id: self._format_unit_stats(unit_id, rows.get(unit_id)) for unit_id in unit_ids}
         except Exception as e:
             print(f"Stats error: {e}")
+            return {unit_id: self._format_unit_stats(unit_id, None) for unit_id in unit_ids}
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def _format_unit_stats(self, unit_id: str, row: Optional[Dict]) -> Dict:
+        if row is None:
             return {**self.units[unit_id], 'total_entries': 0, 'categories': 0, 'sources': 0, 'size': '0 bytes'}
+        refreshed_at = row.get('refreshed_at')
+        return {
+            **self.units[unit_id],
+            'total_entries': row['total_entries'],
+            'categories': row['categories'],
+            'sources': row['sources'],
+            'size': row['size'] or '0 bytes',
+            'unit_id': unit_id,
+            'exact': row['exact'],
+            'stats_refreshed_at': refreshed_at.isoformat() if refreshed_at else None
+        }
+    
+    def refresh_stats(self, unit_ids: Optional[List[str]] = None, max_age: Optional[float] = None) -> List[str]:
+        """
+        Exact recount of unit stats. With max_age, only units whose row is an
+        estimate or older than max_age seconds are recounted.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        refreshed = []
+        try:
+            if unit_ids is None:
+                unit_ids = list(self.units)
+            if max_age is not None:
+                stale = set(stale_units(cursor, max_age))
+                unit_ids = [unit_id for unit_id in unit_ids if unit_id in stale]
+            for unit_id in unit_ids:
+                try:
+                    refresh_unit_stats(cursor, unit_id, self.units[unit_id]['schema'])
+                    conn.commit()
+                    refreshed.append(unit_id)
+                except Exception as e:
+                    conn.rollback()
+                    print(f"[WARNING] Stats refresh failed for {unit_id}: {e}")
         finally:
             cursor.close()
             conn.close()
+        return refreshed
     
-    def get_facility_status(self) -> Dict:
-        """Get overall facility status"""
-        total_entries = 0
-        unit_stats = {}
+    def start_stats_refresher(self):
+        """Background thread that keeps the materialised stats exact"""
+        if self._stats_refresher is not None and self._stats_refresher.is_alive():
+            return
         
-        for unit_id in self.units.keys():
-            stats = self.get_unit_stats(unit_id)
-            unit_stats[unit_id] = stats
-            total_entries += stats.get('total_entries', 0)
+        def loop():
+            # Seeded estimates serve status until the first recount
+            while True:
+                time.sleep(max(60, self.stats_refresh_interval / 4))
+                try:
+                    self.refresh_stats(max_age=self.stats_refresh_interval)
+                except Exception as e:
+                    print(f"[WARNING] Stats refresher error: {e}")
+        
+        self._stats_refresher = threading.Thread(target=loop, name='unit-stats-refresh', daemon=True)
+        self._stats_refresher.start()
+    
+    def get_duplicate_report(self, unit_id: str, near: bool = False, limit: int = 50) -> Dict:
+        """Duplicate clusters already stored in a unit (exact, plus SimHash near duplicates)"""
+        schema = self._resolve_schema(unit_id)
+        if schema is None:
+            return {'error': f'Unit {unit_id} not found'}
         
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            return {'unit_id': unit_id, **duplicate_report(cursor, schema, near=near, limit=limit)}
+        except Exception as e:
+            print(f"Duplicate report error: {e}")
+            return {'unit_id': unit_id, 'error': str(e)}
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def get_facility_status(self) -> Dict:
+        """Get overall facility status (one read of the materialised stats)"""
+        return self._facility_status_response(self._load_unit_stats(list(self.units)))
+    
+    def _facility_status_response(self, unit_stats: Dict[str, Dict]) -> Dict:
         return {
             'facility_name': 'R3AL3R Self-Hosted Storage Facility',
             'total_units': len(self.units),
-            'total_entries': total_entries,
+            'total_entries': sum(stats.get('total_entries', 0) for stats in unit_stats.values()),
             'cost': 'FREE (Self-hosted PostgreSQL)',
             'status': 'online',
             'units': unit_stats
@@ -882,6 +1407,7 @@ class PredictiveMaintenance:
 # Initialize facility
 try:
     facility = StorageFacility()
+    facility.start_stats_refresher()
     monitor = StorageMonitor(facility)
     failover_manager = FailoverManager(facility, monitor)
     predictive_maintenance = PredictiveMaintenance(facility, monitor)
@@ -917,7 +1443,19 @@ def search_unit(unit_id):
     query = data.get('query', '')
     limit = data.get('limit', 10)
     
-    results = facility.search_unit(unit_id, query, limit)
+    cache = facility.result_cache
+    use_cache = data.get('cache', True)
+    key = cache.make_key(query, [unit_id], 'unit', limit)
+    results = cache.get(key) if use_cache else None
+    if results is None:
+        versions = cache.versions([unit_id])
+        try:
+            results = facility.search_unit(unit_id, query, limit, raise_errors=True)
+        except Exception:
+            # Not cached: the next request retries the database
+            return jsonify({'unit': unit_id, 'query': query, 'results': [], 'error': 'Search failed'})
+        if use_cache:
+            cache.put(key, results, versions)
     return jsonify({
         'unit': unit_id,
         'query': query,
@@ -926,31 +1464,122 @@ def search_unit(unit_id):
 
 @app.route('/api/facility/search', methods=['POST'])
 def search_facility():
-    """Search all units"""
+    """Search all units (responses are served from the result cache when fresh)"""
     data = request.json
     query = data.get('query', '')
     limit_per_unit = data.get('limit_per_unit', 3)
     max_results = data.get('max_results', 10)
+    mode = data.get('mode', facility.search_mode)
     
-    results = facility.search_all_units(query, limit_per_unit)
-    return jsonify({
+    units = facility.discover_units() if mode == 'union' else facility.units
+    cache = facility.result_cache
+    use_cache = data.get('cache', True)  # False bypasses the cache (load tests)
+    key = cache.make_key(query, units, mode, limit_per_unit, max_results)
+    response = cache.get(key) if use_cache else None
+    if response is not None:
+        return jsonify({**response, 'query': query, 'cached': True})
+    
+    versions = cache.versions(units)
+    response = _run_facility_search(data, query, limit_per_unit, max_results, mode)
+    if use_cache and not response.get('partial'):
+        # Only cache when every unit answered (no timeouts, no failed queries)
+        cache.put(key, response, versions)
+    return jsonify({**response, 'cached': False})
+
+def _run_facility_search(data, query, limit_per_unit, max_results, mode) -> Dict:
+    if mode == 'union':
+        # Per-unit and global LIMIT both applied inside the one statement
+        search = facility.union_search(query, limit_per_unit, limit=max_results)
+        return {
+            'query': query,
+            'total_results': search['total_results'],
+            'results': search['results'],
+            'partial': search['partial'],
+            'failed_units': search['failed_units']
+        }
+    
+    if mode != 'parallel':
+        search = facility.sequential_search(query, limit_per_unit)
+        results = search['results']
+        return {
+            'query': query,
+            'total_results': len(results),
+            'results': results[:max_results],
+            'partial': search['partial'],
+            'failed_units': search['failed_units']
+        }
+    
+    search = facility.fan_out_search(
+        query, limit_per_unit,
+        unit_timeout=data.get('unit_timeout')
+    )
+    results = search['results']
+    return {
         'query': query,
         'total_results': len(results),
-        'results': results[:max_results]
-    })
+        'results': results[:max_results],
+        'partial': search['partial'],
+        'timed_out_units': search['timed_out_units'],
+        'failed_units': search['failed_units']
+    }
+
+@app.route('/api/facility/cache', methods=['GET', 'DELETE'])
+def search_cache():
+    """Search result cache statistics (DELETE clears the cache)"""
+    if request.method == 'DELETE':
+        facility.result_cache.clear()
+    return jsonify(facility.result_cache.get_stats())
+
+@app.route('/api/facility/pool', methods=['GET'])
+def pool_stats():
+    """Connection pool sizing and checkout wait times"""
+    return jsonify(db_pool.get_pool_stats())
+
+@app.route('/api/facility/status/refresh', methods=['POST'])
+def refresh_facility_status():
+    """Exact recount of the materialised unit stats (all units, or {"units": [...]})"""
+    data = request.get_json(silent=True) or {}
+    unit_ids = [unit_id for unit_id in data.get('units', facility.units) if unit_id in facility.units]
+    return jsonify({'refreshed': facility.refresh_stats(unit_ids)})
 
 @app.route('/api/unit/<unit_id>/stats', methods=['GET'])
 def unit_stats(unit_id):
     """Get unit statistics"""
     return jsonify(facility.get_unit_stats(unit_id))
 
+@app.route('/api/unit/<unit_id>/duplicates', methods=['GET'])
+def unit_duplicates(unit_id):
+    """Duplicate clusters in a unit (?near=1 adds SimHash near duplicates)"""
+    near = request.args.get('near', '0').lower() in ('1', 'true', 'yes')
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify(facility.get_duplicate_report(unit_id, near=near, limit=limit))
+
+def _iter_ndjson(stream):
+    """Yield one entry per NDJSON line without buffering the whole body"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None  # counted as an error by bulk_store_knowledge
+
 @app.route('/api/unit/<unit_id>/store', methods=['POST'])
 def store_knowledge(unit_id):
-    """Store knowledge in a unit"""
+    """Store knowledge in a unit (JSON entries, or NDJSON for bulk ingestion)"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        batch_size = request.args.get('batch_size', 5000, type=int)
+        result = facility.bulk_store_knowledge(unit_id, _iter_ndjson(request.stream), batch_size)
+        return jsonify(result)
+    
     data = request.json
     entries = data.get('entries', [])
     
-    result = facility.store_knowledge(unit_id, entries)
+    if data.get('mode') == 'bulk':
+        result = facility.bulk_store_knowledge(unit_id, entries)
+    else:
+        result = facility.store_knowledge(unit_id, entries)
     return jsonify(result)
 
 # Monitoring API Endpoints
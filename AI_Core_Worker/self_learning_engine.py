@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 import json
 import logging
+import db_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,8 +24,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 class SelfLearningEngine:
     """AI system that learns from user interactions and improves automatically"""
@@ -36,10 +37,10 @@ def real_search_results(query):
     # Search physics_unit + crypto_unit with simple keyword match
     cur.execute("""
         SELECT COUNT(*) FROM physics_unit.knowledge 
-        WHERE to_tsvector('english', topic || ' ' || content) @@ plainto_tsquery(%s)
+        WHERE search_vector @@ plainto_tsquery('english', %s)
         UNION ALL
         SELECT COUNT(*) FROM crypto_unit.knowledge 
-        WHERE to_tsvector('english', topic || ' ' || content) @@ plainto_tsquery(%s)
+        WHERE search_vector @@ plainto_tsquery('english', %s)
     """, (query, query))
     total = sum(row[0] for row in cur.fetchall())
     cur.close()
@@ -467,4 +467,4 @@ SPACE_ENGINEERING_KB = {
 
 # Usage example:
 # from space_engineering_kb_import import SPACE_ENGINEERING_KB
-# R3AELERPrompts.KNOWLEDGE_BASE.update(SPACE_ENGINEERING_KB)
+# R3AELERPrompts.update_knowledge(SPACE_ENGINEERING_KB)
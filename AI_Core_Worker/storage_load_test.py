@@ -0,0 +1,151 @@
+"""
+R3AL3R Storage Facility Load Test
+Fires concurrent /api/facility/search (or unit search) requests at one or
+more running facility servers and reports throughput and latency, so the
+Flask/Waitress and asyncio serving modes can be compared on equal terms.
+
+    python run_storage.py                  # sync server on :3003
+    python async_storage_facility.py --port 3004
+    python storage_load_test.py --compare http://localhost:3003 http://localhost:3004 \
+        --concurrency 500 --requests 20000 --no-cache
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+import aiohttp
+
+DEFAULT_QUERIES = [
+    'quantum entanglement', 'black hole', 'bitcoin mining', 'blockchain consensus',
+    'thermodynamics entropy', 'orbital mechanics', 'neural network', 'logical fallacy',
+    'special relativity', 'proof by induction', 'exoplanet detection', 'heart disease',
+    'smart contract', 'wave function', 'deductive reasoning', 'rocket propulsion'
+]
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+async def run_load(base_url: str, queries: List[str], total_requests: int, concurrency: int,
+                   mode: Optional[str] = None, unit: Optional[str] = None, use_cache: bool = True,
+                   timeout: float = 30.0) -> Dict:
+    """Run total_requests searches with at most concurrency in flight"""
+    base_url = base_url.rstrip('/')
+    url = f"{base_url}/api/unit/{unit}/search" if unit else f"{base_url}/api/facility/search"
+    latencies = []
+    errors = {}
+    cached = 0
+    issued = 0
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        async def worker():
+            nonlocal issued, cached
+            while issued < total_requests:
+                issued += 1
+                body = {'query': random.choice(queries), 'cache': use_cache}
+                if mode and not unit:
+                    body['mode'] = mode
+                started = time.perf_counter()
+                try:
+                    async with session.post(url, json=body) as response:
+                        payload = await response.read()
+                        if response.status != 200:
+                            errors[f"HTTP {response.status}"] = errors.get(f"HTTP {response.status}", 0) + 1
+                            continue
+                    latencies.append(time.perf_counter() - started)
+                    if json.loads(payload).get('cached'):
+                        cached += 1
+                except Exception as e:
+                    name = type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'url': url,
+        'requests': total_requests,
+        'concurrency': concurrency,
+        'succeeded': len(latencies),
+        'errors': errors,
+        'cached_responses': cached,
+        'elapsed_seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'avg': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0.0
+        }
+    }
+
+
+def print_report(reports: List[Dict]):
+    print("\n" + "=" * 100)
+    print(f"{'server':<45}{'ok':>8}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 100)
+    for report in reports:
+        latency = report['latency_ms']
+        print(f"{report['url']:<45}{report['succeeded']:>8}{sum(report['errors'].values()):>6}"
+              f"{report['requests_per_second']:>10}{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}")
+        if report['errors']:
+            print(f"    errors: {report['errors']}")
+    print("=" * 100)
+
+
+async def main_async(args) -> List[Dict]:
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    reports = []
+    for url in args.compare or [args.url]:
+        if args.warmup:
+            await run_load(url, queries, args.warmup, min(args.concurrency, args.warmup),
+                           args.mode, args.unit, not args.no_cache, args.timeout)
+        report = await run_load(url, queries, args.requests, args.concurrency,
+                                args.mode, args.unit, not args.no_cache, args.timeout)
+        reports.append(report)
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the R3AL3R storage facility')
+    parser.add_argument('--url', default='http://localhost:3003')
+    parser.add_argument('--compare', nargs='+', metavar='URL', help='Run the same load against each server')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--mode', choices=['parallel', 'union', 'sequential'])
+    parser.add_argument('--unit', help='Hit /api/unit/<unit>/search instead of the facility search')
+    parser.add_argument('--queries', help='File with one query per line')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the server result cache')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--json', action='store_true', help='Print raw JSON results')
+    args = parser.parse_args(argv)
+
+    reports = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print_report(reports)
+    return reports
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
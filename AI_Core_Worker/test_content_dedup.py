@@ -0,0 +1,62 @@
+"""
+Test R3ÆLƎR content fingerprints used for ingestion-time deduplication
+Pure functions only, no database required
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from content_dedup import (
+    normalize_text, content_fingerprint, simhash, hamming_distance, near_duplicate_clusters
+)
+
+ARTICLE = (
+    "Quantum entanglement is a physical phenomenon that occurs when a group of particles "
+    "is generated, interacts, or shares spatial proximity in a way such that the quantum "
+    "state of each particle of the group cannot be described independently of the state "
+    "of the others, including when the particles are separated by a large distance."
+)
+
+
+def test_fingerprint_ignores_case_and_whitespace():
+    a = content_fingerprint("Quantum  Entanglement", ARTICLE)
+    b = content_fingerprint("quantum entanglement\n", "  " + ARTICLE.upper().replace(' ', '\t'))
+    assert a == b
+    assert len(a) == 64
+
+
+def test_fingerprint_separates_topic_and_content():
+    assert content_fingerprint("ab", "c") != content_fingerprint("a", "bc")
+    assert content_fingerprint(None, None) == content_fingerprint("", "")
+
+
+def test_normalize_text_unicode_forms():
+    assert normalize_text("ﬁle NAME") == "file name"
+
+
+def test_simhash_is_signed_64_bit_and_stable():
+    sig = simhash(ARTICLE)
+    assert -(1 << 63) <= sig < (1 << 63)
+    assert sig == simhash(ARTICLE.lower())
+    assert simhash("") is None
+
+
+def test_simhash_near_duplicates_are_close():
+    edited = ARTICLE.replace("large distance", "vast distance")
+    unrelated = "Bitcoin is a decentralized digital currency that can be transferred on a peer-to-peer network."
+    assert hamming_distance(simhash(ARTICLE), simhash(edited)) < hamming_distance(simhash(ARTICLE), simhash(unrelated))
+
+
+def test_near_duplicate_clusters_groups_close_signatures():
+    base = 0x0F0F_0F0F_0F0F_0F0F
+    signatures = [
+        ('a', base),
+        ('b', base ^ 0b101),  # 2 bits away
+        ('c', base ^ (1 << 40)),  # 1 bit away, different band
+        ('d', ~base),  # far away
+        ('e', None)
+    ]
+    clusters = near_duplicate_clusters(signatures, max_distance=3)
+    assert [sorted(c) for c in clusters] == [['a', 'b', 'c']]
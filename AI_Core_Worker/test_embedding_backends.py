@@ -0,0 +1,75 @@
+"""
+Test R3ÆLƎR local embedding backends (hashed TF-IDF, dimension fitting)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embedding_backends import (
+    EMBEDDING_DIMENSIONS, HashedTfidfBackend, fit_dimensions, get_backend, to_vector_literal
+)
+
+
+def test_hashed_backend_shape_dtype_and_norm():
+    vectors = HashedTfidfBackend().embed(["black hole event horizon", "bitcoin mining difficulty"])
+
+    assert vectors.shape == (2, EMBEDDING_DIMENSIONS)
+    assert vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+
+
+def test_hashed_backend_is_deterministic_and_batch_consistent():
+    texts = ["quantum entanglement", "proof by induction", ""]
+    backend = HashedTfidfBackend()
+    batch = backend.embed(texts)
+
+    assert np.array_equal(batch, HashedTfidfBackend().embed(texts))
+    assert np.allclose(batch[0], backend.embed_one(texts[0]))
+    assert not batch[2].any()
+    assert backend.embed_one("   ") is None
+
+
+def test_hashed_backend_ranks_related_text_higher():
+    backend = HashedTfidfBackend()
+    query, related, unrelated = backend.embed([
+        "black hole event horizon",
+        "the event horizon of a black hole traps light",
+        "smart contract gas fees on ethereum",
+    ])
+
+    assert query @ related > query @ unrelated
+
+
+def test_idf_fit_round_trips(tmp_path):
+    path = str(tmp_path / 'idf.npy')
+    backend = HashedTfidfBackend(dimensions=64, idf_path=path)
+    idf = backend.fit(["the cat", "the dog", "the bird"])
+
+    loaded = HashedTfidfBackend(dimensions=64, idf_path=path)
+    assert np.array_equal(loaded.idf, idf)
+    with pytest.raises(ValueError):
+        HashedTfidfBackend(dimensions=32, idf_path=path)
+
+
+def test_fit_dimensions_pads_but_refuses_truncation():
+    padded = fit_dimensions(np.ones((2, 3), dtype=np.float32), 5)
+
+    assert padded.shape == (2, 5)
+    assert not padded[:, 3:].any()
+    with pytest.raises(ValueError):
+        fit_dimensions(np.ones((1, 6), dtype=np.float32), 5)
+
+
+def test_get_backend_is_a_singleton_and_rejects_unknown_names():
+    assert get_backend('hashed') is get_backend('hashed')
+    with pytest.raises(ValueError):
+        get_backend('word2vec')
+
+
+def test_vector_literal():
+    assert to_vector_literal(np.array([0.5, -1.0], dtype=np.float32)) == '[0.5,-1]'
@@ -0,0 +1,50 @@
+"""
+Test R3ÆLƎR embedding backfill bookkeeping (resume position, --since parsing)
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embedding_backfill import CompletionTracker, parse_since, _page_sql
+
+
+def test_resume_position_waits_for_earlier_pages():
+    tracker = CompletionTracker(position=100)
+    for last_id in (200, 300, 400):
+        tracker.submitted(last_id)
+
+    assert tracker.finished(300) == 100  # page ending at 200 still running
+    assert tracker.finished(200) == 300
+    assert tracker.finished(400) == 400
+    assert tracker.pending == 0
+
+
+def test_failed_page_holds_the_checkpoint_back():
+    tracker = CompletionTracker()
+    for last_id in (10, 20, 30):
+        tracker.submitted(last_id)
+
+    tracker.finished(10)
+    tracker.finished(30)  # page ending at 20 failed and is never finished
+
+    assert tracker.position == 10
+    assert tracker.pending == 2
+
+
+def test_parse_since():
+    assert parse_since(None) is None
+    assert parse_since('2025-06-01T00:00:00') == datetime(2025, 6, 1)
+    assert parse_since('last', '2025-06-02T03:04:05') == datetime(2025, 6, 2, 3, 4, 5)
+    assert parse_since('last', None) is None
+
+
+def test_page_sql_uses_keyset_pagination():
+    sql = _page_sql('physics_unit', 'knowledge', 'since')
+
+    assert 'id > %s' in sql and 'ORDER BY id' in sql
+    assert 'OFFSET' not in sql
+    assert 'updated_at >= %s' in sql
+    assert 'embedding IS NULL' in _page_sql('physics_unit', 'knowledge', 'missing')
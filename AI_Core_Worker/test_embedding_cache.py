@@ -0,0 +1,70 @@
+"""
+Test R3ÆLƎR query embedding cache (LRU byte budget, shared SQLite tier)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from embedding_backends import HashedTfidfBackend
+from embedding_cache import ENTRY_OVERHEAD, EmbeddingCache, SqliteEmbeddingStore, cache_key
+
+
+class CountingBackend(HashedTfidfBackend):
+    def __init__(self):
+        super().__init__(dimensions=64)
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return super().embed(texts)
+
+
+def test_repeated_query_is_embedded_once():
+    backend = CountingBackend()
+    cache = EmbeddingCache()
+    first = cache.get_or_embed("black  hole ", backend)
+    second = cache.get_or_embed("black hole", backend)
+
+    assert backend.calls == 1
+    assert np.array_equal(first, second)
+    assert first.dtype == np.float32
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['bytes'] == 64 * 4 + ENTRY_OVERHEAD
+
+
+def test_key_includes_model():
+    assert cache_key("q", "hashed:64") != cache_key("q", "openai:text-embedding-3-small:1536")
+
+
+def test_byte_budget_evicts_least_recently_used():
+    entry = 64 * 4 + ENTRY_OVERHEAD
+    cache = EmbeddingCache(max_bytes=entry * 2)
+    vector = np.ones(64, dtype=np.float32)
+    cache.put("a", "m", vector)
+    cache.put("b", "m", vector)
+    cache.get("a", "m")  # "b" is now least recently used
+    cache.put("c", "m", vector)
+
+    assert cache.get("b", "m") is None
+    assert cache.get("a", "m") is not None
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.get_stats()['bytes'] <= entry * 2
+
+
+def test_shared_sqlite_tier_is_seen_by_other_workers(tmp_path):
+    path = str(tmp_path / 'embeddings.db')
+    backend = CountingBackend()
+    EmbeddingCache(shared=SqliteEmbeddingStore(path)).get_or_embed("smart contract", backend)
+
+    other_worker = EmbeddingCache(shared=SqliteEmbeddingStore(path))
+    vector = other_worker.get_or_embed("smart contract", backend)
+
+    assert backend.calls == 1
+    assert vector.shape == (64,)
+    assert other_worker.get_stats()['shared_hits'] == 1
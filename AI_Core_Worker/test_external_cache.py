@@ -0,0 +1,120 @@
+"""
+Test R3ÆLƎR external data cache (TTL, LRU, stale-while-revalidate, coalescing, shared tier)
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from external_cache import ExternalDataCache, SqliteExternalStore, cached_fetch
+
+
+class Upstream:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        return {'source': 'test', 'version': calls}
+
+
+def _age(cache, key, seconds):
+    value, fetched_at = cache._entries[key]
+    cache._entries[key] = (value, fetched_at - seconds)
+
+
+def test_fresh_hits_and_per_source_ttl():
+    cache = ExternalDataCache(ttls={'coingecko': 300, 'wikipedia': 86400}, stale_factor=0)
+    upstream = Upstream()
+
+    assert cache.get_or_fetch('coingecko', 'btc', upstream)['version'] == 1
+    assert cache.get_or_fetch('coingecko', 'btc', upstream)['version'] == 1
+    cache.get_or_fetch('wikipedia', 'physics', upstream)
+    _age(cache, 'btc', 600)
+    _age(cache, 'physics', 600)
+
+    assert cache.get_or_fetch('coingecko', 'btc', upstream)['version'] == 3
+    assert cache.get_or_fetch('wikipedia', 'physics', upstream)['version'] == 2
+    assert upstream.calls == 3
+
+
+def test_lru_bound_and_errors_not_cached():
+    cache = ExternalDataCache(max_entries=3)
+    for i in range(5):
+        cache.get_or_fetch('github', f"repo{i}", Upstream())
+    assert list(cache._entries) == ['repo2', 'repo3', 'repo4']
+    assert cache.get_stats()['evictions'] == 2
+
+    failing = lambda: {'error': 'rate limited'}
+    assert cache.get_or_fetch('github', 'broken', failing) == {'error': 'rate limited'}
+    assert 'broken' not in cache._entries
+
+
+def test_stale_value_served_while_refreshing():
+    cache = ExternalDataCache(ttls={'nvd': 10}, stale_factor=1.0)
+    upstream = Upstream(delay=0.2)
+    cache.get_or_fetch('nvd', 'recent', upstream)
+    _age(cache, 'recent', 15)  # past ttl, inside the stale window
+
+    started = time.perf_counter()
+    assert cache.get_or_fetch('nvd', 'recent', upstream)['version'] == 1
+    assert time.perf_counter() - started < 0.1
+    time.sleep(0.4)
+    assert cache.get_or_fetch('nvd', 'recent', upstream)['version'] == 2
+    assert cache.get_stats()['refreshes'] == 1
+
+
+def test_concurrent_misses_make_one_upstream_call():
+    cache = ExternalDataCache()
+    upstream = Upstream(delay=0.2)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('mitre', 'T1059', upstream)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.calls == 1
+    assert [r['version'] for r in results] == [1] * 8
+    assert cache.get_stats()['coalesced'] == 7
+
+
+def test_shared_tier_serves_other_workers(tmp_path):
+    path = str(tmp_path / 'external.db')
+    upstream = Upstream()
+    ExternalDataCache(shared=SqliteExternalStore(path)).get_or_fetch('sec', 'AAPL', upstream)
+
+    other_worker = ExternalDataCache(shared=SqliteExternalStore(path))
+    assert other_worker.get_or_fetch('sec', 'AAPL', upstream) == {'source': 'test', 'version': 1}
+    assert upstream.calls == 1
+    assert other_worker.get_stats()['shared_hits'] == 1
+
+
+def test_cached_fetch_keys_on_arguments_with_defaults():
+    class Aggregator:
+        def __init__(self):
+            self.cache = ExternalDataCache()
+            self.calls = 0
+
+        @cached_fetch('github')
+        def fetch_github_repos(self, query, sort='stars', order='desc'):
+            self.calls += 1
+            return {'query': query, 'sort': sort}
+
+    aggregator = Aggregator()
+    aggregator.fetch_github_repos('python')
+    aggregator.fetch_github_repos('python', sort='stars')
+    aggregator.fetch_github_repos(query='python', order='desc')
+    assert aggregator.calls == 1
+    assert aggregator.fetch_github_repos('python', 'updated') == {'query': 'python', 'sort': 'updated'}
+    assert aggregator.calls == 2
@@ -0,0 +1,99 @@
+"""
+Test R3ÆLƎR shared HTTP client (keep-alive reuse, retries, latency histograms)
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import http_client
+from http_client import LatencyHistogram, PooledSession
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    wbufsize = 1 << 16  # one write per response, like werkzeug (avoids Nagle stalls)
+    failures_left = 0
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        if Handler.failures_left > 0:
+            Handler.failures_left -= 1
+            return self._reply(503, {'error': 'busy'})
+        self._reply(200, {'ok': True})
+
+    def do_POST(self):
+        self.server.peers.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self._reply(200, body)
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.peers = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_calls_reuse_one_keep_alive_connection(server):
+    session = PooledSession(retries=0)
+    url = f"http://127.0.0.1:{server.server_port}"
+    for i in range(20):
+        assert session.get(f"{url}/api/facility/status").json() == {'ok': True}
+        assert session.post(f"{url}/api/facility/search", json={'query': i}).json() == {'query': i}
+
+    assert len(server.peers) == 1
+
+
+def test_retries_gateway_errors_and_records_latency(server):
+    Handler.failures_left = 2
+    session = PooledSession(retries=2, backoff=0)
+    upstream = f"127.0.0.1:{server.server_port}"
+    before = http_client.get_latency_stats().get(upstream, {}).get('count', 0)
+
+    assert session.get(f"http://{upstream}/health").status_code == 200
+    Handler.failures_left = 5
+    assert session.get(f"http://{upstream}/health").status_code == 503
+    Handler.failures_left = 0
+
+    stats = http_client.get_latency_stats()[upstream]
+    assert stats['count'] == before + 2
+    assert stats['errors'] >= 1
+    assert stats['p50_ms'] is not None
+
+
+def test_process_session_and_default_timeout():
+    assert http_client.get_session() is http_client.get_session()
+    assert http_client.get_session().timeout == http_client.HTTP_TIMEOUT
+
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram(buckets=(10, 100, 1000))
+    for duration in (1, 2, 3, 50, 5000):
+        histogram.observe(duration)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['p50_ms'] == 10
+    assert snapshot['p95_ms'] is None  # beyond the last bound
+    assert snapshot['buckets_ms'] == {'10': 3, '100': 1, '1000': 0, '+Inf': 1}
@@ -0,0 +1,176 @@
+"""
+Test R3ÆLƎR Streaming Ingestion Pipeline
+Runs fully offline against fixtures/ingestion_sample.jsonl
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ingestion_pipeline import (
+    IngestionPipeline, jsonl_reader, parquet_reader, iterable_reader,
+    extract_keywords, content_hash, categorize
+)
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ingestion_sample.jsonl')
+
+UNIT_RULES = {
+    'crypto': ['bitcoin', 'wallet', 'blockchain'],
+    'logic': ['implies', 'therefore', 'deductive'],
+}
+
+
+def to_entry(record):
+    """Module-level so it can run in worker processes"""
+    text = f"{record['question']} {record['answer']}"
+    if not text.strip():
+        return None
+    return {
+        'entry_id': record['id'],
+        'topic': record['question'],
+        'content': record['answer'],
+        'unit': categorize(text, UNIT_RULES, default='physics'),
+        'keywords': extract_keywords(text, limit=5),
+        'content_hash': content_hash(record['question'], record['answer']),
+    }
+
+
+def failing_transform(record):
+    if record['id'] == 'sample_004':
+        raise ValueError('bad record')
+    return record['id']
+
+
+class ListWriter:
+    """Collects batches; optionally fails after a number of batches"""
+
+    def __init__(self, fail_after=None):
+        self.batches = []
+        self.fail_after = fail_after
+
+    def __call__(self, batch):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError('simulated crash')
+        self.batches.append(list(batch))
+        return {'stored': len(batch)}
+
+    @property
+    def entries(self):
+        return [entry for batch in self.batches for entry in batch]
+
+
+def test_jsonl_pipeline_transforms_and_writes_in_order():
+    writer = ListWriter()
+    stats = IngestionPipeline('sample', jsonl_reader(FIXTURE), writer, to_entry,
+                              batch_size=5, chunk_size=3, workers=0).run()
+
+    ids = [entry['entry_id'] for entry in writer.entries]
+    assert ids == sorted(ids)
+    assert len(ids) == 22  # 24 lines - 1 blank - 1 empty record
+    assert stats['read'] == 23
+    assert stats['skipped'] == 1
+    assert stats['stored'] == 22
+    assert stats['position'] == 24
+    assert stats['completed'] is True
+
+    first = writer.entries[0]
+    assert first['unit'] == 'physics'
+    assert first['content_hash'] == content_hash(first['topic'], first['content'])
+    assert writer.entries[1]['unit'] == 'crypto'
+
+
+def test_worker_processes_match_inline_results():
+    inline, parallel = ListWriter(), ListWriter()
+    IngestionPipeline('inline', jsonl_reader(FIXTURE), inline, to_entry,
+                      batch_size=4, chunk_size=2, workers=0).run()
+    IngestionPipeline('parallel', jsonl_reader(FIXTURE), parallel, to_entry,
+                      batch_size=4, chunk_size=2, workers=2).run()
+
+    assert parallel.entries == inline.entries
+
+
+def test_killed_run_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    crashed = ListWriter(fail_after=2)
+    with pytest.raises(RuntimeError):
+        IngestionPipeline('resume', jsonl_reader(FIXTURE), crashed, to_entry, batch_size=4,
+                          chunk_size=4, workers=0, queue_batches=1, checkpoint_path=checkpoint).run()
+
+    resumed = ListWriter()
+    stats = IngestionPipeline('resume', jsonl_reader(FIXTURE), resumed, to_entry, batch_size=4,
+                              chunk_size=4, workers=0, checkpoint_path=checkpoint).run()
+
+    written = [e['entry_id'] for e in crashed.entries + resumed.entries]
+    assert len(written) == len(set(written)) == 22
+    assert stats['start_position'] > 0
+    assert stats['completed'] is True
+
+    # A finished pipeline is a no-op until reset
+    again = ListWriter()
+    IngestionPipeline('resume', jsonl_reader(FIXTURE), again, to_entry,
+                      workers=0, checkpoint_path=checkpoint).run()
+    assert again.entries == []
+
+
+def test_limit_and_transform_errors():
+    writer = ListWriter()
+    stats = IngestionPipeline('limited', iterable_reader([{'id': f'sample_{i:03d}'} for i in range(10)]),
+                              writer, failing_transform, batch_size=100, chunk_size=3,
+                              workers=0, limit=6).run()
+
+    assert writer.entries == ['sample_000', 'sample_001', 'sample_002', 'sample_003', 'sample_005']
+    assert stats['transform_errors'] == 1
+    assert stats['position'] == 6
+    assert stats['completed'] is False
+
+
+def test_capped_run_is_continued_without_a_limit(tmp_path):
+    checkpoint = str(tmp_path / 'checkpoint.json')
+    capped = ListWriter()
+    stats = IngestionPipeline('capped', jsonl_reader(FIXTURE), capped, to_entry, batch_size=4,
+                              chunk_size=4, workers=0, limit=10, checkpoint_path=checkpoint).run()
+    assert stats['completed'] is False
+    stopped_at = stats['position']
+
+    rest = ListWriter()
+    stats = IngestionPipeline('capped', jsonl_reader(FIXTURE), rest, to_entry, batch_size=4,
+                              chunk_size=4, workers=0, checkpoint_path=checkpoint).run()
+    assert stats['start_position'] == stopped_at and stats['completed'] is True
+    written = [e['entry_id'] for e in capped.entries + rest.entries]
+    assert rest.entries and len(written) == len(set(written)) == 22
+
+
+def test_backpressure_bounds_read_ahead():
+    positions_read = []
+
+    def reader(start=0):
+        for i in range(start, 200):
+            positions_read.append(i)
+            yield i, i
+
+    lag = []
+
+    def slow_writer(batch):
+        lag.append(len(positions_read) - batch[-1])
+        return {}
+
+    IngestionPipeline('bounded', reader, slow_writer, batch_size=10, chunk_size=10,
+                      workers=0, max_pending_chunks=1, queue_batches=1).run()
+
+    # Reader may only run a couple of batches ahead of the writer
+    assert max(lag) <= 40
+
+
+def test_parquet_reader_resumes_mid_file(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    import pyarrow as pa
+
+    path = str(tmp_path / 'sample.parquet')
+    pq.write_table(pa.table({'n': list(range(25))}), path, row_group_size=10)
+
+    rows = list(parquet_reader(path, batch_rows=4)(start=13))
+    assert rows[0] == (13, {'n': 13})
+    assert rows[-1] == (24, {'n': 24})
@@ -0,0 +1,85 @@
+"""
+Test R3ÆLƎR intelligence layer concurrent fetching (one deadline per request)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from intelligence_layer import ExternalDataAggregator, HybridSearchEngine, IntentClassifier
+from intent_classifier_benchmark import QUERIES, LegacyIntentClassifier
+
+
+def _slow(result, seconds):
+    def fetch(*args, **kwargs):
+        time.sleep(seconds)
+        return result
+    return fetch
+
+
+def test_aggregate_data_fetches_sources_concurrently():
+    aggregator = ExternalDataAggregator()
+    aggregator.fetch_crypto_price = _slow({'source': 'CoinGecko'}, 0.3)
+    aggregator.fetch_cve_data = _slow({'source': 'NIST NVD'}, 0.3)
+    aggregator.fetch_github_repos = _slow({'source': 'GitHub'}, 0.3)
+    aggregator.fetch_stack_overflow = _slow({'error': 'rate limited'}, 0.1)
+
+    started = time.perf_counter()
+    results = aggregator.aggregate_data('bitcoin security exploit code fix', timeout=2)
+    elapsed = time.perf_counter() - started
+
+    assert [r['source'] for r in results] == ['CoinGecko', 'NIST NVD', 'GitHub']
+    assert elapsed < 0.6
+
+
+def test_sources_missing_the_deadline_are_dropped():
+    aggregator = ExternalDataAggregator()
+    aggregator.fetch_crypto_price = _slow({'source': 'CoinGecko'}, 0.05)
+    aggregator.fetch_cve_data = _slow({'source': 'NIST NVD'}, 2)
+
+    started = time.perf_counter()
+    results = aggregator.aggregate_data('bitcoin vulnerability', timeout=0.3)
+
+    assert [r['source'] for r in results] == ['CoinGecko']
+    assert time.perf_counter() - started < 1
+
+
+def test_search_runs_storage_and_external_under_one_deadline():
+    engine = HybridSearchEngine()
+    engine.request_deadline = 0.4
+    engine._search_storage_facility = _slow([{'topic': 'Bitcoin', 'content': 'Proof of work'}], 0.3)
+    engine.external_data.fetch_crypto_price = _slow(
+        {'source': 'CoinGecko', 'symbol': 'bitcoin', 'price_usd': 1.0, 'change_24h': 0.5,
+         'timestamp': 'now'}, 0.3)
+
+    started = time.perf_counter()
+    result = engine.search('bitcoin price')
+    assert time.perf_counter() - started < 0.55
+    assert result['sources'] == {'storage_facility': True, 'external_apis': ['crypto'], 'timed_out': []}
+    assert [r['type'] for r in result['results']] == ['live_data', 'knowledge_base']
+
+    engine._search_storage_facility = _slow([], 2)
+    result = engine.search('bitcoin price')
+    assert result['sources']['timed_out'] == ['storage_facility']
+    assert result['storage_results_count'] == 0
+    assert result['response_time_ms'] < 1000
+
+
+def test_compiled_classifier_matches_pattern_by_pattern_search():
+    legacy, compiled = LegacyIntentClassifier(), IntentClassifier()
+    for query in QUERIES + ['', 'Bitcoin PRICE', 'how to debug code\nin production']:
+        assert compiled.classify(query) == legacy.classify(query)
+
+
+def test_classify_all_scores_every_matching_intent():
+    classifier = IntentClassifier()
+    scored = classifier.classify_all('what is the bitcoin price after the exploit in the latest news')
+
+    intents = dict(scored)
+    assert intents['crypto_price'] == round(1 / 3, 4)
+    assert intents['security_vulnerability'] == round(2 / 3, 4)
+    assert scored[0][0] == 'security_vulnerability'
+    assert 'knowledge_search' in intents
+    assert classifier.classify_all('hello there') == []
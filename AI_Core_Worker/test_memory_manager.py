@@ -0,0 +1,208 @@
+"""
+Test R3ÆLƎR memory manager short-term relevance index
+"""
+
+import os
+import sys
+import random
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from memory_manager import Interaction, MemoryManager, ShortTermIndex, tokenize
+from memory_store import SQLiteMemoryStore
+
+WORDS = ['quantum', 'black', 'hole', 'bitcoin', 'mining', 'entropy', 'orbit', 'proof',
+         'the', 'a', 'of', 'what', 'is', 'how', 'does', 'work', 'energy', 'light']
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _random_interactions(count, seed=3):
+    rng = random.Random(seed)
+    return [{'query': ' '.join(rng.choices(WORDS, k=rng.randint(1, 6))),
+             'response': ' '.join(rng.choices(WORDS, k=rng.randint(0, 8)))}
+            for _ in range(count)]
+
+
+def test_index_matches_full_scan():
+    interactions = _random_interactions(400)
+    index = ShortTermIndex(maxlen=250, interactions=interactions)
+    kept = interactions[-250:]
+
+    for query in _random_interactions(60, seed=11):
+        tokens = tokenize(query['query'])
+        expected = [m for m in reversed(kept)
+                    if _jaccard(tokens, tokenize(m['query'] + ' ' + m['response'])) > 0.3][:3]
+        assert index.relevant(tokens, 0.3, 3) == expected
+
+        similar = sum(1 for m in kept if _jaccard(tokens, tokenize(m['query'])) > 0.7)
+        assert index.count_similar_queries(tokens, 0.7) == similar
+
+
+def test_evicted_interactions_leave_the_index():
+    index = ShortTermIndex(maxlen=2)
+    for query in ('bitcoin mining', 'black hole', 'quantum entropy'):
+        index.append({'query': query, 'response': ''})
+
+    assert len(index) == 2
+    assert index.relevant(tokenize('bitcoin mining')) == []
+    assert 'bitcoin' not in index._text_postings
+    assert [m['query'] for m in index] == ['black hole', 'quantum entropy']
+
+
+def test_context_and_export_round_trip():
+    manager = MemoryManager()
+    manager.store_interaction('u1', 'How does bitcoin mining work', 'Miners hash blocks')
+    manager.store_interaction('u1', 'What is a black hole', 'Collapsed star')
+
+    context = manager.get_context('u1', 'bitcoin mining work')
+    assert 'Relevant memories:' in context
+    assert 'Previous: How does bitcoin mining work' in context
+
+    exported = manager.export_memory('u1')
+    restored = MemoryManager()
+    restored.import_memory('u1', exported)
+    assert restored.get_memory_stats('u1')['user_short_term'] == 2
+    assert 'Previous: How does bitcoin mining work' in restored.get_context('u1', 'bitcoin mining work')
+
+
+def test_views_share_one_compact_record():
+    manager = MemoryManager()
+    manager.store_interaction('u1', 'Remember the quantum eraser', 'Which-path information')
+
+    memory = manager._users['u1']
+    interaction = memory.conversation_history[0]
+    assert isinstance(interaction, Interaction)
+    assert not hasattr(interaction, '__dict__')
+    assert isinstance(interaction.timestamp, int)
+    assert next(iter(memory.short_term)) is interaction
+    assert next(iter(memory.long_term.values())).interaction is interaction
+
+    # The export document keeps its dict format, and a restore shares records again
+    exported = manager.export_memory('u1')
+    assert set(exported['conversation_history'][0]) == {'timestamp', 'query', 'response', 'user_id'}
+    assert exported['long_term_memory'][next(iter(memory.long_term))]['access_count'] == 0
+    restored = MemoryManager()
+    restored.import_memory('u1', exported)
+    memory = restored._users['u1']
+    assert next(iter(memory.short_term)) is memory.conversation_history[0]
+    assert restored.export_memory('u1')['short_term_memory'] == exported['short_term_memory']
+
+
+def test_get_context_counts_long_term_use():
+    manager = MemoryManager()
+    manager.store_interaction('u1', 'Remember the quantum eraser', 'Which-path information')
+    entry = next(iter(manager._users['u1'].long_term.values()))
+
+    # Still in short-term memory: shown once, counted as a relevant memory and as the match
+    context = manager.get_context('u1', 'Remember the quantum eraser')
+    assert 'Learned:' not in context and 'Previous: Remember the quantum eraser' in context
+    assert entry.access_count == 2
+    assert entry.last_access is not None
+
+    manager._users['u1'].short_term = ShortTermIndex(1)
+    for i in range(6):
+        manager.store_interaction('u1', f"unrelated chat {i}", 'ok')
+    context = manager.get_context('u1', 'Remember the quantum eraser')
+    assert 'Long-term memory:\nLearned: Remember the quantum eraser' in context
+    assert entry.access_count == 3
+
+
+def test_long_term_eviction_drops_least_used():
+    manager = MemoryManager()
+    manager.max_long_term_items = 5
+    for i in range(5):
+        manager.store_interaction('u1', f"important fact {i}", f"answer {i}")
+    manager.get_context('u1', 'important fact 0')
+    manager.get_context('u1', 'important fact 1')
+
+    for i in range(5, 40):
+        manager.store_interaction('u1', f"important fact {i}", f"answer {i}")
+
+    memory = manager._users['u1']
+    kept = sorted(entry.interaction.query for entry in memory.long_term.values())
+    assert len(kept) == 5
+    assert 'important fact 0' in kept and 'important fact 1' in kept
+    assert len(memory.long_term_heap) <= 2 * len(memory.long_term) + 64
+
+
+def test_concurrent_writers_and_lock_free_readers():
+    manager = MemoryManager()
+    manager.max_short_term_items = 50
+    errors = []
+
+    def writer(user):
+        try:
+            for i in range(300):
+                manager.store_interaction(user, f"quantum question {i % 7}", f"answer {i}")
+        except Exception as e:
+            errors.append(e)
+
+    def reader(user):
+        try:
+            for _ in range(600):
+                manager.get_context(user, "quantum question 3")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=target, args=(f"user{i % 2}",))
+               for i, target in enumerate([writer, writer, reader, reader, reader, reader])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = manager.get_memory_stats('user0')
+    assert stats['user_short_term'] == 50
+    assert stats['user_conversations'] == manager.max_conversation_length
+
+
+def test_idle_users_are_written_out_and_reloaded(tmp_path):
+    store = SQLiteMemoryStore(str(tmp_path / 'memory.db'))
+    manager = MemoryManager(store=store, max_hot_users=3)
+    for i in range(10):
+        manager.store_interaction(f"user{i}", f"question about black hole {i}", f"answer {i}")
+    manager.update_user_profile('user0', {'physics': 1})
+
+    assert len(manager._users) <= 3
+    assert store.count() >= 7
+
+    # user1 is cold: its next request loads it back lazily
+    assert 'user1' not in manager._users
+    assert 'Q: question about black hole 1' in manager.get_context('user1', 'black hole')
+    assert manager.get_memory_stats('user0')['user_profile'] is not None
+
+
+def test_memory_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'memory.db')
+    manager = MemoryManager(store=SQLiteMemoryStore(path), max_hot_users=100)
+    manager.store_interaction('u1', 'How does bitcoin mining work', 'Miners hash blocks')
+    manager.update_user_profile('u1', {'crypto': 1})
+    manager.flush()
+
+    restarted = MemoryManager(store=SQLiteMemoryStore(path), max_hot_users=100)
+    context = restarted.get_context('u1', 'bitcoin mining work')
+    assert 'Previous: How does bitcoin mining work' in context
+    assert 'User interests: crypto' in context
+    assert restarted.get_context('nobody', 'bitcoin') == ''
+
+
+def test_store_outage_keeps_users_hot_instead_of_spinning(tmp_path):
+    class FailingStore(SQLiteMemoryStore):
+        saves = 0
+
+        def save(self, user_id, data):
+            FailingStore.saves += 1
+            raise OSError('store is down')
+
+    manager = MemoryManager(store=FailingStore(str(tmp_path / 'memory.db')), max_hot_users=2)
+    for i in range(6):
+        manager.store_interaction(f"user{i}", f"question {i}", f"answer {i}")
+
+    assert len(manager._users) == 6
+    assert FailingStore.saves == 1  # eviction backs off after the first failed save
+    assert 'Q: question 0' in manager.get_context('user0', 'question')
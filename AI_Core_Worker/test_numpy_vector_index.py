@@ -0,0 +1,79 @@
+"""
+Test R3ÆLƎR in-process NumPy vector index (mmap persistence, cosine top-k)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from numpy_vector_index import NumpyVectorIndex, parse_vector
+
+
+def _random_index(tmp_path, rows=500, dims=32, seed=7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((rows, dims)).astype(np.float32)
+    ids = rng.permutation(np.arange(1, rows + 1)).astype(np.int64)
+    index = NumpyVectorIndex('physics_unit', directory=str(tmp_path))
+    index.replace(ids, vectors, '2025-06-01T00:00:00')
+    return index, ids, vectors
+
+
+def test_top_k_matches_exact_cosine_ranking(tmp_path):
+    index, ids, vectors = _random_index(tmp_path)
+    query = vectors[42] + 0.01
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = ids[np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]]
+    results = index.search(query, 10)
+
+    assert [row_id for row_id, _ in results] == exact.tolist()
+    assert results[0][0] == ids[42]
+    distances = [distance for _, distance in results]
+    assert distances == sorted(distances)
+    assert 0.0 <= distances[0] < 0.01
+
+
+def test_saved_index_is_memory_mapped_on_load(tmp_path):
+    index, ids, vectors = _random_index(tmp_path)
+    reloaded = NumpyVectorIndex('physics_unit', directory=str(tmp_path))
+
+    assert reloaded.load()
+    assert isinstance(reloaded._snapshot[1], np.memmap)
+    assert reloaded._snapshot[1].dtype == np.float32
+    assert reloaded.size == len(ids)
+    assert reloaded.synced_at == '2025-06-01T00:00:00'
+    assert reloaded.search(vectors[3], 1)[0][0] == ids[3]
+
+
+def test_unbuilt_and_degenerate_queries(tmp_path):
+    index = NumpyVectorIndex('physics_unit', directory=str(tmp_path))
+
+    assert not index.load()
+    assert index.search(np.ones(4), 5) == []
+    index, _, _ = _random_index(tmp_path, rows=3)
+    assert len(index.search(np.ones(32), 10)) == 3
+    assert index.search(np.zeros(32), 10) == []
+
+
+def test_parse_vector():
+    assert parse_vector('[0.5,-1,2e-3]').tolist() == np.array([0.5, -1, 0.002], dtype=np.float32).tolist()
+
+
+def test_replace_switches_versions_with_one_pointer_rename(tmp_path):
+    index, ids, vectors = _random_index(tmp_path, rows=10, dims=8)
+    reader = NumpyVectorIndex('physics_unit', directory=str(tmp_path))
+    assert reader.load()
+    old_ids = reader._snapshot[0]
+
+    for generation in range(3):
+        index.replace(ids[:5], vectors[:5], f'2025-06-0{generation + 2}T00:00:00')
+
+    versions = sorted(p.name for p in tmp_path.iterdir() if p.is_dir())
+    assert len(versions) == 2
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_file()) == ['physics_unit.knowledge.json']
+    assert reader.load()
+    assert reader.size == 5 and reader.synced_at == '2025-06-04T00:00:00'
+    assert len(old_ids) == 10  # the earlier mapping stays valid after its version is pruned
@@ -0,0 +1,52 @@
+"""
+Test R3ÆLƎR prompt context analysis over the precomputed knowledge index
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prompts import KnowledgeIndex, R3AELERPrompts
+from context_analysis_benchmark import MESSAGES, LegacyPrompts, same_context
+
+
+def test_analyze_context_matches_per_call_scan():
+    for message in MESSAGES + ['', 'BITCOIN vs Claude: what is different?', 'blockchain']:
+        assert same_context(R3AELERPrompts.analyze_context(message), LegacyPrompts.analyze_context(message))
+
+
+def test_topics_found_anywhere_in_the_message():
+    index = KnowledgeIndex({'ai': '', 'law': '', 'missouri_law': '', 'crypto': '', 'cryptography': ''})
+    topics = [index.entries[p].key for p in sorted(index.topics_in('missouri_law and cryptography in the chain'))]
+    assert topics == ['ai', 'law', 'missouri_law', 'crypto', 'cryptography']
+    assert index.topics_in('nothing here') == set()
+
+
+def test_index_follows_knowledge_base_updates():
+    knowledge_base = dict(R3AELERPrompts.KNOWLEDGE_BASE)
+    try:
+        R3AELERPrompts.KNOWLEDGE_BASE['quantum_entanglement'] = {
+            'topic': 'Quantum Entanglement', 'content': 'Bell inequality tests', 'category': 'Physics'}
+        entry = R3AELERPrompts.knowledge_index().entries[-1]
+        assert (entry.topic_lower, entry.content_lower, entry.category) == (
+            'quantum entanglement', 'bell inequality tests', 'Physics')
+        topics = [k['topic'] for k in R3AELERPrompts.analyze_context('quantum_entanglement basics')['relevant_knowledge']]
+        assert topics == ['quantum_entanglement']
+    finally:
+        R3AELERPrompts.KNOWLEDGE_BASE.clear()
+        R3AELERPrompts.KNOWLEDGE_BASE.update(knowledge_base)
+
+
+def test_in_place_replacement_needs_update_or_refresh():
+    knowledge_base = dict(R3AELERPrompts.KNOWLEDGE_BASE)
+    topic = next(iter(knowledge_base))
+    try:
+        R3AELERPrompts.update_knowledge({topic: 'Replaced with ZEROKNOWLEDGE notes'})
+        assert R3AELERPrompts.knowledge_index().entries[0].content_lower == 'replaced with zeroknowledge notes'
+
+        R3AELERPrompts.KNOWLEDGE_BASE[topic] = 'Direct EDIT'
+        assert R3AELERPrompts.knowledge_index(refresh=True).entries[0].content_lower == 'direct edit'
+    finally:
+        R3AELERPrompts.KNOWLEDGE_BASE.clear()
+        R3AELERPrompts.update_knowledge(knowledge_base)
@@ -0,0 +1,84 @@
+"""
+Test R3ÆLƎR search result cache (LRU, TTL, byte budget, per-unit invalidation)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from query_cache import QueryResultCache, estimate_size
+
+
+def test_key_normalises_query_and_unit_order():
+    cache = QueryResultCache()
+    key = cache.make_key("  Bitcoin   MINING ", ['physics', 'crypto'], 'union', 3)
+    cache.put(key, {'results': [1]})
+
+    assert cache.get(cache.make_key("bitcoin mining", ['crypto', 'physics'], 'union', 3)) == {'results': [1]}
+    assert cache.get(cache.make_key("bitcoin mining", ['crypto', 'physics'], 'union', 5)) is None
+    assert cache.get_stats()['hits'] == 1
+    assert cache.get_stats()['misses'] == 1
+
+
+def test_write_invalidates_only_affected_units():
+    cache = QueryResultCache()
+    crypto = cache.make_key("q", ['crypto'])
+    physics = cache.make_key("q", ['physics'])
+    both = cache.make_key("q", ['crypto', 'physics'])
+    for key in (crypto, physics, both):
+        cache.put(key, 'cached')
+
+    cache.invalidate_unit('crypto')
+
+    assert cache.get(crypto) is None
+    assert cache.get(both) is None
+    assert cache.get(physics) == 'cached'
+    assert cache.get_stats()['invalidated'] == 2
+
+
+def test_write_during_search_leaves_entry_stale():
+    cache = QueryResultCache()
+    key = cache.make_key("q", ['crypto'])
+    versions = cache.versions(['crypto'])
+    cache.invalidate_unit('crypto')  # store_knowledge lands mid-search
+    cache.put(key, 'old results', versions)
+
+    assert cache.get(key) is None
+
+
+def test_ttl_expiry():
+    cache = QueryResultCache(ttl=0.01)
+    key = cache.make_key("q", ['crypto'])
+    cache.put(key, 'cached')
+    time.sleep(0.02)
+
+    assert cache.get(key) is None
+    assert cache.get_stats()['expired'] == 1
+
+
+def test_lru_eviction_respects_entry_and_byte_caps():
+    value = 'x' * 100
+    cache = QueryResultCache(max_entries=10, max_bytes=estimate_size(value) * 3)
+    keys = [cache.make_key(f"q{i}", ['crypto']) for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, value)
+    cache.get(keys[0])  # keys[1] is now least recently used
+    cache.put(keys[3], value)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == value
+    stats = cache.get_stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['evictions'] == 1
+
+
+def test_oversized_values_are_not_cached():
+    cache = QueryResultCache(max_bytes=10)
+    key = cache.make_key("q", ['crypto'])
+    cache.put(key, 'x' * 100)
+
+    assert cache.get(key) is None
+    assert cache.get_stats()['rejected'] == 1
@@ -0,0 +1,91 @@
+"""
+Test R3ÆLƎR pgvector index sizing and recall bookkeeping
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import vector_index
+from vector_index import (
+    REBUILD_GROWTH, choose_index_params, default_search_params, ensure_vector_index, needs_rebuild,
+    recall_at_k
+)
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.autocommit = False
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.connection = RecordingConnection()
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), self.connection.autocommit))
+
+
+def test_ivfflat_lists_follow_table_size():
+    assert choose_index_params(5_000, 'ivfflat') == {'lists': 10}
+    assert choose_index_params(500_000, 'ivfflat') == {'lists': 500}
+    assert choose_index_params(4_000_000, 'ivfflat') == {'lists': 2000}
+
+
+def test_hnsw_params_grow_with_table():
+    small = choose_index_params(30_000, 'hnsw')
+    large = choose_index_params(5_000_000, 'hnsw')
+
+    assert small == {'m': 16, 'ef_construction': 64}
+    assert large['m'] > small['m'] and large['ef_construction'] > small['ef_construction']
+    with pytest.raises(ValueError):
+        choose_index_params(1000, 'annoy')
+
+
+def test_default_search_params():
+    assert default_search_params({'lists': 400}) == {'probes': 20}
+    assert default_search_params({'m': 16, 'ef_construction': 64}) == {'ef_search': 40}
+
+
+def test_only_grown_ivfflat_indexes_are_rebuilt():
+    ivfflat = {'method': 'ivfflat', 'params': {'lists': 10}, 'built_rows': 10_000}
+    hnsw = {'method': 'hnsw', 'params': {'m': 16}, 'built_rows': 10_000}
+
+    assert not needs_rebuild(ivfflat, 20_000)
+    assert needs_rebuild(ivfflat, int(10_000 * REBUILD_GROWTH))
+    assert not needs_rebuild(hnsw, 1_000_000)
+    assert not needs_rebuild(None, 1_000_000)
+
+
+def test_recall_at_k():
+    assert recall_at_k([1, 2, 3, 4], [4, 3, 9, 8]) == 0.5
+    assert recall_at_k([], [1]) == 1.0
+
+
+def test_rebuild_is_concurrent_and_swapped_in(monkeypatch):
+    monkeypatch.setattr(vector_index, 'describe_index', lambda *args: {'method': 'ivfflat', 'params': {}})
+    monkeypatch.setattr(vector_index, 'embedded_rows', lambda *args: 50_000)
+    cursor = RecordingCursor()
+
+    result = ensure_vector_index(cursor, 'physics_unit', method='ivfflat', rebuild=True)
+
+    assert result['action'] == 'built' and result['params'] == {'lists': 50}
+    assert cursor.connection.commits == 1 and cursor.connection.autocommit is False
+    assert all(autocommit for _, autocommit in cursor.statements)
+    ddl = [sql.split(' ON ')[0] for sql, _ in cursor.statements if 'INDEX' in sql]
+    assert ddl == [
+        'DROP INDEX CONCURRENTLY IF EXISTS physics_unit.idx_physics_unit_knowledge_embedding_new',
+        'CREATE INDEX CONCURRENTLY idx_physics_unit_knowledge_embedding_new',
+        'DROP INDEX CONCURRENTLY IF EXISTS physics_unit.idx_physics_unit_knowledge_embedding',
+        'ALTER INDEX physics_unit.idx_physics_unit_knowledge_embedding_new '
+        'RENAME TO idx_physics_unit_knowledge_embedding',
+        'COMMENT'
+    ]
@@ -14,6 +14,7 @@ import uuid
 from datetime import datetime, timedelta
 from functools import wraps
 import logging
+import db_pool
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(32)  # For session management
@@ -32,8 +33,8 @@ DB_CONFIG = {
 }
 
 def get_connection():
-    """Get database connection"""
-    return psycopg2.connect(**DB_CONFIG)
+    """Get a pooled database connection (close() returns it to the pool)"""
+    return db_pool.get_connection(DB_CONFIG)
 
 def require_auth(f):
     """Decorator to require authentication"""
@@ -45,34 +46,33 @@ def require_auth(f):
         if not api_key and not session_token:
             return jsonify({'error': 'Authentication required', 'code': 'NO_AUTH'}), 401
         
-        conn = get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
         user = None
         
-        # Try API key authentication
-        if api_key:
-            cursor.execute("""
-                SELECT user_id, username, subscription_tier, is_active
-                FROM user_unit.profiles
-                WHERE api_key = %s AND is_active = TRUE
-            """, (api_key,))
-            user = cursor.fetchone()
-        
-        # Try session token authentication
-        elif session_token:
-            cursor.execute("""
-                SELECT p.user_id, p.username, p.subscription_tier, p.is_active
-                FROM user_unit.profiles p
-                JOIN user_unit.sessions s ON p.user_id = s.user_id
-                WHERE s.session_id = %s::uuid 
-                AND s.expires_at > NOW()
-                AND p.is_active = TRUE
-            """, (session_token,))
-            user = cursor.fetchone()
-        
-        cursor.close()
-        conn.close()
+        with db_pool.connection(DB_CONFIG) as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                # Try API key authentication
+                if api_key:
+                    cursor.execute("""
+                        SELECT user_id, username, subscription_tier, is_active
+                        FROM user_unit.profiles
+                        WHERE api_key = %s AND is_active = TRUE
+                    """, (api_key,))
+                    user = cursor.fetchone()
+        
+                # Try session token authentication
+                elif session_token:
+                    cursor.execute("""
+                        SELECT p.user_id, p.username, p.subscription_tier, p.is_active
+                        FROM user_unit.profiles p
+                        JOIN user_unit.sessions s ON p.user_id = s.user_id
+                        WHERE s.session_id = %s::uuid 
+                        AND s.expires_at > NOW()
+                        AND p.is_active = TRUE
+                    """, (session_token,))
+                    user = cursor.fetchone()
+            finally:
+                cursor.close()
         
         if not user:
             return jsonify({'error': 'Invalid or expired credentials', 'code': 'INVALID_AUTH'}), 401
@@ -446,6 +446,11 @@ def health_check():
         'version': '1.0.0'
     }), 200
 
+@app.route('/api/db/pool/stats', methods=['GET'])
+def db_pool_stats():
+    """Connection pool sizing and checkout wait times for this process"""
+    return jsonify(db_pool.get_pool_stats()), 200
+
 if __name__ == '__main__':
     print("\n" + "=" * 70)
     print("🔐 R3ÆLƎR AI USER AUTHENTICATION API")
@@ -463,6 +468,7 @@ if __name__ == '__main__':
     print("   PUT  /api/user/preferences")
     print("   POST /api/user/regenerate-api-key")
     print("   GET  /api/user/stats")
+    print("   GET  /api/db/pool/stats")
     print("\nPress Ctrl+C to stop\n")
     
     app.run(host='0.0.0.0', port=5004, debug=True, use_reloader=False)
@@ -8,15 +8,16 @@ import os
 import logging
 import numpy as np
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from typing import List, Dict, Any, Optional
-import openai  # You already use external APIs — this is the only new import
+import db_pool
+from embedding_backends import get_backend, document_text, to_vector_literal, DEFAULT_BACKEND, EMBEDDING_DIMENSIONS
+from vector_index import set_search_params
+from embedding_cache import get_embedding_cache
+from numpy_vector_index import get_unit_index, load_unit_index
 
 logger = logging.getLogger(__name__)
 
-# OpenAI config (use your existing key or local proxy)
-openai.api_key = os.getenv("OPENAI_API_KEY", "sk-XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX")
-
 DB_CONFIG = {
     'host': 'localhost',
     'port': 5432,
@@ -27,93 +28,153 @@ DB_CONFIG = {
 
 class VectorEngine:
     EMBEDDING_MODEL = "text-embedding-3-small"  # 1536 dims, $0.02 per 1M tokens
+    EMBEDDING_DIMENSIONS = EMBEDDING_DIMENSIONS
+    # 'openai', 'hashed' (local hashed TF-IDF) or 'sentence-transformers';
+    # None uses R3ALER_EMBEDDING_BACKEND (default 'openai')
+    EMBEDDING_BACKEND = None
     BATCH_SIZE = 50
     HYBRID_WEIGHT_VECTOR = 0.7   # 70% vector, 30% keyword
     HYBRID_WEIGHT_KEYWORD = 0.3
 
     @staticmethod
     def get_connection():
-        return psycopg2.connect(**DB_CONFIG)
+        return db_pool.get_connection(DB_CONFIG)
+
+    @staticmethod
+    def connection():
+        """``with VectorEngine.connection() as conn:`` - returned to the pool even on errors"""
+        return db_pool.connection(DB_CONFIG)
+
+    @staticmethod
+    def get_backend():
+        """The process-wide embedding backend (loaded on first use)"""
+        name = VectorEngine.EMBEDDING_BACKEND or DEFAULT_BACKEND
+        if name == 'openai':
+            return get_backend(name, model=VectorEngine.EMBEDDING_MODEL)
+        return get_backend(name)
 
     @staticmethod
     def generate_embedding(text: str) -> Optional[List[float]]:
-        """Generate embedding via OpenAI (cached in DB later)"""
+        """Generate an embedding with the configured backend (None on failure)"""
         try:
-            if not text.strip():
+            if not text or not text.strip():
                 return None
-            response = openai.embeddings.create(
-                input=text.strip()[:8000],  # truncate very long entries
-                model=VectorEngine.EMBEDDING_MODEL
-            )
-            return response.data[0].embedding
+            return VectorEngine.get_backend().embed([text.strip()])[0].tolist()
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             return None
 
+    @staticmethod
+    def embed_query(query: str) -> Optional[np.ndarray]:
+        """Query embedding through the process-wide embedding cache (None on failure)"""
+        try:
+            if not query or not query.strip():
+                return None
+            return get_embedding_cache().get_or_embed(query, VectorEngine.get_backend())
+        except Exception as e:
+            logger.error(f"Query embedding failed: {e}")
+            return None
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, Any]:
+        """Hit rate and bytes held by the query embedding cache"""
+        return get_embedding_cache().get_stats()
+
+    @staticmethod
+    def generate_embeddings(texts: List[str]) -> Optional[np.ndarray]:
+        """Batched inference: one (len(texts), dims) float32 array, or None on failure"""
+        try:
+            return VectorEngine.get_backend().embed(texts)
+        except Exception as e:
+            logger.error(f"Batch embedding failed: {e}")
+            return None
+
     @staticmethod
     def embed_knowledge_unit(unit_name: str, table_name: str = "knowledge"):
         """One-time or incremental: embed all entries in a unit"""
-        conn = VectorEngine.get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get entries without embeddings
-        cur.execute(f"""
-            SELECT id, content FROM {unit_name}.{table_name}
-            WHERE embedding IS NULL OR embedding = '[0]'::vector
-            LIMIT %s
-        """, (VectorEngine.BATCH_SIZE,))
-        
-        rows = cur.fetchall()
-        if not rows:
-            logger.info(f"{unit_name}: All entries already embedded")
-            conn.close()
-            return
-
-        for row in rows:
-            text = f"{row.get('title', '')} {row['content']}".strip()
-            embedding = VectorEngine.generate_embedding(text)
-            if embedding:
-                cur.execute(f"""
-                    UPDATE {unit_name}.{table_name}
-                    SET embedding = %s
-                    WHERE id = %s
-                """, (embedding, row['id']))
-                logger.info(f"Embedded {unit_name}.id={row['id']}")
-        
-        conn.commit()
-        conn.close()
+        with VectorEngine.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            
+            # Get entries without embeddings
+            cur.execute(f"""
+                SELECT id, topic AS title, content FROM {unit_name}.{table_name}
+                WHERE embedding IS NULL OR embedding = '[0]'::vector
+                LIMIT %s
+            """, (VectorEngine.BATCH_SIZE,))
+            
+            rows = cur.fetchall()
+            if not rows:
+                logger.info(f"{unit_name}: All entries already embedded")
+                return
+
+            # One batched inference call for the whole page of rows
+            texts = [document_text(row['title'], row['content']) for row in rows]
+            embeddings = VectorEngine.generate_embeddings(texts)
+            if embeddings is None:
+                return
+
+            execute_values(cur, f"""
+                UPDATE {unit_name}.{table_name} AS k
+                SET embedding = v.embedding::vector
+                FROM (VALUES %s) AS v(id, embedding)
+                WHERE k.id = v.id
+            """, [(row['id'], to_vector_literal(vector)) for row, vector in zip(rows, embeddings)])
+            logger.info(f"Embedded {len(rows)} rows in {unit_name}")
+            
+            conn.commit()
 
     @staticmethod
-    def hybrid_search(query: str, unit_name: str, limit: int = 5, table: str = "knowledge") -> List[Dict]:
-        """Main hybrid search: vector + full-text with reciprocal rank fusion"""
-        query_embedding = VectorEngine.generate_embedding(query)
-        if not query_embedding:
+    def hybrid_search(query: str, unit_name: str, limit: int = 5, table: str = "knowledge",
+                      ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[Dict]:
+        """
+        Main hybrid search: vector + full-text with reciprocal rank fusion.
+        ef_search (HNSW) / probes (IVFFlat) trade recall for latency on the
+        unit's ANN index for this request only (see vector_index.py).
+        """
+        query_embedding = VectorEngine.embed_query(query)
+        if query_embedding is None:
             # Fall back to pure full-text
             return VectorEngine.fulltext_search(query, unit_name, limit, table)
 
-        conn = VectorEngine.get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        sql = f"""
-            WITH vector_results AS (
+        index = get_unit_index(unit_name, table)
+        if index is not None:
+            # Nearest neighbours come from the in-process index; the DB only joins content
+            nearest = index.search(query_embedding, limit*3)
+            vector_cte = f"""
+            vector_results AS (
+                SELECT k.id, k.content, k.topic AS title, v.vector_rank
+                FROM unnest(%s::bigint[]) WITH ORDINALITY AS v(id, vector_rank)
+                JOIN {unit_name}.{table} k ON k.id = v.id
+            ),"""
+            vector_params = ([row_id for row_id, _ in nearest],)
+        else:
+            query_vector = to_vector_literal(query_embedding)
+            # Rank only after the LIMIT, so the ORDER BY ... LIMIT can use the ANN index
+            vector_cte = f"""
+            nearest AS (
                 SELECT 
-                    id, content, title,
-                    embedding <=> %s AS vector_distance,
-                    ROW_NUMBER() OVER (ORDER BY embedding <=> %s) AS vector_rank
+                    id, content, topic AS title,
+                    embedding <=> %s::vector AS vector_distance
                 FROM {unit_name}.{table}
                 WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> %s
+                ORDER BY embedding <=> %s::vector
                 LIMIT %s
             ),
+            vector_results AS (
+                SELECT *, ROW_NUMBER() OVER (ORDER BY vector_distance) AS vector_rank
+                FROM nearest
+            ),"""
+            vector_params = (query_vector, query_vector, limit*3)
+        
+        sql = f"""
+            WITH {vector_cte}
             keyword_results AS (
                 SELECT 
-                    id, content, title,
-                    ts_rank_cd(to_tsvector('english', content || ' ' || COALESCE(title,'')), 
-                               plainto_tsquery('english', %s)) AS keyword_score,
-                    ROW_NUMBER() OVER (ORDER BY ts_rank_cd(to_tsvector('english', content || ' ' || COALESCE(title,'')), 
-                                                          plainto_tsquery('english', %s)) DESC) AS keyword_rank
-                FROM {unit_name}.{table}
-                WHERE to_tsvector('english', content || ' ' || COALESCE(title,'')) @@ plainto_tsquery('english', %s)
+                    id, content, topic AS title,
+                    ts_rank_cd(search_vector, q.query) AS keyword_score,
+                    ROW_NUMBER() OVER (ORDER BY ts_rank_cd(search_vector, q.query) DESC) AS keyword_rank
+                FROM {unit_name}.{table}, plainto_tsquery('english', %s) AS q(query)
+                WHERE search_vector @@ q.query
                 ORDER BY keyword_score DESC
                 LIMIT %s
             ),
@@ -135,44 +196,74 @@ class VectorEngine:
             LIMIT %s;
         """
         
-        cur.execute(sql, (
-            query_embedding, query_embedding, query_embedding, limit*3,
-            query, query, query, limit*3,
-            VectorEngine.HYBRID_WEIGHT_VECTOR,
-            VectorEngine.HYBRID_WEIGHT_KEYWORD,
-            limit
-        ))
-        
-        results = [dict(row) for row in cur.fetchall()]
-        conn.close()
-        return results
+        with VectorEngine.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            if index is None:
+                set_search_params(cur, ef_search, probes)
+            cur.execute(sql, (
+                *vector_params,
+                query, limit*3,
+                VectorEngine.HYBRID_WEIGHT_VECTOR,
+                VectorEngine.HYBRID_WEIGHT_KEYWORD,
+                limit
+            ))
+            return [dict(row) for row in cur.fetchall()]
+
+    @staticmethod
+    def load_vector_index(unit_name: str, table: str = "knowledge"):
+        """Serve this unit's vector lookups from an in-process NumPy index (small units)"""
+        return load_unit_index(unit_name, table, db_config=DB_CONFIG)
+
+    @staticmethod
+    def vector_search(query: str, unit_name: str, limit: int = 5, table: str = "knowledge",
+                      ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[Dict]:
+        """Nearest ids and cosine distances only; no DB round trip when the unit's index is loaded"""
+        query_embedding = VectorEngine.embed_query(query)
+        if query_embedding is None:
+            return []
+        index = get_unit_index(unit_name, table)
+        if index is not None:
+            return [{'id': row_id, 'vector_distance': distance}
+                    for row_id, distance in index.search(query_embedding, limit)]
+
+        query_vector = to_vector_literal(query_embedding)
+        with VectorEngine.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            set_search_params(cur, ef_search, probes)
+            cur.execute(f"""
+                SELECT id, embedding <=> %s::vector AS vector_distance
+                FROM {unit_name}.{table}
+                WHERE embedding IS NOT NULL
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+            """, (query_vector, query_vector, limit))
+            return [dict(row) for row in cur.fetchall()]
 
     @staticmethod
     def fulltext_search(query: str, unit_name: str, limit: int = 5, table: str = "knowledge"):
         """Your original full-text search — kept as fallback"""
-        conn = VectorEngine.get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(f"""
-            SELECT id, title, content
-            FROM {unit_name}.{table}
-            WHERE to_tsvector('english', content || ' ' || COALESCE(title,'')) @@ plainto_tsquery('english', %s)
-            ORDER BY ts_rank_cd(to_tsvector('english', content || ' ' || COALESCE(title,'')), plainto_tsquery('english', %s)) DESC
-            LIMIT %s
-        """, (query, query, limit))
-        results = [dict(row) for row in cur.fetchall()]
-        conn.close()
-        return results
+        with VectorEngine.connection() as conn:
+            cur = conn.cursor(cursor_factory=RealDictCursor)
+            cur.execute(f"""
+                SELECT id, topic AS title, content
+                FROM {unit_name}.{table}, plainto_tsquery('english', %s) AS q(query)
+                WHERE search_vector @@ q.query
+                ORDER BY ts_rank_cd(search_vector, q.query) DESC
+                LIMIT %s
+            """, (query, limit))
+            return [dict(row) for row in cur.fetchall()]
 
     @staticmethod
-    def embed_all_units():
-        """Run this once (or on a cron) to embed everything"""
+    def embed_all_units(**kwargs):
+        """Run this once (or on a cron) to embed everything; see embedding_backfill.py"""
+        from embedding_backfill import run_backfill
+
         units = [
             ("physics_unit", "knowledge"),
             ("quantum_unit", "knowledge"),
             ("space_unit", "knowledge"),
-            ("crypto_unit", "knowledge"),
-            ("blackarch_unit", "tools")
+            ("crypto_unit", "knowledge")
+            # blackarch_unit.tools has no topic/content columns to embed
         ]
-        for unit, table in units:
-            logger.info(f"Embedding {unit}...")
-            VectorEngine.embed_knowledge_unit(unit, table)
\ No newline at end of file
+        kwargs.setdefault('backend', VectorEngine.EMBEDDING_BACKEND)
+        return run_backfill(units, db_config=DB_CONFIG, **kwargs)
\ No newline at end of file
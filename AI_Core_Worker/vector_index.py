@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+R3ÆLƎR AI: pgvector ANN index management
+Builds and maintains one HNSW or IVFFlat index (cosine ops, matching the
+<=> operator used by VectorEngine) on each unit's embedding column, sized
+from the table, and benchmarks recall@k against exact search so each
+unit's ef_search / probes can be tuned.
+
+    hnsw     m / ef_construction grow with the table; better recall per ms,
+             slower to build, no retraining needed as rows are added
+    ivfflat  lists = rows / 1000 (sqrt(rows) above 1M); fast to build, but
+             its clusters go stale as the table grows, so it is rebuilt
+             once the table is REBUILD_GROWTH times larger than at build
+
+Usage:
+    python vector_index.py build                      # every *_unit schema, HNSW
+    python vector_index.py build physics_unit --method ivfflat
+    python vector_index.py maintain                   # rebuild stale IVFFlat indexes
+    python vector_index.py benchmark physics_unit --k 10 --ef-search 20 40 80 160
+    python vector_index.py benchmark crypto_unit --probes 1 4 10 20
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import logging
+import argparse
+from typing import Dict, List, Optional
+
+import psycopg2
+
+from migrate_search_vector import DB_CONFIG, SCHEMA_PATTERN, find_unit_schemas
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_METHODS = ('hnsw', 'ivfflat')
+DEFAULT_METHOD = os.getenv('R3ALER_VECTOR_INDEX', 'hnsw')
+BUILD_MEMORY = os.getenv('R3ALER_INDEX_BUILD_MEM', '512MB')  # maintenance_work_mem for builds
+REBUILD_GROWTH = 4.0
+MIN_INDEXED_ROWS = 1000  # below this a sequential scan is as fast and exact
+
+_COMMENT_ROWS = re.compile(r'rows=(\d+)')
+
+
+def index_name(schema: str, table: str = 'knowledge') -> str:
+    return f"idx_{schema}_{table}_embedding"
+
+
+def choose_index_params(rows: int, method: str = DEFAULT_METHOD) -> Dict[str, int]:
+    """Build parameters for a table of `rows` embeddings (pgvector guidance)"""
+    if method == 'ivfflat':
+        lists = rows // 1000 if rows <= 1_000_000 else int(math.sqrt(rows))
+        return {'lists': max(10, lists)}
+    if method == 'hnsw':
+        if rows <= 100_000:
+            return {'m': 16, 'ef_construction': 64}
+        if rows <= 1_000_000:
+            return {'m': 24, 'ef_construction': 100}
+        return {'m': 32, 'ef_construction': 128}
+    raise ValueError(f"Unknown index method '{method}' (choose from {', '.join(INDEX_METHODS)})")
+
+
+def default_search_params(params: Dict[str, int]) -> Dict[str, int]:
+    """Starting query-time knob for an index built with `params`"""
+    if 'lists' in params:
+        return {'probes': max(1, int(math.sqrt(params['lists'])))}
+    return {'ef_search': max(40, params['ef_construction'] // 2)}
+
+
+def set_search_params(cursor, ef_search: Optional[int] = None, probes: Optional[int] = None):
+    """Per-transaction recall/latency knob; call inside the search transaction"""
+    if ef_search is not None:
+        cursor.execute("SET LOCAL hnsw.ef_search = %s", (int(ef_search),))
+    if probes is not None:
+        cursor.execute("SET LOCAL ivfflat.probes = %s", (int(probes),))
+
+
+def _check_schema(schema: str):
+    if not SCHEMA_PATTERN.match(schema):
+        raise ValueError(f"Refusing to index unexpected schema name: {schema}")
+
+
+def embedded_rows(cursor, schema: str, table: str = 'knowledge') -> int:
+    _check_schema(schema)
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}.{table} WHERE embedding IS NOT NULL")
+    return cursor.fetchone()[0]
+
+
+def describe_index(cursor, schema: str, table: str = 'knowledge') -> Optional[Dict]:
+    """Method, build parameters and row count at build time of the unit's index, or None"""
+    cursor.execute("""
+        SELECT i.indexdef, obj_description(to_regclass(i.schemaname || '.' || i.indexname), 'pg_class')
+        FROM pg_indexes i
+        WHERE i.schemaname = %s AND i.indexname = %s
+    """, (schema, index_name(schema, table)))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    definition, comment = row
+    method = 'hnsw' if 'USING hnsw' in definition else 'ivfflat'
+    params = {key: int(value) for key, value in re.findall(r"(\w+)='?(\d+)'?", definition.split('WITH', 1)[-1])}
+    built_rows = _COMMENT_ROWS.search(comment or '')
+    return {
+        'method': method,
+        'params': params,
+        'built_rows': int(built_rows.group(1)) if built_rows else None,
+        'definition': definition
+    }
+
+
+def ensure_vector_index(cursor, schema: str, table: str = 'knowledge', method: str = DEFAULT_METHOD,
+                        params: Optional[Dict[str, int]] = None, rebuild: bool = False) -> Dict:
+    """
+    Create the unit's ANN index if missing (or if `rebuild`, or the method
+    changed). Returns the index description plus 'action'.
+
+    The index is built with CREATE INDEX CONCURRENTLY under a temporary name
+    and then swapped in, so searches keep using the old one meanwhile. This
+    commits the cursor's open transaction first.
+    """
+    _check_schema(schema)
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown index method '{method}' (choose from {', '.join(INDEX_METHODS)})")
+
+    current = describe_index(cursor, schema, table)
+    if current and not rebuild and current['method'] == method:
+        return {**current, 'action': 'kept'}
+
+    rows = embedded_rows(cursor, schema, table)
+    if rows < MIN_INDEXED_ROWS and not params:
+        return {'method': None, 'params': {}, 'built_rows': rows, 'action': 'skipped'}
+
+    params = params or choose_index_params(rows, method)
+    name = index_name(schema, table)
+    building = f"{name}_new"
+    with_clause = ', '.join(f"{key} = {int(value)}" for key, value in params.items())
+
+    # Build next to the live index without blocking searches or writes, then
+    # swap: CONCURRENTLY cannot run inside a transaction, so use autocommit
+    conn = cursor.connection
+    conn.commit()
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    started = time.perf_counter()
+    try:
+        cursor.execute("SET maintenance_work_mem = %s", (BUILD_MEMORY,))
+        # Leftover (invalid) index from an interrupted build
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{building}")
+        cursor.execute(f"""
+            CREATE INDEX CONCURRENTLY {building} ON {schema}.{table}
+            USING {method} (embedding vector_cosine_ops) WITH ({with_clause})
+        """)
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}")
+        cursor.execute(f"ALTER INDEX {schema}.{building} RENAME TO {name}")
+        cursor.execute(f"COMMENT ON INDEX {schema}.{name} IS %s", (f"rows={rows}",))
+        cursor.execute("RESET maintenance_work_mem")
+    finally:
+        conn.autocommit = autocommit
+    logger.info(f"[OK] {schema}.{table}: {method} {params} over {rows} rows "
+                f"in {time.perf_counter() - started:.1f}s")
+    return {'method': method, 'params': params, 'built_rows': rows, 'action': 'built'}
+
+
+def needs_rebuild(index: Optional[Dict], rows: int) -> bool:
+    """IVFFlat clusters are trained at build time and go stale as the table grows"""
+    if not index or index['method'] != 'ivfflat' or not index.get('built_rows'):
+        return False
+    return rows >= index['built_rows'] * REBUILD_GROWTH
+
+
+def maintain_vector_index(cursor, schema: str, table: str = 'knowledge') -> Dict:
+    index = describe_index(cursor, schema, table)
+    if index is None:
+        return ensure_vector_index(cursor, schema, table)
+    if needs_rebuild(index, embedded_rows(cursor, schema, table)):
+        return ensure_vector_index(cursor, schema, table, 'ivfflat', rebuild=True)
+    return {**index, 'action': 'kept'}
+
+
+# ============ BENCHMARK ============
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def recall_at_k(exact_ids: List, approximate_ids: List) -> float:
+    if not exact_ids:
+        return 1.0
+    return len(set(exact_ids) & set(approximate_ids)) / len(exact_ids)
+
+
+def _top_k(cursor, schema: str, table: str, vector: str, k: int, exact: bool = False,
+           ef_search: Optional[int] = None, probes: Optional[int] = None) -> List:
+    if exact:
+        cursor.execute("SET LOCAL enable_indexscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+    else:
+        set_search_params(cursor, ef_search, probes)
+    cursor.execute(f"""
+        SELECT id FROM {schema}.{table}
+        WHERE embedding IS NOT NULL
+        ORDER BY embedding <=> %s::vector
+        LIMIT %s
+    """, (vector, k))
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.connection.rollback()  # drop the SET LOCALs
+    return ids
+
+
+def benchmark(schema: str, table: str = 'knowledge', k: int = 10, queries: int = 50,
+              ef_search: Optional[List[int]] = None, probes: Optional[List[int]] = None) -> Dict:
+    """
+    Recall@k and latency of the unit's ANN index against exact search, for
+    each ef_search (HNSW) or probes (IVFFlat) value. Query vectors are
+    sampled from the table itself.
+    """
+    _check_schema(schema)
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    try:
+        index = describe_index(cursor, schema, table)
+        if index is None:
+            raise ValueError(f"{schema}.{table} has no vector index; run 'build' first")
+
+        cursor.execute(f"""
+            SELECT embedding::text FROM {schema}.{table}
+            WHERE embedding IS NOT NULL
+            ORDER BY random()
+            LIMIT %s
+        """, (queries,))
+        sample = [row[0] for row in cursor.fetchall()]
+        conn.rollback()
+
+        exact_latencies, ground_truth = [], []
+        for vector in sample:
+            started = time.perf_counter()
+            ground_truth.append(_top_k(cursor, schema, table, vector, k, exact=True))
+            exact_latencies.append(time.perf_counter() - started)
+
+        knob = 'ef_search' if index['method'] == 'hnsw' else 'probes'
+        values = (ef_search if knob == 'ef_search' else probes) or \
+            [default_search_params(index['params'])[knob]]
+
+        results = []
+        for value in values:
+            latencies, recalls = [], []
+            for vector, exact_ids in zip(sample, ground_truth):
+                started = time.perf_counter()
+                ids = _top_k(cursor, schema, table, vector, k, **{knob: value})
+                latencies.append(time.perf_counter() - started)
+                recalls.append(recall_at_k(exact_ids, ids))
+            latencies.sort()
+            results.append({
+                knob: value,
+                'recall': round(sum(recalls) / len(recalls), 4) if recalls else 0.0,
+                'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2)
+            })
+
+        exact_latencies.sort()
+        return {
+            'table': f"{schema}.{table}",
+            'index': {'method': index['method'], 'params': index['params'], 'built_rows': index['built_rows']},
+            'k': k,
+            'queries': len(sample),
+            'exact': {
+                'p50_ms': round(_percentile(exact_latencies, 0.50) * 1000, 2),
+                'p95_ms': round(_percentile(exact_latencies, 0.95) * 1000, 2)
+            },
+            'results': results
+        }
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def print_benchmark(report: Dict):
+    index = report['index']
+    print(f"\n{report['table']}: {index['method']} {index['params']} "
+          f"({report['queries']} queries, recall@{report['k']})")
+    print(f"  exact scan      p50 {report['exact']['p50_ms']:>8} ms   p95 {report['exact']['p95_ms']:>8} ms")
+    for row in report['results']:
+        knob = 'ef_search' if 'ef_search' in row else 'probes'
+        print(f"  {knob}={row[knob]:<6}  p50 {row['p50_ms']:>8} ms   p95 {row['p95_ms']:>8} ms   "
+              f"recall {row['recall']:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Manage pgvector ANN indexes for storage units')
+    parser.add_argument('command', choices=['build', 'maintain', 'benchmark'])
+    parser.add_argument('schemas', nargs='*', help='Unit schemas (default: every *_unit)')
+    parser.add_argument('--table', default='knowledge')
+    parser.add_argument('--method', choices=INDEX_METHODS, default=DEFAULT_METHOD)
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--ef-search', type=int, nargs='+')
+    parser.add_argument('--probes', type=int, nargs='+')
+    args = parser.parse_args(argv)
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    schemas = args.schemas or find_unit_schemas(conn.cursor())
+
+    if args.command == 'benchmark':
+        conn.close()
+        for schema in schemas:
+            print_benchmark(benchmark(schema, args.table, args.k, args.queries, args.ef_search, args.probes))
+        return
+
+    cursor = conn.cursor()
+    try:
+        for schema in schemas:
+            try:
+                if args.command == 'build':
+                    result = ensure_vector_index(cursor, schema, args.table, args.method, rebuild=args.rebuild)
+                else:
+                    result = maintain_vector_index(cursor, schema, args.table)
+                conn.commit()
+                logger.info(f"{schema}.{args.table}: {result['action']} {result.get('method') or ''}")
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"[ERROR] {schema}: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
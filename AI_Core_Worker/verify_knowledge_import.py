@@ -18,7 +18,7 @@ try:
     
     # Merge with existing knowledge base (simulating what knowledge_api.py does)
     original_count = len(R3AELERPrompts.KNOWLEDGE_BASE)
-    R3AELERPrompts.KNOWLEDGE_BASE.update(EXTENDED_KNOWLEDGE_BASE)
+    R3AELERPrompts.update_knowledge(EXTENDED_KNOWLEDGE_BASE)
     new_count = len(R3AELERPrompts.KNOWLEDGE_BASE)
     
     print(f"\n📊 KNOWLEDGE BASE STATUS:")
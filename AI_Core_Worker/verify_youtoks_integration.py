@@ -15,7 +15,7 @@ from load_datasets import (EXTENDED_KNOWLEDGE_BASE, PHYSICS_KB, SPACE_ENGINEERIN
 
 # Merge extended datasets into main knowledge base
 original_count = len(R3AELERPrompts.KNOWLEDGE_BASE)
-R3AELERPrompts.KNOWLEDGE_BASE.update(EXTENDED_KNOWLEDGE_BASE)
+R3AELERPrompts.update_knowledge(EXTENDED_KNOWLEDGE_BASE)
 total_count = len(R3AELERPrompts.KNOWLEDGE_BASE)
 extended_count = len(EXTENDED_KNOWLEDGE_BASE)
 
@@ -11,6 +11,8 @@ import logging
 from werkzeug.utils import secure_filename
 import shutil
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 app = Flask(__name__)
 CORS(app)
@@ -51,6 +53,14 @@ ENVIRONMENTS = {
     }
 }
 
+# One keep-alive session for calls to the managed services (pooled per host,
+# retried on connection errors / 502-504), instead of a new connection per check
+service_http = requests.Session()
+service_http.mount('http://', HTTPAdapter(
+    pool_connections=10, pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), raise_on_status=False)
+))
+
 # Current environment (default to production)
 current_environment = 'production'
 
@@ -243,7 +253,7 @@ def get_storage_analytics():
     try:
         # Try to get data from Storage Facility API
         storage_port = get_current_services()['storage']['port']
-        response = requests.get(f'http://localhost:{storage_port}/api/facility/status', timeout=5)
+        response = service_http.get(f'http://localhost:{storage_port}/api/facility/status', timeout=5)
         if response.status_code == 200:
             storage_data = response.json()
             return jsonify(storage_data)
@@ -259,7 +269,7 @@ def get_storage_optimization():
     try:
         # Try to get optimization data from Storage Facility
         storage_port = get_current_services()['storage']['port']
-        response = requests.get(f'http://localhost:{storage_port}/api/monitoring/health', timeout=5)
+        response = service_http.get(f'http://localhost:{storage_port}/api/monitoring/health', timeout=5)
         if response.status_code == 200:
             optimization_data = response.json()
             return jsonify(optimization_data)
@@ -1048,7 +1058,7 @@ def integrate_json_dataset(dataset_file, filename):
             'integration_type': 'bulk_import'
         }
 
-        response = requests.post(f'http://localhost:{storage_port}/api/facility/bulk_import',
+        response = service_http.post(f'http://localhost:{storage_port}/api/facility/bulk_import',
                                json=integration_payload, timeout=30)
 
         if response.status_code == 200:
@@ -10,7 +10,7 @@ print(f"Extended KB: {len(EXTENDED_KNOWLEDGE_BASE)} entries")
 print(f"R3ÆLƎR KB before merge: {len(R3AELERPrompts.KNOWLEDGE_BASE)} entries")
 
 # Simulate the merge
-R3AELERPrompts.KNOWLEDGE_BASE.update(EXTENDED_KNOWLEDGE_BASE)
+R3AELERPrompts.update_knowledge(EXTENDED_KNOWLEDGE_BASE)
 
 print(f"R3ÆLƎR KB after merge: {len(R3AELERPrompts.KNOWLEDGE_BASE)} entries")
 
@@ -21,6 +21,7 @@ from psycopg2.extras import RealDictCursor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from AI_Core_Worker.self_hosted_storage_facility import StorageFacility
+from AI_Core_Worker.ingestion_pipeline import IngestionPipeline, FacilityWriter, iterable_reader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -596,6 +597,66 @@ HUGGINGFACE_DATASETS = [
     }
 ]
 
+def huggingface_dataset_entry(dataset: Dict[str, Any]) -> Dict[str, Any]:
+    """Knowledge entry for one HuggingFace dataset, routed to the reason or logic unit"""
+    dataset_name = dataset['dataset_name']
+    entry_id = f"hf_{dataset_name.replace('/', '_').replace('-', '_').lower()}"
+
+    # Determine which unit to store in based on content
+    content_lower = dataset['brief_description'].lower() + dataset['primary_use_case'].lower()
+
+    # Logic unit for formal logic, mathematics, programming, benchmarks
+    if any(keyword in content_lower for keyword in [
+        'logic', 'mathematical', 'math', 'programming', 'code', 'algorithm',
+        'benchmark', 'formal', 'proof', 'inference', 'deductive', 'symbolic'
+    ]):
+        unit = 'logic'
+        category = 'mathematical_logic' if 'math' in content_lower else 'computational_logic'
+    # Reason unit for general reasoning, commonsense, cognitive tasks
+    else:
+        unit = 'reason'
+        category = 'cognitive_reasoning'
+
+    # Create detailed entry
+    entry = {
+        'entry_id': entry_id,
+        'topic': f"HuggingFace Dataset: {dataset_name}",
+        'content': f"""
+HuggingFace Dataset: {dataset_name}
+
+Description: {dataset['brief_description']}
+
+Size/Scale: {dataset['size_scale']}
+Primary Use Case: {dataset['primary_use_case']}
+Relevance to Reasoning: {dataset['relevance_to_reasoning']}
+
+Dataset URL: https://huggingface.co/datasets/{dataset_name}
+
+Key Characteristics:
+- High-quality curated dataset from HuggingFace
+- Specifically selected for reasoning and logic capabilities
+- Contributes to AI's cognitive and logical reasoning skills
+- Part of comprehensive knowledge base expansion
+
+Integration Notes:
+- Stored in {unit}_unit for specialized reasoning enhancement
+- Supports VORTEX ingestion methodology
+- Cloud infrastructure compliant
+- Enables AI-powered analysis and optimization
+
+This dataset enhances R3ÆLƎR's reasoning capabilities by providing diverse,
+high-quality training and evaluation data for various forms of logical and
+cognitive reasoning tasks.
+""",
+        'category': category,
+        'subcategory': 'huggingface_datasets',
+        'level': 'advanced',
+        'source': f'huggingface_{dataset_name.split("/")[0]}',
+        'unit': unit
+    }
+    return entry
+
+
 class ReasonLogicIngestion:
     """Comprehensive ingestion system for Reason & Logic units"""
 
@@ -1078,86 +1139,18 @@ Source: {wiki_data['url']}
         logger.info("Starting comprehensive HuggingFace dataset ingestion...")
 
         try:
-            reason_entries = []
-            logic_entries = []
-
-            for dataset in HUGGINGFACE_DATASETS:
-                dataset_name = dataset['dataset_name']
-                entry_id = f"hf_{dataset_name.replace('/', '_').replace('-', '_').lower()}"
-
-                # Determine which unit to store in based on content
-                content_lower = dataset['brief_description'].lower() + dataset['primary_use_case'].lower()
-
-                # Logic unit for formal logic, mathematics, programming, benchmarks
-                if any(keyword in content_lower for keyword in [
-                    'logic', 'mathematical', 'math', 'programming', 'code', 'algorithm',
-                    'benchmark', 'formal', 'proof', 'inference', 'deductive', 'symbolic'
-                ]):
-                    unit = 'logic'
-                    category = 'mathematical_logic' if 'math' in content_lower else 'computational_logic'
-                # Reason unit for general reasoning, commonsense, cognitive tasks
-                else:
-                    unit = 'reason'
-                    category = 'cognitive_reasoning'
-
-                # Create detailed entry
-                entry = {
-                    'entry_id': entry_id,
-                    'topic': f"HuggingFace Dataset: {dataset_name}",
-                    'content': f"""
-HuggingFace Dataset: {dataset_name}
-
-Description: {dataset['brief_description']}
-
-Size/Scale: {dataset['size_scale']}
-Primary Use Case: {dataset['primary_use_case']}
-Relevance to Reasoning: {dataset['relevance_to_reasoning']}
-
-Dataset URL: https://huggingface.co/datasets/{dataset_name}
-
-Key Characteristics:
-- High-quality curated dataset from HuggingFace
-- Specifically selected for reasoning and logic capabilities
-- Contributes to AI's cognitive and logical reasoning skills
-- Part of comprehensive knowledge base expansion
-
-Integration Notes:
-- Stored in {unit}_unit for specialized reasoning enhancement
-- Supports VORTEX ingestion methodology
-- Cloud infrastructure compliant
-- Enables AI-powered analysis and optimization
-
-This dataset enhances R3ÆLƎR's reasoning capabilities by providing diverse,
-high-quality training and evaluation data for various forms of logical and
-cognitive reasoning tasks.
-""",
-                    'category': category,
-                    'subcategory': 'huggingface_datasets',
-                    'level': 'advanced',
-                    'source': f'huggingface_{dataset_name.split("/")[0]}'
-                }
-
-                if unit == 'logic':
-                    logic_entries.append(entry)
-                else:
-                    reason_entries.append(entry)
-
-            # Store entries in batches to avoid memory issues
-            batch_size = 20
-
-            if reason_entries:
-                for i in range(0, len(reason_entries), batch_size):
-                    batch = reason_entries[i:i + batch_size]
-                    result = self.storage.store_knowledge('reason', batch)
-                    logger.info(f"Stored batch {i//batch_size + 1} of reason entries: {len(batch)} datasets")
-
-            if logic_entries:
-                for i in range(0, len(logic_entries), batch_size):
-                    batch = logic_entries[i:i + batch_size]
-                    result = self.storage.store_knowledge('logic', batch)
-                    logger.info(f"Stored batch {i//batch_size + 1} of logic entries: {len(batch)} datasets")
-
-            logger.info(f"Comprehensive HuggingFace ingestion complete: {len(reason_entries)} reason datasets, {len(logic_entries)} logic datasets")
+            # Entries are routed per unit by the writer and stored in batches to avoid memory issues
+            stats = IngestionPipeline(
+                'huggingface_reason_logic',
+                iterable_reader(HUGGINGFACE_DATASETS),
+                FacilityWriter(self.storage),
+                huggingface_dataset_entry,
+                batch_size=20,
+                workers=0
+            ).run()
+
+            logger.info(f"Comprehensive HuggingFace ingestion complete: {stats['stored']} datasets stored, "
+                        f"{stats['updated']} updated, {stats['errors']} errors")
 
         except Exception as e:
             logger.error(f"Error ingesting HuggingFace datasets: {e}")
@@ -10,9 +10,11 @@ import json
 import time
 import logging
 from datetime import datetime
-import requests
 from datasets import load_dataset
 
+sys.path.append(os.path.join(os.path.dirname(__file__), 'AI_Core_Worker'))
+import http_client  # pooled keep-alive session shared by every call to the storage facility
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,7 +43,7 @@ class OpenWebTextIntegrator:
     def check_storage_facility(self):
         """Check if storage facility is available"""
         try:
-            response = requests.get(f"{self.storage_url}/api/facility/status", timeout=10)
+            response = http_client.get(f"{self.storage_url}/api/facility/status", timeout=10)
             if response.status_code == 200:
                 logging.info("Storage facility is available")
                 return True
@@ -106,30 +108,33 @@ class OpenWebTextIntegrator:
             logging.warning(f"Error processing entry: {e}")
             return None
 
+    def choose_unit(self, entry):
+        """Pick the storage unit for an entry based on its content"""
+        content = entry['content'].lower()
+
+        # Simple categorization - use correct unit names
+        if any(word in content for word in ['physics', 'quantum', 'science', 'mathematics', 'math']):
+            return 'quantum'  # Physics/math content goes to quantum unit
+        elif any(word in content for word in ['computer', 'programming', 'software', 'algorithm']):
+            return 'quantum'  # Programming/AI goes to quantum unit
+        elif any(word in content for word in ['cryptography', 'encryption', 'security', 'blockchain']):
+            return 'crypto'
+        elif any(word in content for word in ['biology', 'chemistry', 'medicine', 'health']):
+            return 'physics'  # Science content goes to physics unit
+        else:
+            return 'users'  # General knowledge goes to users unit
+
     def store_entry(self, entry):
         """Store an entry in the storage facility"""
         try:
-            # Determine unit based on content analysis
-            content = entry['content'].lower()
-
-            # Simple categorization - use correct unit names
-            if any(word in content for word in ['physics', 'quantum', 'science', 'mathematics', 'math']):
-                unit = 'quantum'  # Physics/math content goes to quantum unit
-            elif any(word in content for word in ['computer', 'programming', 'software', 'algorithm']):
-                unit = 'quantum'  # Programming/AI goes to quantum unit
-            elif any(word in content for word in ['cryptography', 'encryption', 'security', 'blockchain']):
-                unit = 'crypto'
-            elif any(word in content for word in ['biology', 'chemistry', 'medicine', 'health']):
-                unit = 'physics'  # Science content goes to physics unit
-            else:
-                unit = 'users'  # General knowledge goes to users unit
+            unit = self.choose_unit(entry)
 
             # Store the entry - API expects 'entries' array
             store_url = f"{self.storage_url}/api/unit/{unit}/store"
             store_payload = {
                 'entries': [entry]  # Wrap single entry in array as expected by API
             }
-            response = requests.post(store_url, json=store_payload, timeout=30)
+            response = http_client.post(store_url, json=store_payload, timeout=30)
 
             if response.status_code == 200:
                 logging.info(f"✓ Stored entry: {entry['id']} in {unit}")
@@ -145,6 +150,39 @@ class OpenWebTextIntegrator:
             self.errors += 1
             return False
 
+    def store_batch(self, entries):
+        """Store a batch with one streamed NDJSON request per unit (bulk COPY path)"""
+        by_unit = {}
+        for entry in entries:
+            by_unit.setdefault(self.choose_unit(entry), []).append(entry)
+
+        for unit, unit_entries in by_unit.items():
+            store_url = f"{self.storage_url}/api/unit/{unit}/store"
+            body = (json.dumps(entry).encode('utf-8') + b'\n' for entry in unit_entries)
+            try:
+                response = http_client.post(
+                    store_url, data=body, timeout=300,
+                    headers={'Content-Type': 'application/x-ndjson'}
+                )
+                if response.status_code != 200:
+                    logging.error(f"✗ Bulk store to {unit} failed: {response.status_code} - {response.text}")
+                    self.errors += len(unit_entries)
+                    continue
+
+                result = response.json()
+                if 'error' in result:
+                    logging.error(f"✗ Bulk store to {unit} failed: {result['error']}")
+                    self.errors += len(unit_entries)
+                    continue
+
+                self.entries_stored += result.get('stored', 0) + result.get('updated', 0)
+                self.errors += result.get('errors', 0)
+                logging.info(f"✓ Stored {len(unit_entries)} entries in {unit} "
+                             f"({result.get('stored', 0)} new, {result.get('updated', 0)} updated)")
+            except Exception as e:
+                logging.error(f"✗ Error bulk storing {len(unit_entries)} entries in {unit}: {e}")
+                self.errors += len(unit_entries)
+
     def integrate_dataset(self):
         """Main integration process"""
         if not self.check_storage_facility():
@@ -155,7 +193,7 @@ class OpenWebTextIntegrator:
 
         logging.info(f"Processing up to {self.max_entries} entries from OpenWebText dataset")
 
-        batch_size = 100
+        batch_size = 1000  # one bulk request per unit per batch
         current_batch = []
 
         try:
@@ -171,8 +209,7 @@ class OpenWebTextIntegrator:
                     # Process batch
                     if len(current_batch) >= batch_size:
                         logging.info(f"Processing batch: entries {self.entries_processed - len(current_batch)} to {self.entries_processed - 1}")
-                        for batch_entry in current_batch:
-                            self.store_entry(batch_entry)
+                        self.store_batch(current_batch)
                         current_batch = []
 
                         # Progress update
@@ -182,8 +219,7 @@ class OpenWebTextIntegrator:
             # Process remaining batch
             if current_batch:
                 logging.info(f"Processing final batch: {len(current_batch)} entries")
-                for batch_entry in current_batch:
-                    self.store_entry(batch_entry)
+                self.store_batch(current_batch)
 
         except Exception as e:
             logging.error(f"Error during integration: {e}")
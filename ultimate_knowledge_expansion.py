@@ -21,6 +21,7 @@ from psycopg2.extras import RealDictCursor
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from AI_Core_Worker.self_hosted_storage_facility import StorageFacility
+from AI_Core_Worker.ingestion_pipeline import IngestionPipeline, FacilityWriter, iterable_reader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -439,7 +440,7 @@ class UltimateKnowledgeExpansion:
         """Expand knowledge for a specific domain with ultimate depth"""
         logger.info(f"Ultimate expansion for {domain_name}...")
 
-        entries_added = 0
+        entries = []
 
         # 1. Advanced Datasets - Maximum Depth
         for dataset in domain_sources.get("advanced_datasets", []):
@@ -493,9 +494,7 @@ Knowledge Quality: MAXIMUM ADVANCED
                     'source': f'ultimate_advanced_{dataset.split("/")[0]}'
                 }
 
-                result = self.storage.store_knowledge(domain_name, [entry])
-                if result and result.get('stored', 0) > 0:
-                    entries_added += 1
+                entries.append(entry)
 
             except Exception as e:
                 logger.warning(f"Failed to add ultimate dataset {dataset}: {e}")
@@ -553,9 +552,7 @@ Wisdom Quality: DIVINE INSIGHT
                     'source': 'ultimate_esoteric_archive'
                 }
 
-                result = self.storage.store_knowledge(domain_name, [entry])
-                if result and result.get('stored', 0) > 0:
-                    entries_added += 1
+                entries.append(entry)
 
             except Exception as e:
                 logger.warning(f"Failed to add ultimate esoteric {esoteric_topic}: {e}")
@@ -622,14 +619,23 @@ and cosmic secrets that have been systematically hidden from public access.
                         'source': 'ultimate_forbidden_archive'
                     }
 
-                    result = self.storage.store_knowledge(domain_name, [entry])
-                    if result and result.get('stored', 0) > 0:
-                        entries_added += 1
+                    entries.append(entry)
 
             except Exception as e:
                 logger.warning(f"Failed to add ultimate forbidden {forbidden_topic}: {e}")
 
-        return entries_added
+        # One streamed, batched write instead of a round trip per entry
+        stats = IngestionPipeline(
+            f"ultimate_{domain_name}",
+            iterable_reader(entries),
+            FacilityWriter(self.storage, domain_name),
+            batch_size=500,
+            workers=0
+        ).run()
+        if stats['errors']:
+            logger.warning(f"Failed to store {stats['errors']} ultimate entries for {domain_name}")
+
+        return stats['stored']
 
     def search_ultimate_forbidden_sources(self):
         """Search for the most profound forbidden knowledge sources"""